@@ -1,79 +1,320 @@
+import logging
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from data.gold.estoque.data_gold import obter_dados_filtrados
 from data.gold.financeiro.data_finance_gold import obter_dados_filtrados as obter_dados_financeiro_filtrados
-from components.charts.bar import grafico_entrada_saida_por_data, grafico_produtor, grafico_barras_produto, grafico_financeiro_por_data
+from components.charts.bar import grafico_produtor, grafico_barras_produto, grafico_financeiro_por_data, tamanho_figura
 from components.tables.table import exibir_tabela_resumida, exibir_saidas
-from components.filters.filter_estoque import aplicar_filtros_topo as filtro_estoque
-from components.filters.filter_financeiro import aplicar_filtros_topo as filtro_financeiro
+from components.filters.filter_estoque import aplicar_filtros_topo as filtro_estoque, construir_indice as indice_estoque
+from components.filters.filter_financeiro import aplicar_filtros_topo as filtro_financeiro, construir_indice as indice_financeiro
 from components.cards.card import card
+from data.gold.periodo import PERIODOS, intervalo_periodo
+from data.gold.cubos import cubo_estoque, cubo_financeiro, atualizar_cubo_estoque, atualizar_cubo_financeiro
+from data.gold.snapshot import CacheSnapshot, Snapshot, criar_snapshot
+from data.gold.carga import ResultadoCarga, carregar_fontes
+from data.gold.persistencia import SNAPSHOT_DIR, publicar, ler_metadados, carregar_tabelas
+from data.gold.motor_duckdb import GOLD_MOTOR, agregar_estoque, agregar_financeiro
+from data.gold.camadas import ArmazemCamadas
+from data.gold.cache_consultas import CacheLRU
+from data.silver.estoque import data_silver as silver_estoque
+from data.silver.financeiro import data_fincance_silver as silver_financeiro
 
+logger = logging.getLogger('error_logger')
 
-@st.cache_data(show_spinner=False)
-def carregar_dados():
-    """Carrega os dados da camada gold apenas uma vez para melhorar desempenho."""
-    df = obter_dados_filtrados()
-    df_financeiro = obter_dados_financeiro_filtrados()
 
-    df['CRE_DATA_ENTRADA'] = pd.to_datetime(
-        df['CRE_DATA_ENTRADA'], errors='coerce')
+def mesclar_estoque(dados: dict, chaves: pd.Series, novos: pd.DataFrame) -> dict:
+    """Índices e cubo de estoque com um delta (ver ArmazemCamadas.aplicar_delta)."""
+    indice = dados['estoque']
+    manter = ~indice.df['CRE_ID'].isin(chaves).to_numpy()
+    cubo = atualizar_cubo_estoque(dados['cubo_estoque'].df, indice.df[~manter], novos)
+    return {'estoque': indice.mesclar(manter, novos), 'cubo_estoque': indice_estoque(cubo)}
 
-    return df, df_financeiro
 
+def mesclar_financeiro(dados: dict, chaves: pd.Series, novos: pd.DataFrame) -> dict:
+    """Índices e cubo financeiros com um delta (ver ArmazemCamadas.aplicar_delta)."""
+    indice = dados['financeiro']
+    manter = ~indice.df['NFI_NUMERO'].isin(chaves).to_numpy()
+    cubo = atualizar_cubo_financeiro(dados['cubo_financeiro'].df, indice.df[~manter], novos)
+    return {'financeiro': indice.mesclar(manter, novos), 'cubo_financeiro': indice_financeiro(cubo)}
 
-def run_dashboard():
-    st.set_page_config(page_title="Controle de Estoque Biomax", layout="wide")
-    st.markdown(
-        """
-        <style>
-            .block-container { padding-top: 1rem; padding-bottom: 0rem; }
-            header[data-testid="stHeader"] { height: 0rem; }
-        </style>
-        """,
-        unsafe_allow_html=True
+
+def montar_estoque(quente=None, posicao=None) -> dict:
+    armazem = ArmazemCamadas(
+        silver_estoque.BRONZE_PATH if silver_estoque.usar_bronze() else None,
+        'CRE_DATA_ENTRADA',
+        ler_particoes=silver_estoque.get_particoes,
+        ler_tudo=obter_dados_filtrados,
+        montar=lambda df: {'estoque': indice_estoque(df), 'cubo_estoque': indice_estoque(cubo_estoque(df))},
+        quente=quente,
+        ler_delta=silver_estoque.get_delta,
+        mesclar=mesclar_estoque,
+        posicao=posicao,
+        ler_valores=silver_estoque.get_valores,
     )
+    return armazem.indices()
 
-    st.title(f"Controle Estoque Biomax")
-    df, df_financeiro = carregar_dados()
 
-    col1_filtro, col2_filtro, col3_filtro, col4_filtro, col5_filtro = st.columns(
-        [0.2, 0.2, 0.2, 0.2, 0.2])
+def montar_financeiro(quente=None, posicao=None) -> dict:
+    armazem = ArmazemCamadas(
+        silver_financeiro.BRONZE_PATH if silver_financeiro.usar_bronze() else None,
+        'NFI_DATA_SAIDA',
+        ler_particoes=silver_financeiro.get_particoes,
+        ler_tudo=obter_dados_financeiro_filtrados,
+        montar=lambda df: {'financeiro': indice_financeiro(df), 'cubo_financeiro': indice_financeiro(cubo_financeiro(df))},
+        quente=quente,
+        ler_delta=silver_financeiro.get_delta,
+        mesclar=mesclar_financeiro,
+        posicao=posicao,
+        ler_valores=silver_financeiro.get_valores,
+    )
+    return armazem.indices()
 
-    with col1_filtro:
-        periodo = st.selectbox(
-            "Período:",
-            ["Hoje", "Última Semana", "Últimos 15 Dias",
-                "Últimos 30 Dias", "Mês Atual", "Ano Atual", "Todos"],
-            index=0
-        )
 
-    with col2_filtro:
-        data_especifica = st.date_input("Data", value=None)
+# Fontes carregadas em paralelo a cada construção do snapshot
+FONTES = {'estoque': montar_estoque, 'financeiro': montar_financeiro}
+
+
+def montar_dados() -> dict:
+    """
+    Monta os dados da camada gold já indexados por data e pelas colunas dos
+    filtros do topo, junto com os cubos diários (data/gold/cubos.py) que
+    alimentam os gráficos. Só a janela recente fica residente; o histórico é
+    carregado sob demanda (data/gold/camadas.py). As fontes são carregadas em paralelo; uma fonte
+    com erro fica de fora (ver 'carga') sem impedir as demais.
+    """
+    carga = carregar_fontes(FONTES)
+    if not carga.dados:
+        raise RuntimeError(f"Nenhuma fonte carregada: {carga.erros}")
+
+    dados = {'carga': carga}
+    for parte in carga.dados.values():
+        dados.update(parte)
+    return dados
+
+
+def atualizar_dados(snapshot: Snapshot) -> dict | None:
+    """
+    Dados do snapshot com só as alterações gravadas no bronze desde a sua
+    carga (extração incremental), aplicadas em paralelo por fonte: apenas as
+    linhas novas passam pela silver e são mescladas nos índices e cubos.
+    None se alguma fonte precisar ser recarregada por completo.
+    """
+    if any(fonte not in snapshot.dados for fonte in FONTES):
+        return None
+
+    def aplicar(armazem):
+        novo = armazem.aplicar_delta()
+        return None if novo is None else novo.indices()
+
+    carga = carregar_fontes({
+        fonte: lambda armazem=snapshot[fonte].armazem: aplicar(armazem) for fonte in FONTES})
+    if carga.erros or any(parte is None for parte in carga.dados.values()):
+        return None
+
+    dados = {'carga': carga}
+    for parte in carga.dados.values():
+        dados.update(parte)
+    return dados
+
+
+def persistir_snapshot(snapshot: Snapshot):
+    """
+    Publica a camada quente de cada fonte do snapshot em SNAPSHOT_DIR, para a
+    partida a quente do próximo processo e para as demais réplicas da mesma
+    máquina (ver restaurar_snapshot()).
+    """
+    carga = snapshot['carga']
+    fontes = [fonte for fonte in FONTES if fonte in snapshot.dados]
+    publicar(
+        {fonte: snapshot[fonte].df for fonte in fontes},
+        {
+            'versao': snapshot.versao,
+            'criado_em': snapshot.criado_em.isoformat(),
+            'duracao': snapshot.duracao,
+            'tempos': carga.tempos,
+            'erros': carga.erros,
+            'cortes': {fonte: snapshot[fonte].armazem.corte for fonte in fontes},
+            'posicoes': {fonte: snapshot[fonte].armazem.posicao for fonte in fontes},
+        }
+    )
+
+
+def restaurar_snapshot(versao: str | None = None) -> Snapshot | None:
+    """
+    Snapshot publicado por persistir_snapshot(), com os índices e cubos
+    remontados sobre a camada quente mapeada do disco (compartilhada entre os
+    processos), sem consultar o SQL Server. None se não houver snapshot
+    publicado, se ele não puder ser lido ou se `versao` for dada e diferir
+    da versão dos dados gravada.
+    """
+    try:
+        atual = ler_metadados(SNAPSHOT_DIR)
+        if atual is None or (versao is not None and atual[1]['versao'] != versao):
+            return None
+        salvo = carregar_tabelas(SNAPSHOT_DIR)
+        if salvo is None:
+            return None
+        metadados, tabelas = salvo
+
+        partes = {
+            fonte: FONTES[fonte](
+                quente=(df, metadados['cortes'][fonte]), posicao=metadados.get('posicoes', {}).get(fonte))
+            for fonte, df in tabelas.items()
+        }
+        dados = {'carga': ResultadoCarga(partes, metadados['tempos'], metadados['erros'])}
+        for parte in partes.values():
+            dados.update(parte)
+        return criar_snapshot(
+            metadados['versao'], dados, metadados['duracao'], datetime.fromisoformat(metadados['criado_em']))
+    except Exception as e:
+        logger.error(f"Erro ao restaurar snapshot de {SNAPSHOT_DIR}: {str(e)}.", exc_info=True)
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def cache_snapshot() -> CacheSnapshot:
+    """
+    Cache de snapshot único do processo, compartilhado por todas as sessões e
+    mantido atualizado por uma thread em segundo plano. Parte do último
+    snapshot publicado em disco, quando houver, publica cada versão nova,
+    reaproveita a versão já publicada por outra réplica e, depois de cada
+    extração incremental, aplica só o delta.
+    """
+    cache = CacheSnapshot(
+        montar_dados,
+        inicial=restaurar_snapshot(),
+        ao_publicar=persistir_snapshot,
+        restaurar=restaurar_snapshot,
+        incrementar=atualizar_dados,
+    )
+    cache.iniciar_atualizacao()
+    return cache
+
+
+def carregar_dados():
+    """
+    Snapshot atual dos dados, sem cópia. Uma nova versão é publicada pela
+    thread de atualização quando uma extração grava o bronze ou quando o TTL
+    expira (ver data/gold/snapshot.py); só a primeira carga espera.
+    """
+    return cache_snapshot().obter()
+
+
+@st.cache_resource(show_spinner=False)
+def cache_consultas() -> CacheLRU:
+    """
+    Cache LRU dos recortes filtrados e das figuras, único do processo: uma
+    combinação de filtros já calculada para uma sessão serve todas as outras
+    enquanto o snapshot for o mesmo (ver data/gold/cache_consultas.py).
+    """
+    return CacheLRU()
+
+
+def agregar_duckdb(agregar, *args) -> pd.DataFrame | None:
+    """
+    Agregado do motor DuckDB sobre o bronze, ou None quando GOLD_MOTOR não é
+    "duckdb" ou a consulta falha (bronze ausente ou ilegível, duckdb não
+    instalado); nesses casos o chamador usa os cubos do snapshot em memória.
+    """
+    if GOLD_MOTOR != "duckdb":
+        return None
+    try:
+        return agregar(*args)
+    except Exception as e:
+        logger.error(f"Erro no motor DuckDB, usando o snapshot em memória: {str(e)}.", exc_info=True)
+        return None
+
+
+def consultar_estoque(snapshot: Snapshot, periodo, data_especifica, produtos, fornecedores) -> tuple:
+    """
+    Lançamentos de estoque filtrados, as figuras de produto e de produtor e
+    o tamanho das figuras em bytes. As figuras ficam None quando o filtro
+    não retorna lançamentos.
+    """
+    indice = snapshot['estoque']
+    df_filtrado = filtro_estoque(indice.df, data_especifica, periodo, produtos, fornecedores, indice=indice)
+    if df_filtrado.empty:
+        return df_filtrado, None, None, 0
+
+    # Gráficos leem os cubos diários, filtrados pelos mesmos critérios,
+    # ou o agregado calculado pelo DuckDB direto no bronze
+    inicio, fim = intervalo_periodo(periodo, data_especifica)
+    cubo_filtrado = agregar_duckdb(agregar_estoque, inicio, fim, produtos, fornecedores)
+    if cubo_filtrado is None:
+        cubo = snapshot['cubo_estoque']
+        cubo_filtrado = filtro_estoque(cubo.df, data_especifica, periodo, produtos, fornecedores, indice=cubo)
+
+    fig_produto = grafico_barras_produto(cubo_filtrado, top_n=5)
+    fig_produtor = grafico_produtor(cubo_filtrado, 5)
+    return df_filtrado, fig_produto, fig_produtor, tamanho_figura(fig_produto) + tamanho_figura(fig_produtor)
+
+
+def consultar_financeiro(snapshot: Snapshot, periodo, data_especifica, cliente) -> tuple:
+    """
+    Notas filtradas, total faturado, figura por data, o aviso a exibir
+    quando não há figura e o tamanho da figura em bytes.
+    """
+    indice = snapshot['financeiro']
+    df_filtro_financeiro = filtro_financeiro(indice.df, data_especifica, periodo, cliente, indice=indice)
+
+    inicio, fim = intervalo_periodo(periodo, data_especifica)
+    cubo_filtrado = agregar_duckdb(agregar_financeiro, inicio, fim, cliente)
+    if cubo_filtrado is not None:
+        total = cubo_filtrado['NFI_VALOR_TOTAL_NOTA'].sum()
+    else:
+        cubo = snapshot['cubo_financeiro']
+        cubo_filtrado = filtro_financeiro(cubo.df, data_especifica, periodo, cliente, indice=cubo)
+        # Total do período direto das somas acumuladas do snapshot financeiro
+        total = indice.total('NFI_VALOR_TOTAL_NOTA', inicio, fim, cliente)
+
+    # grafico_financeiro_por_data() avisa na tela quando não há figura; o
+    # aviso é guardado para ser repetido quando o resultado vier do cache
+    fig = grafico_financeiro_por_data(cubo_filtrado)
+    aviso = None
+    if fig is None:
+        aviso = "DataFrame vazio." if cubo_filtrado.empty else "Nenhum dado encontrado para o filtro aplicado."
+    return df_filtro_financeiro, total, fig, aviso, 0 if fig is None else tamanho_figura(fig)
 
-    with col3_filtro:
+
+def formatar_idade(segundos: float) -> str:
+    if segundos < 60:
+        return f"{segundos:.0f} s"
+    if segundos < 3600:
+        return f"{segundos / 60:.0f} min"
+    return f"{segundos / 3600:.1f} h"
+
+
+# Painéis do dashboard. Cada um é um fragmento com os seus próprios filtros:
+# mudar produto ou fornecedor reexecuta só o painel de estoque, e mudar o
+# cliente só o financeiro. Período e data ficam fora dos fragmentos e chegam
+# como argumentos, então valem para os dois painéis.
+
+@st.fragment
+def painel_estoque(snapshot: Snapshot, periodo, data_especifica):
+    """Filtros de produto e fornecedor, gráficos e tabela de lançamentos."""
+    indice = snapshot['estoque']
+
+    col1_filtro, col2_filtro, _ = st.columns([0.2, 0.2, 0.6])
+
+    with col1_filtro:
         produtos = st.multiselect(
             "Produto:",
-            options=sorted(df['CRE_PRO_DESCRICAO'].dropna().unique())
+            options=sorted(indice.valores('CRE_PRO_DESCRICAO'))
         )
 
-    with col4_filtro:
+    with col2_filtro:
         fornecedores = st.multiselect(
             "Fornecedor:",
-            options=sorted(df['CRE_PRODUTOR_NOME'].dropna().unique())
+            options=sorted(indice.valores('CRE_PRODUTOR_NOME'))
         )
 
-    with col5_filtro:
-        cliente = st.multiselect(
-            "Cliente:",
-            options=sorted(df_financeiro['NFI_RAZAO'].dropna().unique())
-        )
-
-    df_filtrado = filtro_estoque(
-        df, data_especifica, periodo, produtos, fornecedores)
-
-    df_filtro_financeiro = filtro_financeiro(
-        df_financeiro, data_especifica, periodo, cliente)
+    # A janela resolvida entra na chave: "Hoje" de ontem não serve hoje
+    janela = intervalo_periodo(periodo, data_especifica)
+    filtros = (periodo, data_especifica, janela, tuple(sorted(produtos)), tuple(sorted(fornecedores)))
+    (df_filtrado, fig_produto, fig_produtor, tamanho), _ = cache_consultas().obter(
+        ('estoque', (snapshot.versao, snapshot.criado_em), GOLD_MOTOR, *filtros),
+        lambda: consultar_estoque(snapshot, periodo, data_especifica, produtos, fornecedores))
 
     if df_filtrado.empty:
         st.warning("Nenhum dado encontrado para os filtros selecionados.")
@@ -82,24 +323,95 @@ def run_dashboard():
     col1, col2 = st.columns([0.4, 0.6])
 
     with col1:
-        fig_produto = grafico_barras_produto(df_filtrado, top_n=5)
         if fig_produto:
             st.plotly_chart(fig_produto, use_container_width=True)
 
     with col2:
-        fig_produtor = grafico_produtor(df_filtrado, 5)
         if fig_produtor:
             st.plotly_chart(fig_produtor, use_container_width=True)
 
-    total = df_filtro_financeiro['NFI_VALOR_TOTAL_NOTA'].sum()
+    st.caption(f"Gráficos de estoque: {tamanho / 1024:.1f} KB")
+    exibir_tabela_resumida(df_filtrado)
+
+
+@st.fragment
+def painel_financeiro(snapshot: Snapshot, periodo, data_especifica):
+    """Filtro de cliente, total faturado, gráfico e tabela de saídas."""
+    indice = snapshot['financeiro']
+
+    col1_filtro, _ = st.columns([0.2, 0.8])
+
+    with col1_filtro:
+        cliente = st.multiselect(
+            "Cliente:",
+            options=sorted(indice.valores('NFI_RAZAO'))
+        )
+
+    janela = intervalo_periodo(periodo, data_especifica)
+    filtros = (periodo, data_especifica, janela, tuple(sorted(cliente)))
+    (df_filtro_financeiro, total, fig_data_financeiro, aviso, tamanho), acerto = cache_consultas().obter(
+        ('financeiro', (snapshot.versao, snapshot.criado_em), GOLD_MOTOR, *filtros),
+        lambda: consultar_financeiro(snapshot, periodo, data_especifica, cliente))
     card('', f"Total Faturado: R$ {total:,.2f}")
 
-    fig_data_financeiro = grafico_financeiro_por_data(df_filtro_financeiro)
     if fig_data_financeiro:
         st.plotly_chart(fig_data_financeiro, use_container_width=False)
+        st.caption(f"Gráfico financeiro: {tamanho / 1024:.1f} KB")
+    elif acerto:
+        st.warning(aviso)
 
-    exibir_tabela_resumida(df_filtrado)
     exibir_saidas(df_filtro_financeiro)
 
+
+def run_dashboard():
+    st.set_page_config(page_title="Controle de Estoque Biomax", layout="wide")
+    st.markdown(
+        """
+        <style>
+            .block-container { padding-top: 1rem; padding-bottom: 0rem; }
+            header[data-testid="stHeader"] { height: 0rem; }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+    st.title(f"Controle Estoque Biomax")
+    snapshot = carregar_dados()
+    carga = snapshot['carga']
+    tempos = " · ".join(f"{fonte} {segundos:.1f} s" for fonte, segundos in carga.tempos.items())
+    uso = cache_consultas().estatisticas()
+    st.caption(
+        f"Dados atualizados há {formatar_idade(snapshot.idade)} · "
+        f"última atualização levou {snapshot.duracao:.1f} s ({tempos}) · "
+        f"cache de consultas: {uso['acertos']} acertos, {uso['falhas']} falhas, "
+        f"{uso['bytes'] / 1024 ** 2:.0f} MB"
+    )
+    for fonte, erro in carga.erros.items():
+        st.error(f"Não foi possível carregar os dados de {fonte}: {erro}")
+
+    # Filtros comuns aos dois painéis: mudar um deles reexecuta a página
+    col1_filtro, col2_filtro, _ = st.columns([0.2, 0.2, 0.6])
+
+    with col1_filtro:
+        periodo = st.selectbox(
+            "Período:",
+            PERIODOS,
+            index=0
+        )
+
+    with col2_filtro:
+        data_especifica = st.date_input("Data", value=None)
+
+    # Resultados compartilhados entre as sessões, por versão do snapshot e
+    # pelos filtros de que cada painel depende (com o intervalo de datas já
+    # resolvido, que muda à meia-noite)
+    cache_consultas().definir_versao((snapshot.versao, snapshot.criado_em))
+
+    if 'estoque' in snapshot.dados:
+        painel_estoque(snapshot, periodo, data_especifica)
+    if 'financeiro' in snapshot.dados:
+        painel_financeiro(snapshot, periodo, data_especifica)
+
+
 if __name__ == "__main__":
     run_dashboard()
@@ -0,0 +1,93 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from data.bronze.bronze_store import escrever_particionado
+from data.silver.estoque import data_silver
+from data.gold.cubos import cubo_estoque
+from data.gold.periodo import intervalo_periodo
+from data.gold.motor_duckdb import agregar_estoque
+from components.filters.filter_estoque import construir_indice, aplicar_filtros_topo
+from components.charts.bar import grafico_produtor
+
+# Compara o motor DuckDB da gold com o caminho em pandas sobre o mesmo bronze
+# sintético de estoque.
+# Execução (a partir da raiz do projeto, com duckdb instalado):
+#   python -m benchmarks.bench_gold_engine [linhas]
+
+PERIODOS = ["Hoje", "Últimos 30 Dias", "Ano Atual", "Todos"]
+
+
+def gerar_estoque(linhas: int, semente: int = 42) -> pd.DataFrame:
+    """Romaneios com ~8 anos de histórico, 40 produtos e 3000 produtores."""
+    rng = np.random.default_rng(semente)
+    agora = np.datetime64(datetime.now().replace(microsecond=0), 's')
+    entrada = agora - rng.integers(0, 8 * 365 * 86400, linhas).astype('timedelta64[s]')
+    produtor = rng.integers(1, 3001, linhas)
+
+    return pd.DataFrame({
+        'CRE_ID': np.arange(1, linhas + 1),
+        'CRE_PESO_ENTRADA': rng.random(linhas) * 40_000,
+        'CRE_PESO_SAIDA': rng.random(linhas) * 15_000,
+        'CRE_PESO_LIQUIDO': rng.random(linhas) * 25_000,
+        'TIPO': rng.choice(['ENTRADA', 'SAIDA'], linhas, p=[0.9, 0.1]),
+        'CRE_DATAINC': entrada,
+        'CRE_DATA_ENTRADA': entrada,
+        'CRE_DATA_ROMANEIO': entrada,
+        'CRE_DATA_SAIDA': entrada + np.timedelta64(2, 'h'),
+        'TIPO_COBRANCA_ARMAZENAGEM': rng.choice(['A', 'B'], linhas),
+        'STATUS_ROMANEIO': rng.choice(['FECHADO', 'ABERTO', 'CANCELADO'], linhas, p=[0.8, 0.15, 0.05]),
+        'CRE_MOTORISTA_NOME': np.char.add('MOTORISTA ', rng.integers(1, 500, linhas).astype(str)),
+        'CRE_PRODUTOR_CODIGO': produtor,
+        'CRE_PRODUTOR_NOME': np.char.add('PRODUTOR ', produtor.astype(str)),
+        'CRE_PRODUTOR_CIDADE': rng.choice(['CIDADE A', 'CIDADE B', 'CIDADE C'], linhas),
+        'CRE_PRO_DESCRICAO': np.char.add('PRODUTO ', rng.integers(1, 41, linhas).astype(str)),
+    })
+
+
+def medir(funcao, repeticoes: int = 3) -> float:
+    """Melhor tempo, em segundos, entre as repetições."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def ranking(df: pd.DataFrame) -> pd.DataFrame:
+    """Entrada do gráfico de fornecedores, comparável entre os dois caminhos."""
+    return (
+        df.groupby(['CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME'], observed=True)['CRE_PESO_LIQUIDO'].sum()
+        .reset_index().astype({'CRE_PRODUTOR_CODIGO': 'int64', 'CRE_PRODUTOR_NOME': str})
+        .sort_values(['CRE_PRODUTOR_CODIGO'], ignore_index=True)
+    )
+
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    caminho = tempfile.mkdtemp(prefix="bench_gold_")
+    escrever_particionado(gerar_estoque(linhas), caminho, 'CRE_DATA_ENTRADA', 'CRE_ID')
+    print(f"🔹 {linhas:,} romaneios em {caminho}")
+
+    # Caminho pandas: bronze -> silver -> índices/cubo (uma vez) -> filtro por interação
+    def montar_pandas():
+        df = data_silver.transformar(data_silver.ler_bronze_estoque(caminho))
+        return construir_indice(cubo_estoque(df))
+
+    t_carga = medir(montar_pandas, repeticoes=1)
+    indice = montar_pandas()
+    print(f"Pandas, carga do snapshot + cubo:      {t_carga:8.3f}s (uma vez por versão)")
+
+    for periodo in PERIODOS:
+        inicio, fim = intervalo_periodo(periodo)
+        pandas = lambda: grafico_produtor(aplicar_filtros_topo(indice.df, None, periodo, None, None, indice=indice), 5)
+        motor = lambda: grafico_produtor(agregar_estoque(inicio, fim, caminho_base=caminho), 5)
+
+        esperado = ranking(aplicar_filtros_topo(indice.df, None, periodo, None, None, indice=indice))
+        obtido = ranking(agregar_estoque(inicio, fim, caminho_base=caminho))
+        pd.testing.assert_frame_equal(esperado, obtido, check_dtype=False, rtol=1e-6)
+
+        print(f"{periodo:<16} pandas (snapshot): {medir(pandas):7.3f}s   duckdb (bronze): {medir(motor):7.3f}s")
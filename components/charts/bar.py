@@ -1,8 +1,46 @@
+import os
 import streamlit as st
 import plotly.express as px
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Orçamento de marcas por gráfico: nenhum gráfico envia mais que
+# GRAFICO_MAX_MARCAS barras ao navegador, por mais clientes, produtos ou
+# fornecedores que o filtro alcance; a cauda vira uma barra "Outros".
+GRAFICO_MAX_MARCAS = max(int(os.getenv("GRAFICO_MAX_MARCAS", "20")), 1)
+
+COR_BARRAS = '#1f77b4'  # cor azul padrão
+COR_OUTROS = '#9e9e9e'
+
+
+def limitar_marcas(dados: pd.DataFrame, categoria: str, valor: str, maximo: int = GRAFICO_MAX_MARCAS) -> pd.DataFrame:
+    """
+    Mantém as `maximo - 1` maiores categorias e soma as demais numa linha
+    "Outros (n)", de modo que o resultado tenha no máximo `maximo` linhas.
+
+    Args:
+        dados (pd.DataFrame): Uma linha por categoria, em ordem decrescente de `valor`.
+        categoria (str): Coluna com o rótulo da barra.
+        valor (str): Coluna somada na linha "Outros".
+        maximo (int): Quantidade máxima de linhas.
+    """
+    if len(dados) <= maximo:
+        return dados
+
+    resto = dados.iloc[maximo - 1:]
+    outros = pd.DataFrame({categoria: [f"Outros ({len(resto)})"], valor: [resto[valor].sum()]})
+    return pd.concat([dados.iloc[:maximo - 1], outros], ignore_index=True)
+
+
+def cores_marcas(rotulos: pd.Series) -> list:
+    """Cor de cada barra de um traço único, com "Outros" em cinza."""
+    return [COR_OUTROS if str(rotulo).startswith("Outros (") else COR_BARRAS for rotulo in rotulos]
+
+
+def tamanho_figura(fig) -> int:
+    """Tamanho em bytes do JSON da figura, isto é, do que vai ao navegador."""
+    return len(fig.to_json().encode('utf-8'))
+
 
 def grafico_entrada_saida_por_data(df, dias: int = 15, data_filtro=None):
     """
@@ -16,11 +54,7 @@ def grafico_entrada_saida_por_data(df, dias: int = 15, data_filtro=None):
         dias (int): Número de dias anteriores a considerar (padrão: 15)
         data_filtro (str|datetime.date, opcional): Filtra apenas uma data específica.
     """
-    # Garantir tipos corretos
-    df['CRE_DATA_ENTRADA'] = pd.to_datetime(
-        df['CRE_DATA_ENTRADA'], errors='coerce')
-    df['CRE_PESO_LIQUIDO'] = pd.to_numeric(
-        df['CRE_PESO_LIQUIDO'], errors='coerce')
+    # Tipos de data e peso já vêm garantidos pelo schema da silver
     df['TIPO'] = df['TIPO'].str.strip().str.lower().replace({
         'entrada': 'Entrada',
         'saida': 'Saída'
@@ -42,7 +76,7 @@ def grafico_entrada_saida_por_data(df, dias: int = 15, data_filtro=None):
 
     # Agrupar por data e tipo
     df_tipo_dia = (
-        df.groupby([df['CRE_DATA_ENTRADA'].dt.date, 'TIPO'])[
+        df.groupby([df['CRE_DATA_ENTRADA'].dt.date, 'TIPO'], observed=True)[
             'CRE_PESO_LIQUIDO']
         .sum()
         .reset_index(name='Peso_Liquido')
@@ -81,8 +115,9 @@ def grafico_produtor(df, top_n=None):
     Parâmetros:
         df (pd.DataFrame): DataFrame com colunas
             ['CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME', 'CRE_PESO_LIQUIDO']
-        top_n (int): Quantidade de produtores no ranking.
-                     Se None ou 0, retorna todos.
+        top_n (int): Quantidade de produtores no ranking (até
+                     GRAFICO_MAX_MARCAS). Se None ou 0, mostra os maiores e
+                     agrupa os demais em "Outros".
 
     Retorna:
         fig (plotly.graph_objs._figure.Figure): Figura interativa pronta para Streamlit
@@ -94,20 +129,18 @@ def grafico_produtor(df, top_n=None):
         raise ValueError(
             "O DataFrame não possui todas as colunas necessárias.")
 
-    # Garantir que peso seja numérico
-    df['CRE_PESO_LIQUIDO'] = pd.to_numeric(
-        df['CRE_PESO_LIQUIDO'], errors='coerce')
-
     # Agrupar por produtor (código + nome)
-    agg_df = df.groupby(['CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME'])[
+    agg_df = df.groupby(['CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME'], observed=True)[
         'CRE_PESO_LIQUIDO'].sum().reset_index()
 
     # Ordenar pelo total movimentado
     agg_df = agg_df.sort_values('CRE_PESO_LIQUIDO', ascending=False)
 
-    # Aplicar top_n se definido
-    if top_n and top_n > 0:
+    # Aplicar top_n se definido, dentro do orçamento de marcas
+    if top_n and 0 < top_n <= GRAFICO_MAX_MARCAS:
         agg_df = agg_df.head(top_n)
+    else:
+        agg_df = limitar_marcas(agg_df, 'CRE_PRODUTOR_NOME', 'CRE_PESO_LIQUIDO')
 
     # Criar gráfico horizontal interativo
     fig = px.bar(
@@ -115,9 +148,8 @@ def grafico_produtor(df, top_n=None):
         x='CRE_PESO_LIQUIDO',
         y='CRE_PRODUTOR_NOME',
         orientation='h',
-        text='CRE_PESO_LIQUIDO',
         title=f'Fornecedores ',
-        color_discrete_sequence=['#1f77b4']  # cor azul padrão
+        color_discrete_sequence=[COR_BARRAS]
     )
 
     # Ajustes visuais
@@ -129,8 +161,8 @@ def grafico_produtor(df, top_n=None):
         bargap=0.1,
         margin=dict(l=200, r=20, t=50, b=30)
     )
-    fig.update_traces(texttemplate='%{text:.0f}', textposition='inside',
-                      insidetextanchor='end', )
+    fig.update_traces(texttemplate='%{x:.0f}', textposition='inside',
+                      insidetextanchor='end', marker_color=cores_marcas(agg_df['CRE_PRODUTOR_NOME']))
 
     return fig
 
@@ -142,8 +174,9 @@ def grafico_barras_produto(df, top_n=None):
     Parâmetros:
         df (pd.DataFrame): DataFrame com colunas 
             ['CRE_PRO_DESCRICAO', 'CRE_PESO_LIQUIDO']
-        top_n (int, opcional): Quantidade máxima de produtos exibidos. 
-                               Se None, mostra todos.
+        top_n (int, opcional): Quantidade máxima de produtos exibidos (até
+                               GRAFICO_MAX_MARCAS). Se None, mostra os maiores
+                               e agrupa os demais em "Outros".
 
     Retorna:
         fig (plotly.graph_objs._figure.Figure): Figura interativa pronta para Streamlit
@@ -154,20 +187,18 @@ def grafico_barras_produto(df, top_n=None):
         raise ValueError(
             "O DataFrame não possui todas as colunas necessárias.")
 
-    # Garantir que peso seja numérico
-    df['CRE_PESO_LIQUIDO'] = pd.to_numeric(
-        df['CRE_PESO_LIQUIDO'], errors='coerce')
-
     # Agrupar por produto
-    resumo = df.groupby('CRE_PRO_DESCRICAO', as_index=False)[
+    resumo = df.groupby('CRE_PRO_DESCRICAO', as_index=False, observed=True)[
         'CRE_PESO_LIQUIDO'].sum()
 
     # Ordenar do maior para o menor
     resumo = resumo.sort_values('CRE_PESO_LIQUIDO', ascending=False)
 
-    # Aplicar top_n se definido
-    if top_n and top_n > 0:
+    # Aplicar top_n se definido, dentro do orçamento de marcas
+    if top_n and 0 < top_n <= GRAFICO_MAX_MARCAS:
         resumo = resumo.head(top_n)
+    else:
+        resumo = limitar_marcas(resumo, 'CRE_PRO_DESCRICAO', 'CRE_PESO_LIQUIDO')
 
     # Criar gráfico de barras horizontal
     fig = px.bar(
@@ -175,9 +206,8 @@ def grafico_barras_produto(df, top_n=None):
         x='CRE_PESO_LIQUIDO',
         y='CRE_PRO_DESCRICAO',
         orientation='h',
-        text='CRE_PESO_LIQUIDO',
         title=f'Produtos',
-        color_discrete_sequence=['#1f77b4']  # cor azul padrão
+        color_discrete_sequence=[COR_BARRAS]
     )
 
     # Ajustes visuais
@@ -192,10 +222,11 @@ def grafico_barras_produto(df, top_n=None):
     )
 
     fig.update_traces(
-        texttemplate='%{text:.0f}',
+        texttemplate='%{x:.0f}',
         textposition='inside',
         insidetextanchor='end',  # alinha à esquerda dentro da barra
-        textfont=dict(color='white')
+        textfont=dict(color='white'),
+        marker_color=cores_marcas(resumo['CRE_PRO_DESCRICAO'])
     )
 
     return fig
@@ -208,7 +239,8 @@ def grafico_financeiro_por_data(
     data_filtro: str | datetime | None = None,
 ) -> px.bar:
     """
-    Gráfico vertical de faturamento por cliente.
+    Gráfico vertical de faturamento por cliente, num único traço com no
+    máximo GRAFICO_MAX_MARCAS barras (os menores clientes somados em "Outros").
 
     ▸ Se `data_filtro` for informado → mostra somente esse dia.
     ▸ Caso contrário                 → considera os últimos `dias`.
@@ -223,56 +255,58 @@ def grafico_financeiro_por_data(
         return
 
     # --- Normalização --- #
-    df = df.copy()
-    df["NFI_DATA_EMISSAO"] = pd.to_datetime(df["NFI_DATA_EMISSAO"]).dt.normalize()
+    # Tipos já garantidos pelo schema da silver; só a data é normalizada
+    emissao = df["NFI_DATA_EMISSAO"].dt.normalize()
 
     valor_col = (
         "NFI_VALOR_TOTAL_NOTA"
         if "NFI_VALOR_TOTAL_NOTA" in df.columns
         else "NFI_VALOR_TOTAL_PRODUTO"
     )
-    df[valor_col] = pd.to_numeric(df[valor_col], errors="coerce").fillna(0)
 
     titulo = "Faturamento por Cliente"
     if data_filtro:
         data_filtro = pd.to_datetime(data_filtro).normalize()
-        df = df[df["NFI_DATA_EMISSAO"] == data_filtro]
+        df = df[emissao == data_filtro]
         
     else:
         limite = (
             datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             - timedelta(days=dias)
         )
-        df = df[df["NFI_DATA_EMISSAO"] >= limite]
+        df = df[emissao >= limite]
 
     if df.empty:
         st.warning("Nenhum dado encontrado para o filtro aplicado.")
         return
 
     dados = (
-        df.groupby("NFI_RAZAO", as_index=False)[valor_col]
+        df.groupby("NFI_RAZAO", as_index=False, observed=True)[valor_col]
         .sum()
         .rename(columns={"NFI_RAZAO": "Cliente", valor_col: "Valor_Total"})
         .sort_values("Valor_Total", ascending=False)
     )
+    dados = limitar_marcas(dados, "Cliente", "Valor_Total")
 
     fig = px.bar(
         dados,
         x="Cliente",
         y="Valor_Total",
-        text="Valor_Total",
-        color="Cliente",
         title=titulo,
         labels={"Valor_Total": "Valor Total (R$)", "Cliente": "Cliente"},
     )
-    fig.update_traces(texttemplate="R$ %{y:,.2f}", textposition="outside")
+    fig.update_traces(
+        texttemplate="R$ %{y:,.2f}",
+        textposition="outside",
+        marker_color=cores_marcas(dados["Cliente"]),
+    )
     fig.update_layout(
         xaxis_title="Cliente",
         yaxis_title="Valor Total (R$)",
         xaxis_tickangle=-15,
         height=500,
         margin=dict(l=0, r=0, t=50, b=0),
-        showlegend=True,
+        showlegend=False,
     )
 
     return fig
\ No newline at end of file
@@ -19,11 +19,8 @@ def grafico_pizza_produto(df):
     if not all(col in df.columns for col in cols_needed):
         raise ValueError("O DataFrame não possui todas as colunas necessárias.")
 
-    # Garantir que peso seja numérico
-    df['CRE_PESO_LIQUIDO'] = pd.to_numeric(df['CRE_PESO_LIQUIDO'], errors='coerce')
-
     # Agrupar por descrição do produto
-    resumo = df.groupby('CRE_PRO_DESCRICAO', as_index=False)['CRE_PESO_LIQUIDO'].sum()
+    resumo = df.groupby('CRE_PRO_DESCRICAO', as_index=False, observed=True)['CRE_PESO_LIQUIDO'].sum()
 
     # Ordenar para deixar maiores fatias destacadas
     resumo = resumo.sort_values('CRE_PESO_LIQUIDO', ascending=False)
@@ -1,42 +1,217 @@
+import tempfile
 import streamlit as st
 import pandas as pd
+import numpy as np
+from datetime import datetime
+from data.gold.exportacao import EXPORTACAO_MAX_MB, EXPORTACAO_XLSX_MAX_LINHAS, FORMATOS, exportar
 
+# Tabelas paginadas: a ordenação e o recorte da página são feitos no servidor
+# e só as linhas da página são formatadas e enviadas (em Arrow, via
+# st.dataframe), então o custo de exibir não cresce com o total de linhas.
+# A exportação percorre as mesmas linhas filtradas, na ordem escolhida, em
+# blocos (data/gold/exportacao.py).
 
-def exibir_tabela_resumida(df):
-    df_tabela = df[['CRE_ID', 'CRE_DATA_ENTRADA', 'CRE_PRODUTOR_NOME',
-                    'CRE_MOTORISTA_NOME', 'CRE_PRO_DESCRICAO', 'CRE_PESO_LIQUIDO']].copy()
-    df_tabela['CRE_DATA_ENTRADA'] = df_tabela['CRE_DATA_ENTRADA'].dt.strftime('%d/%m/%Y')
-
-    df_tabela = df_tabela.rename(columns={
-        'CRE_ID': 'Nº',
-        'CRE_DATA_ENTRADA': 'Entrada',
-        'CRE_PESO_LIQUIDO': 'Peso Líq (kg)',
-        'CRE_MOTORISTA_NOME': 'Motorista',
-        'CRE_PRO_DESCRICAO': 'Produto',
-        'CRE_PRODUTOR_NOME': 'Fornecedor'
-    })
+OPCOES_LINHAS_POR_PAGINA = [25, 50, 100, 250]
 
-    st.subheader("Lançamentos")
-    df_tabela = df_tabela.reset_index(drop=True)
-    st.table(df_tabela)
-    #st.dataframe(df_tabela, hide_index=True)
 
+def _chave_ordenacao(serie: pd.Series, crescente: bool) -> np.ndarray:
+    """
+    Chave numérica de ordenação: números e datas pelo valor, texto e
+    categorias em ordem alfabética, decrescente invertendo a chave e nulos
+    sempre no fim.
 
-def exibir_saidas(df):
-    df_tabela = df[['NFI_DATA_EMISSAO', 'NFI_CNPJ', 'NFI_RAZAO',
-                    'NFI_DATA_SAIDA', 'NFI_VALOR_TOTAL_NOTA']].copy()
-    df_tabela['NFI_DATA_EMISSAO'] = df_tabela['NFI_DATA_EMISSAO'].dt.strftime('%d/%m/%Y')
-    df_tabela['NFI_DATA_SAIDA'] = df_tabela['NFI_DATA_SAIDA'].dt.strftime('%d/%m/%Y')
-
-    df_tabela = df_tabela.rename(columns={
-        'NFI_DATA_EMISSAO': 'Emissão',
-        'NFI_CNPJ': 'CNPJ',
-        'NFI_RAZAO': 'Razão Social',
-        'NFI_DATA_SAIDA': 'Saída',
-        'NFI_VALOR_TOTAL_NOTA': 'Valor da Nota (R$)'
+    Categorias são ordenadas alfabeticamente de propósito, e não pela ordem
+    das categorias como em sort_values(): os deltas incrementais acrescentam
+    categorias novas no fim (alinhar_categorias), e a tabela deve continuar
+    em ordem alfabética.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        posicao = np.argsort(np.argsort(serie.cat.categories.astype(str)))
+        codigos = serie.cat.codes.to_numpy()
+        chave = posicao[codigos].astype('int64')
+        nulos = codigos < 0
+    elif pd.api.types.is_datetime64_any_dtype(serie):
+        chave = serie.to_numpy().view('int64').copy()
+        nulos = serie.isna().to_numpy()
+    elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        chave = serie.to_numpy(dtype='float64', na_value=np.nan)
+        nulos = np.isnan(chave)
+        chave = np.where(nulos, 0.0, chave)
+    else:
+        codigos, _ = pd.factorize(serie, sort=True)
+        chave = codigos.astype('int64')
+        nulos = codigos < 0
+
+    if not crescente:
+        chave = -chave if chave.dtype.kind == 'f' else ~chave
+    maximo = np.inf if chave.dtype.kind == 'f' else np.iinfo('int64').max
+    chave[nulos] = maximo
+    return chave
+
+
+def posicoes_pagina(serie: pd.Series, inicio: int, fim: int, crescente: bool = True) -> np.ndarray:
+    """
+    Posições das linhas [inicio, fim) da ordenação estável por `serie`, sem
+    ordenar o restante: np.partition acha o valor da última linha da página,
+    e só as linhas até ele são ordenadas. Empates ficam na ordem original
+    (ordenação estável). Páginas além da metade ordenam tudo.
+    """
+    n = len(serie)
+    fim = min(fim, n)
+    if inicio >= fim:
+        return np.array([], dtype='int64')
+
+    chave = _chave_ordenacao(serie, crescente)
+    if fim > n // 2:
+        return np.argsort(chave, kind='stable')[inicio:fim]
+
+    limite = np.partition(chave, fim - 1)[fim - 1]
+    menores = np.flatnonzero(chave < limite)
+    iguais = np.flatnonzero(chave == limite)[:fim - len(menores)]
+    selecionadas = np.concatenate([menores, iguais])
+    return selecionadas[np.argsort(chave[selecionadas], kind='stable')][inicio:fim]
+
+
+def exibir_tabela_paginada(df: pd.DataFrame, titulo: str, colunas: dict, datas: list, chave: str):
+    """
+    Exibe o DataFrame página a página, com ordenação escolhida pelo usuário.
+
+    Args:
+        df (pd.DataFrame): Dados filtrados (não são copiados nem formatados).
+        titulo (str): Subtítulo da tabela.
+        colunas (dict): Coluna do DataFrame -> rótulo exibido, na ordem de exibição.
+        datas (list): Colunas formatadas como dd/mm/aaaa.
+        chave (str): Prefixo das chaves dos widgets (único por tabela).
+    """
+    st.subheader(titulo)
+
+    col1, col2, col3, col4 = st.columns([0.3, 0.2, 0.2, 0.3])
+
+    with col1:
+        ordenar_por = st.selectbox(
+            "Ordenar por:",
+            [None, *colunas],
+            format_func=lambda coluna: "Padrão" if coluna is None else colunas[coluna],
+            key=f"{chave}_ordem"
+        )
+
+    with col2:
+        crescente = st.selectbox("Ordem:", ["Crescente", "Decrescente"], key=f"{chave}_sentido") == "Crescente"
+
+    with col3:
+        por_pagina = st.selectbox("Linhas por página:", OPCOES_LINHAS_POR_PAGINA, index=1, key=f"{chave}_linhas")
+
+    total = len(df)
+    paginas = max(1, -(-total // por_pagina))
+    if st.session_state.get(f"{chave}_pagina", 1) > paginas:
+        st.session_state[f"{chave}_pagina"] = paginas
+
+    with col4:
+        pagina = st.number_input("Página:", min_value=1, max_value=paginas, step=1, key=f"{chave}_pagina")
+
+    inicio = (pagina - 1) * por_pagina
+    fim = min(inicio + por_pagina, total)
+    if ordenar_por is None:
+        df_pagina = df.iloc[inicio:fim]
+    else:
+        df_pagina = df.iloc[posicoes_pagina(df[ordenar_por], inicio, fim, crescente)]
+
+    df_pagina = df_pagina[list(colunas)].assign(**{
+        coluna: df_pagina[coluna].dt.strftime('%d/%m/%Y') for coluna in datas
     })
+    st.dataframe(df_pagina.rename(columns=colunas), hide_index=True)
+    st.caption(f"Linhas {inicio + 1 if total else 0}–{fim} de {total} · página {pagina} de {paginas}")
+
+    exibir_exportacao(df, titulo, colunas, datas, chave, ordenar_por, crescente)
+
+
+def exibir_exportacao(df: pd.DataFrame, titulo: str, colunas: dict, datas: list, chave: str, ordenar_por, crescente: bool):
+    """
+    Gera o arquivo de todas as linhas filtradas quando o usuário pede e
+    oferece o download, com a vazão e a memória por bloco da geração. O botão
+    de download vale só para a execução em que o arquivo foi gerado.
+
+    O arquivo é gerado em disco (arquivo temporário), mas o Streamlit mantém o
+    conteúdo do download em memória; arquivos maiores que EXPORTACAO_MAX_MB
+    não são oferecidos. O XLSX, várias vezes mais lento que o CSV, é
+    limitado a EXPORTACAO_XLSX_MAX_LINHAS linhas.
+    """
+    col1, col2, _ = st.columns([0.15, 0.15, 0.7], vertical_alignment="bottom")
+
+    with col1:
+        formato = st.selectbox("Exportar como:", list(FORMATOS), format_func=str.upper, key=f"{chave}_formato")
+
+    acima_limite_xlsx = formato == 'xlsx' and len(df) > EXPORTACAO_XLSX_MAX_LINHAS
+
+    with col2:
+        gerar = st.button("Gerar arquivo", key=f"{chave}_exportar", disabled=df.empty or acima_limite_xlsx)
 
-    st.subheader("Saídas")
-    df_tabela = df_tabela.reset_index(drop=True)
-    st.table(df_tabela)
-    #st.dataframe(df_tabela, hide_index=True)
+    if acima_limite_xlsx:
+        st.warning(
+            f"XLSX limitado a {EXPORTACAO_XLSX_MAX_LINHAS:,} linhas ({len(df):,} filtradas): a planilha é "
+            "gerada várias vezes mais devagar que o CSV. Use CSV ou aplique mais filtros."
+        )
+    if not gerar:
+        return
+
+    ordem = None if ordenar_por is None else posicoes_pagina(df[ordenar_por], 0, len(df), crescente)
+    with tempfile.TemporaryFile() as arquivo:
+        resultado = exportar(df, formato, arquivo, colunas, datas, ordem, titulo)
+        tamanho_mb = resultado.tamanho_bytes / 1024 ** 2
+        if tamanho_mb <= EXPORTACAO_MAX_MB:
+            arquivo.seek(0)
+            st.download_button(
+                f"Baixar {titulo} ({formato.upper()})",
+                data=arquivo.read(),
+                file_name=f"{chave}_{datetime.now():%Y%m%d_%H%M%S}.{formato}",
+                mime=FORMATOS[formato],
+                on_click="ignore",
+                key=f"{chave}_baixar"
+            )
+        else:
+            st.warning(
+                f"O arquivo gerado tem {tamanho_mb:.1f} MB, acima do limite de download de "
+                f"{EXPORTACAO_MAX_MB:g} MB (o download é mantido em memória no servidor). "
+                "Aplique mais filtros para reduzir as linhas."
+            )
+
+    st.caption(
+        f"{resultado.linhas} linhas em {resultado.segundos:.1f} s "
+        f"({resultado.linhas_por_segundo:,.0f} linhas/s) · "
+        f"memória por bloco ~{resultado.pico_bloco_bytes / 1024 ** 2:.1f} MB (medida no 1º bloco) · "
+        f"arquivo {tamanho_mb:.1f} MB · o download fica em memória no servidor "
+        f"(limite {EXPORTACAO_MAX_MB:g} MB)"
+    )
+
+
+def exibir_tabela_resumida(df):
+    exibir_tabela_paginada(
+        df,
+        "Lançamentos",
+        {
+            'CRE_ID': 'Nº',
+            'CRE_DATA_ENTRADA': 'Entrada',
+            'CRE_PRODUTOR_NOME': 'Fornecedor',
+            'CRE_MOTORISTA_NOME': 'Motorista',
+            'CRE_PRO_DESCRICAO': 'Produto',
+            'CRE_PESO_LIQUIDO': 'Peso Líq (kg)'
+        },
+        datas=['CRE_DATA_ENTRADA'],
+        chave='lancamentos'
+    )
+
+
+def exibir_saidas(df):
+    exibir_tabela_paginada(
+        df,
+        "Saídas",
+        {
+            'NFI_DATA_EMISSAO': 'Emissão',
+            'NFI_CNPJ': 'CNPJ',
+            'NFI_RAZAO': 'Razão Social',
+            'NFI_DATA_SAIDA': 'Saída',
+            'NFI_VALOR_TOTAL_NOTA': 'Valor da Nota (R$)'
+        },
+        datas=['NFI_DATA_EMISSAO', 'NFI_DATA_SAIDA'],
+        chave='saidas'
+    )
@@ -0,0 +1,482 @@
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime, timedelta
+
+# Camada bronze em Parquet particionado por ano/mês:
+#   <caminho_base>/ano=2024/mes=05/part-00000.parquet
+#   <caminho_base>/sem_data/part-00000.parquet   (linhas sem data de partição)
+#   <caminho_base>/_manifest.json                (partições, arquivos e linhas)
+#   <caminho_base>/_chaves.parquet               (partição atual de cada chave)
+#   <caminho_base>/_deltas/00000001.parquet      (deltas incrementais, em ordem)
+#
+# Cada carga completa abre uma nova "geração" no manifesto; cada upsert
+# incremental grava também o próprio delta numerado em _deltas/, para que a
+# gold possa aplicar só as alterações desde a sua última carga (ler_deltas).
+#
+# O índice de chaves fica num Parquet à parte (e não no manifesto, que é lido
+# a cada verificação de versão): com ele, o upsert acha a partição anterior
+# de uma linha cuja data mudou de mês e a remove de lá. Os arquivos reescritos
+# pelo upsert são gravados ao lado e trocados com os.replace, então leitores
+# concorrentes veem a versão anterior ou a nova, nunca um arquivo pela metade.
+
+MANIFESTO = "_manifest.json"
+INDICE_CHAVES = "_chaves.parquet"
+PARTICAO_SEM_DATA = "sem_data"
+COMPRESSAO = "zstd"
+DIRETORIO_DELTAS = "_deltas"
+# Deltas mantidos em disco; consumidores mais atrasados recarregam tudo
+DELTAS_MANTIDOS = int(os.getenv("BRONZE_DELTAS_MANTIDOS", "500"))
+
+
+def caminho_manifesto(caminho_base: str) -> str:
+    return os.path.join(caminho_base, MANIFESTO)
+
+
+def carregar_manifesto(caminho_base: str) -> dict | None:
+    """
+    Retorna o manifesto da camada bronze, ou None se ela ainda não existir.
+    """
+    caminho = caminho_manifesto(caminho_base)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def idade_bronze(caminho_base: str) -> timedelta | None:
+    """
+    Tempo decorrido desde a última gravação da camada bronze da fonte, ou None
+    se ela ainda não existir.
+    """
+    manifesto = carregar_manifesto(caminho_base)
+    if manifesto is None:
+        return None
+    return datetime.now() - datetime.fromisoformat(manifesto["atualizado_em"])
+
+
+def _salvar_manifesto(caminho_base: str, manifesto: dict):
+    manifesto["total_linhas"] = sum(p["linhas"] for p in manifesto["particoes"].values())
+    manifesto["atualizado_em"] = datetime.now().isoformat()
+
+    caminho = caminho_manifesto(caminho_base)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def _novo_manifesto(coluna_particao: str, chave: str | None) -> dict:
+    return {
+        "formato": "parquet",
+        "compressao": COMPRESSAO,
+        "coluna_particao": coluna_particao,
+        "chave": chave,
+        "particoes": {},
+        "geracao": datetime.now().isoformat(),
+        "sequencia": 0,
+        "deltas": [],
+    }
+
+
+def _rotulos_particao(datas: pd.Series) -> pd.Series:
+    """Rótulo 'ano=AAAA/mes=MM' de cada linha (ou 'sem_data')."""
+    datas = pd.to_datetime(datas, errors="coerce")
+    rotulos = (
+        "ano=" + datas.dt.year.astype("Int64").astype(str)
+        + "/mes=" + datas.dt.month.astype("Int64").astype(str).str.zfill(2)
+    )
+    return rotulos.where(datas.notna(), PARTICAO_SEM_DATA)
+
+
+def _limites_particao(rotulo: str) -> tuple[str | None, str | None]:
+    """Intervalo [inicio, fim) coberto pela partição, em ISO."""
+    if rotulo == PARTICAO_SEM_DATA:
+        return None, None
+    ano, mes = (int(parte.split("=")[1]) for parte in rotulo.split("/"))
+    inicio = pd.Timestamp(year=ano, month=mes, day=1)
+    return inicio.isoformat(), (inicio + pd.offsets.MonthBegin(1)).isoformat()
+
+
+def _substituir_parquet(caminho: str, df: pd.DataFrame):
+    """Grava o Parquet num arquivo ao lado e o troca pelo atual (os.replace é atômico)."""
+    temporario = f"{caminho}.tmp"
+    df.to_parquet(temporario, index=False, compression=COMPRESSAO)
+    os.replace(temporario, caminho)
+
+
+def _escrever_particao(caminho_base: str, rotulo: str, df: pd.DataFrame, sequencia: int) -> dict:
+    os.makedirs(os.path.join(caminho_base, rotulo), exist_ok=True)
+    arquivo = os.path.join(rotulo, "part-00000.parquet")
+    _substituir_parquet(os.path.join(caminho_base, arquivo), df)
+
+    inicio, fim = _limites_particao(rotulo)
+    return {"arquivos": [arquivo], "linhas": int(len(df)), "inicio": inicio, "fim": fim, "sequencia": sequencia}
+
+
+def _indice_chaves(chaves: pd.Series, rotulos: pd.Series) -> pd.DataFrame:
+    return pd.DataFrame({"chave": chaves.to_numpy(), "particao": rotulos.to_numpy()})
+
+
+def _carregar_indice_chaves(caminho_base: str, manifesto: dict) -> pd.DataFrame:
+    """
+    Partição atual de cada chave (colunas chave e particao). Bronzes gravados
+    antes do índice são indexados lendo só a coluna da chave das partições.
+    """
+    caminho = os.path.join(caminho_base, INDICE_CHAVES)
+    if os.path.exists(caminho):
+        return pd.read_parquet(caminho)
+
+    chave = manifesto["chave"]
+    partes = [
+        pd.DataFrame({"chave": _ler_arquivos(caminho_base, particao["arquivos"], [chave])[chave], "particao": rotulo})
+        for rotulo, particao in manifesto["particoes"].items() if particao["linhas"]
+    ]
+    if not partes:
+        return pd.DataFrame({"chave": pd.Series(dtype="int64"), "particao": pd.Series(dtype=str)})
+    return pd.concat(partes, ignore_index=True)
+
+
+def _como_tabela(lote: pa.Table | pd.DataFrame) -> pa.Table:
+    if isinstance(lote, pa.Table):
+        return lote
+    return pa.Table.from_pandas(lote, preserve_index=False)
+
+
+def _como_dataframe(lote: pa.Table | pd.DataFrame) -> pd.DataFrame:
+    if isinstance(lote, pa.Table):
+        return lote.to_pandas()
+    return lote
+
+
+class EscritorParticionado:
+    """
+    Grava uma carga completa da fonte em Parquet particionado, lote a lote.
+
+    Cada partição tem um único arquivo aberto durante a carga e cada lote
+    recebido vira um row group nele, então a memória usada depende apenas do
+    tamanho do lote (mais a chave e a partição de cada linha, para o índice
+    de chaves). A carga é gravada em um diretório temporário que só
+    substitui o bronze atual em finalizar(); em caso de erro o diretório
+    temporário é descartado e o bronze anterior permanece intacto.
+
+    Uso:
+        with EscritorParticionado(caminho, "CRE_DATA_ENTRADA", "CRE_ID") as escritor:
+            for lote in ler_em_lotes(conn, QUERY):
+                escritor.escrever(lote)
+    """
+
+    def __init__(self, caminho_base: str, coluna_particao: str, chave: str | None = None):
+        self.caminho_base = caminho_base.rstrip(os.sep)
+        self.temporario = f"{self.caminho_base}.tmp"
+        self.manifesto = _novo_manifesto(coluna_particao, chave)
+        self._escritores: dict[str, pq.ParquetWriter] = {}
+        self._linhas: dict[str, int] = {}
+        self._chaves: list[pd.DataFrame] = []
+        self._schema: pa.Schema | None = None
+
+        if os.path.isdir(self.temporario):
+            shutil.rmtree(self.temporario)
+        os.makedirs(self.temporario)
+
+    def escrever(self, lote: pa.Table | pd.DataFrame):
+        """Distribui um lote entre as partições de ano/mês."""
+        tabela = _como_tabela(lote)
+        if self._schema is None:
+            self._schema = tabela.schema
+        elif tabela.schema != self._schema:
+            tabela = tabela.cast(self._schema)
+
+        rotulos = _rotulos_particao(tabela.column(self.manifesto["coluna_particao"]).to_pandas())
+        if self.manifesto["chave"]:
+            self._chaves.append(_indice_chaves(tabela.column(self.manifesto["chave"]).to_pandas(), rotulos))
+        for rotulo, posicoes in rotulos.groupby(rotulos).indices.items():
+            escritor = self._escritores.get(rotulo)
+            if escritor is None:
+                os.makedirs(os.path.join(self.temporario, rotulo), exist_ok=True)
+                escritor = pq.ParquetWriter(
+                    os.path.join(self.temporario, rotulo, "part-00000.parquet"),
+                    self._schema, compression=COMPRESSAO
+                )
+                self._escritores[rotulo] = escritor
+                self._linhas[rotulo] = 0
+            escritor.write_table(tabela.take(posicoes))
+            self._linhas[rotulo] += len(posicoes)
+
+    def finalizar(self) -> dict:
+        """Fecha os arquivos, grava o manifesto e publica a nova carga."""
+        for escritor in self._escritores.values():
+            escritor.close()
+
+        for rotulo in sorted(self._escritores):
+            inicio, fim = _limites_particao(rotulo)
+            self.manifesto["particoes"][rotulo] = {
+                "arquivos": [os.path.join(rotulo, "part-00000.parquet")],
+                "linhas": self._linhas[rotulo],
+                "inicio": inicio,
+                "fim": fim,
+                "sequencia": 0,
+            }
+        if self.manifesto["chave"]:
+            indice = pd.concat(self._chaves, ignore_index=True) if self._chaves else _indice_chaves(pd.Series(), pd.Series())
+            indice.to_parquet(os.path.join(self.temporario, INDICE_CHAVES), index=False, compression=COMPRESSAO)
+        _salvar_manifesto(self.temporario, self.manifesto)
+
+        antigo = f"{self.caminho_base}.old"
+        if os.path.isdir(self.caminho_base):
+            os.replace(self.caminho_base, antigo)
+        os.replace(self.temporario, self.caminho_base)
+        shutil.rmtree(antigo, ignore_errors=True)
+
+        return self.manifesto
+
+    def abortar(self):
+        """Descarta a carga em andamento sem tocar no bronze atual."""
+        for escritor in self._escritores.values():
+            try:
+                escritor.close()
+            except Exception:
+                pass
+        shutil.rmtree(self.temporario, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, traceback):
+        if tipo_excecao is None:
+            self.finalizar()
+        else:
+            self.abortar()
+        return False
+
+
+def escrever_particionado(
+    df: pd.DataFrame,
+    caminho_base: str,
+    coluna_particao: str,
+    chave: str | None = None
+) -> dict:
+    """
+    Reescreve toda a camada bronze da fonte em Parquet particionado por
+    ano/mês de `coluna_particao`.
+
+    A nova versão é gravada em um diretório temporário e só então substitui a
+    anterior, para que leitores nunca vejam uma carga completa pela metade.
+
+    Args:
+        df (pd.DataFrame): Dados extraídos da fonte.
+        caminho_base (str): Diretório da fonte na camada bronze.
+        coluna_particao (str): Coluna de data usada no particionamento.
+        chave (str, opcional): Chave primária usada nos upserts incrementais.
+
+    Retorna:
+        dict: Manifesto gravado.
+    """
+    escritor = EscritorParticionado(caminho_base, coluna_particao, chave)
+    with escritor:
+        escritor.escrever(df)
+    return escritor.manifesto
+
+
+def upsert_particionado(df_delta: pa.Table | pd.DataFrame, caminho_base: str) -> dict:
+    """
+    Mescla um delta incremental na camada bronze, reescrevendo apenas as
+    partições tocadas pelo delta. Linhas com a mesma chave do manifesto são
+    substituídas pela versão do delta.
+
+    Uma linha cuja data de partição mudou (de um mês para outro, ou de sem
+    data para datada) é removida da partição anterior, localizada pelo
+    índice de chaves, que também é reescrita. Cada partição reescrita recebe
+    a sequência do delta, para que a gold saiba quais releer.
+
+    Um delta vazio não grava nada: nem arquivo de delta nem manifesto, para
+    não mudar a versão dos dados (ver data/gold/snapshot.py).
+    """
+    manifesto = carregar_manifesto(caminho_base)
+    if manifesto is None:
+        raise FileNotFoundError(f"Camada bronze inexistente em {caminho_base}.")
+
+    df_delta = _como_dataframe(df_delta)
+    if df_delta.empty:
+        return manifesto
+    chave = manifesto["chave"]
+    sequencia = manifesto.get("sequencia", 0) + 1
+
+    df_unico = df_delta.drop_duplicates(subset=[chave], keep="last")
+    chaves = df_unico[chave]
+    rotulos = _rotulos_particao(df_unico[manifesto["coluna_particao"]])
+
+    # Partições de destino e as de origem das linhas do delta
+    indice = _carregar_indice_chaves(caminho_base, manifesto)
+    alteradas = indice["chave"].isin(chaves)
+    tocadas = set(rotulos) | set(indice.loc[alteradas, "particao"])
+
+    for rotulo in sorted(tocadas):
+        df_particao = df_unico[(rotulos == rotulo).to_numpy()]
+        existente = manifesto["particoes"].get(rotulo)
+        if existente:
+            df_atual = _ler_arquivos(caminho_base, existente["arquivos"])
+            df_particao = pd.concat([df_atual[~df_atual[chave].isin(chaves)], df_particao], ignore_index=True)
+        manifesto["particoes"][rotulo] = _escrever_particao(caminho_base, rotulo, df_particao, sequencia)
+
+    _substituir_parquet(
+        os.path.join(caminho_base, INDICE_CHAVES),
+        pd.concat([indice[~alteradas], _indice_chaves(chaves, rotulos)], ignore_index=True)
+    )
+    _registrar_delta(caminho_base, manifesto, df_delta)
+    _salvar_manifesto(caminho_base, manifesto)
+    return manifesto
+
+
+def _registrar_delta(caminho_base: str, manifesto: dict, df_delta: pd.DataFrame):
+    """Grava o delta com o próximo número de sequência e descarta os mais antigos."""
+    # Manifestos anteriores aos deltas: abre uma geração nova
+    manifesto.setdefault("geracao", datetime.now().isoformat())
+    sequencia = manifesto.get("sequencia", 0) + 1
+
+    arquivo = os.path.join(DIRETORIO_DELTAS, f"{sequencia:08d}.parquet")
+    os.makedirs(os.path.join(caminho_base, DIRETORIO_DELTAS), exist_ok=True)
+    df_delta.to_parquet(os.path.join(caminho_base, arquivo), index=False, compression=COMPRESSAO)
+
+    deltas = manifesto.get("deltas", []) + [{"sequencia": sequencia, "arquivo": arquivo, "linhas": int(len(df_delta))}]
+    for antigo in deltas[:-DELTAS_MANTIDOS]:
+        try:
+            os.remove(os.path.join(caminho_base, antigo["arquivo"]))
+        except FileNotFoundError:
+            pass
+    manifesto["deltas"] = deltas[-DELTAS_MANTIDOS:]
+    manifesto["sequencia"] = sequencia
+
+
+def posicao_bronze(manifesto: dict) -> dict:
+    """Geração e último delta do manifesto, para ler_deltas()."""
+    return {"geracao": manifesto.get("geracao"), "sequencia": manifesto.get("sequencia", 0)}
+
+
+def ler_deltas(
+    caminho_base: str,
+    posicao: dict | None,
+    colunas: list[str] | None = None
+) -> tuple[dict, pd.DataFrame] | None:
+    """
+    Linhas gravadas por upsert_particionado() depois de `posicao` (ver
+    posicao_bronze), na versão mais recente de cada chave.
+
+    Retorna:
+        tuple (nova posição, DataFrame), ou None quando os deltas não cobrem
+        o intervalo: bronze inexistente, nova carga completa (outra geração)
+        ou deltas já descartados. Nesses casos o consumidor recarrega tudo.
+    """
+    manifesto = carregar_manifesto(caminho_base)
+    if manifesto is None or posicao is None or manifesto.get("geracao") != posicao["geracao"]:
+        return None
+
+    desde = posicao["sequencia"]
+    deltas = [delta for delta in manifesto.get("deltas", []) if delta["sequencia"] > desde]
+    if manifesto.get("sequencia", 0) - desde != len(deltas):
+        return None
+
+    if not deltas:
+        return posicao_bronze(manifesto), pd.DataFrame(columns=colunas or [])
+
+    df = _ler_arquivos(caminho_base, [delta["arquivo"] for delta in deltas], colunas)
+    if manifesto["chave"]:
+        df = df.drop_duplicates(subset=[manifesto["chave"]], keep="last")
+    return posicao_bronze(manifesto), df.reset_index(drop=True)
+
+
+def _ler_arquivos(caminho_base: str, arquivos: list[str], colunas: list[str] | None = None) -> pd.DataFrame:
+    return pd.concat(
+        [pd.read_parquet(os.path.join(caminho_base, arquivo), columns=colunas) for arquivo in arquivos],
+        ignore_index=True
+    )
+
+
+def selecionar_particoes(manifesto: dict, inicio=None, fim=None) -> list[str]:
+    """
+    Partições do manifesto que intersectam o intervalo [inicio, fim).
+    Sem intervalo, retorna todas (inclusive as linhas sem data).
+    """
+    if inicio is None and fim is None:
+        return sorted(manifesto["particoes"])
+
+    inicio = pd.Timestamp(inicio) if inicio is not None else None
+    fim = pd.Timestamp(fim) if fim is not None else None
+
+    selecionadas = []
+    for rotulo, particao in sorted(manifesto["particoes"].items()):
+        if particao["inicio"] is None:
+            continue
+        if fim is not None and pd.Timestamp(particao["inicio"]) >= fim:
+            continue
+        if inicio is not None and pd.Timestamp(particao["fim"]) <= inicio:
+            continue
+        selecionadas.append(rotulo)
+    return selecionadas
+
+
+def arquivos_bronze(caminho_base: str, inicio=None, fim=None, absolutos: bool = True) -> list[str]:
+    """
+    Arquivos Parquet das partições que intersectam [inicio, fim) da coluna de
+    partição, para leitores externos (ex: o motor DuckDB da gold).
+    """
+    manifesto = carregar_manifesto(caminho_base)
+    if manifesto is None:
+        raise FileNotFoundError(f"Camada bronze inexistente em {caminho_base}.")
+
+    arquivos = [
+        arquivo
+        for rotulo in selecionar_particoes(manifesto, inicio, fim)
+        for arquivo in manifesto["particoes"][rotulo]["arquivos"]
+    ]
+    if absolutos:
+        return [os.path.abspath(os.path.join(caminho_base, arquivo)) for arquivo in arquivos]
+    return arquivos
+
+
+def ler_particoes(caminho_base: str, rotulos: list[str], colunas: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lê da camada bronze apenas as partições informadas (rótulos do manifesto,
+    ex: 'ano=2024/mes=05' ou 'sem_data'). Rótulos inexistentes são ignorados.
+    """
+    manifesto = carregar_manifesto(caminho_base)
+    if manifesto is None:
+        raise FileNotFoundError(f"Camada bronze inexistente em {caminho_base}.")
+
+    arquivos = [
+        arquivo
+        for rotulo in rotulos if rotulo in manifesto["particoes"]
+        for arquivo in manifesto["particoes"][rotulo]["arquivos"]
+    ]
+    if not arquivos:
+        return pd.DataFrame(columns=colunas or [])
+
+    return _ler_arquivos(caminho_base, arquivos, colunas)
+
+
+def ler_bronze(
+    caminho_base: str,
+    colunas: list[str] | None = None,
+    inicio=None,
+    fim=None
+) -> pd.DataFrame:
+    """
+    Lê da camada bronze apenas as partições e colunas necessárias.
+
+    Args:
+        caminho_base (str): Diretório da fonte na camada bronze.
+        colunas (list, opcional): Colunas a carregar. Se None, todas.
+        inicio, fim (datetime, opcional): Intervalo [inicio, fim) da coluna de
+            partição. Se ambos forem None, lê todas as partições.
+
+    Retorna:
+        pd.DataFrame com as linhas das partições selecionadas.
+    """
+    arquivos = arquivos_bronze(caminho_base, inicio, fim, absolutos=False)
+    if not arquivos:
+        return pd.DataFrame(columns=colunas or [])
+
+    return _ler_arquivos(caminho_base, arquivos, colunas)
@@ -0,0 +1,176 @@
+import os
+import queue
+import threading
+import time
+import pyodbc
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# Ponto único de acesso ao SQL Server: jobs e camada silver pegam conexões
+# daqui em vez de abrir (e esquecer abertas) conexões próprias.
+
+load_dotenv()
+
+DB_DRIVER = os.getenv("DB_DRIVER", "ODBC Driver 17 for SQL Server")
+DB_SERVER = os.getenv("DB_SERVER")
+DB_DATABASE = os.getenv("DB_DATABASE")
+DB_USER = os.getenv("DB_USER")
+DB_PASSWORD = os.getenv("DB_PASSWORD")
+
+# Máximo de conexões simultâneas do processo
+POOL_TAMANHO = int(os.getenv("DB_POOL_TAMANHO", "4"))
+# Segundos aguardando uma conexão livre antes de desistir
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Conexões ociosas há mais tempo que isso passam por um health check
+POOL_VERIFICAR_APOS = float(os.getenv("DB_POOL_VERIFICAR_APOS", "60"))
+# Conexões mais velhas que isso são descartadas e reabertas
+POOL_MAX_IDADE = float(os.getenv("DB_POOL_MAX_IDADE", "1800"))
+# Timeouts de login e de execução de consulta, em segundos
+TIMEOUT_LOGIN = int(os.getenv("DB_TIMEOUT_LOGIN", "15"))
+TIMEOUT_CONSULTA = int(os.getenv("DB_TIMEOUT_CONSULTA", "600"))
+
+# Pooling do driver ODBC; precisa ser ligado antes da primeira conexão
+pyodbc.pooling = True
+
+
+def string_conexao() -> str:
+    return (
+        f"DRIVER={{{DB_DRIVER}}};"
+        f"SERVER={DB_SERVER};"
+        f"DATABASE={DB_DATABASE};"
+        f"UID={DB_USER};"
+        f"PWD={DB_PASSWORD}"
+    )
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões pyodbc reaproveitadas entre sessões do dashboard
+    e jobs do mesmo processo.
+
+    - No máximo `tamanho` conexões ficam em uso ao mesmo tempo; quem passar do
+      limite espera até `timeout` segundos por uma conexão livre.
+    - Conexões ociosas por mais de `verificar_apos` segundos são testadas com
+      `select 1` antes de voltar ao uso; as que falham ou passaram de
+      `max_idade` são fechadas e reabertas.
+    - Uma conexão que levantou erro do driver é descartada em vez de devolvida.
+    """
+
+    def __init__(
+        self,
+        tamanho: int = POOL_TAMANHO,
+        timeout: float = POOL_TIMEOUT,
+        verificar_apos: float = POOL_VERIFICAR_APOS,
+        max_idade: float = POOL_MAX_IDADE
+    ):
+        self.timeout = timeout
+        self.verificar_apos = verificar_apos
+        self.max_idade = max_idade
+        self._vagas = threading.BoundedSemaphore(tamanho)
+        # (conexão, criada_em, devolvida_em); LIFO mantém as conexões mais quentes em uso
+        self._livres: queue.LifoQueue = queue.LifoQueue()
+
+    def _conectar(self):
+        conn = pyodbc.connect(string_conexao(), timeout=TIMEOUT_LOGIN, autocommit=True)
+        conn.timeout = TIMEOUT_CONSULTA
+        return conn, time.monotonic()
+
+    @staticmethod
+    def _fechar(conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+    @staticmethod
+    def _saudavel(conn) -> bool:
+        try:
+            conn.cursor().execute("select 1").fetchone()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def adquirir(self):
+        """
+        Retorna (conexão, criada_em). Prefira o context manager conexao(),
+        que garante a devolução.
+        """
+        if not self._vagas.acquire(timeout=self.timeout):
+            raise TimeoutError(
+                f"Nenhuma conexão livre com o SQL Server após {self.timeout:.0f}s.")
+        try:
+            agora = time.monotonic()
+            while True:
+                try:
+                    conn, criada_em, devolvida_em = self._livres.get_nowait()
+                except queue.Empty:
+                    return self._conectar()
+
+                if agora - criada_em > self.max_idade:
+                    self._fechar(conn)
+                elif agora - devolvida_em > self.verificar_apos and not self._saudavel(conn):
+                    self._fechar(conn)
+                else:
+                    return conn, criada_em
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    def liberar(self, conn, criada_em: float, descartar: bool = False):
+        """Devolve a conexão ao pool (ou a fecha, se `descartar`)."""
+        try:
+            if descartar:
+                self._fechar(conn)
+            else:
+                self._livres.put((conn, criada_em, time.monotonic()))
+        finally:
+            self._vagas.release()
+
+    @contextmanager
+    def conexao(self):
+        conn, criada_em = self.adquirir()
+        descartar = False
+        try:
+            yield conn
+        except pyodbc.Error:
+            descartar = True
+            raise
+        finally:
+            self.liberar(conn, criada_em, descartar)
+
+    def fechar(self):
+        """Fecha todas as conexões ociosas."""
+        while True:
+            try:
+                conn, _, _ = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._fechar(conn)
+
+
+_pool: PoolConexoes | None = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool() -> PoolConexoes:
+    """Pool compartilhado pelo processo, criado no primeiro uso."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolConexoes()
+    return _pool
+
+
+@contextmanager
+def conexao():
+    """
+    Empresta uma conexão do pool compartilhado, devolvendo-a ao final do bloco
+    mesmo em caso de erro.
+
+    Uso:
+        with conexao() as conn:
+            df = ler_sql_colunar(conn, QUERY)
+    """
+    with obter_pool().conexao() as conn:
+        yield conn
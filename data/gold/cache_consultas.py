@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# Cache LRU dos resultados de consulta do dashboard (recortes filtrados,
+# totais e figuras), compartilhado por todas as sessões do processo.
+#
+# A chave é o estado dos filtros junto com a identidade do snapshot, então
+# uma combinação já calculada para qualquer usuário é reaproveitada até a
+# próxima versão dos dados. O limite é de memória (CACHE_CONSULTAS_MB): os
+# itens menos usados são descartados quando o total estimado passa dele.
+
+CACHE_CONSULTAS_MB = float(os.getenv("CACHE_CONSULTAS_MB", "256"))
+
+
+def tamanho_bytes(valor) -> int:
+    """
+    Estimativa da memória ocupada pelo valor: DataFrames pela soma das
+    colunas, figuras Plotly pelo tamanho do JSON e coleções pela soma dos
+    itens. Fatias sem cópia do snapshot contam como se fossem cópias.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, (tuple, list)):
+        return sum(tamanho_bytes(item) for item in valor)
+    if isinstance(valor, dict):
+        return sum(tamanho_bytes(item) for item in valor.values())
+    if hasattr(valor, "to_json"):
+        return len(valor.to_json())
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """
+    Cache LRU limitado por memória, seguro entre threads.
+
+    Uso:
+        valor, acerto = cache.obter(chave, lambda: calcular(...))
+
+    Args:
+        max_bytes (int): Memória máxima estimada dos itens guardados. Itens
+            maiores que o limite são calculados mas não guardados.
+    """
+
+    def __init__(self, max_bytes: int = int(CACHE_CONSULTAS_MB * 1024 ** 2)):
+        self.max_bytes = max_bytes
+        self._itens: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._versao = None
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def obter(self, chave: Hashable, calcular: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Valor da chave, calculado com `calcular` (fora do lock) se ausente.
+
+        Retorna:
+            tuple (valor, acerto), com acerto True quando veio do cache.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[0], True
+            self.falhas += 1
+
+        valor = calcular()
+        tamanho = tamanho_bytes(valor)
+        if tamanho > self.max_bytes:
+            return valor, False
+
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.max_bytes:
+                _, (_, descartado) = self._itens.popitem(last=False)
+                self._bytes -= descartado
+                self.descartes += 1
+        return valor, False
+
+    def definir_versao(self, versao: Hashable):
+        """
+        Descarta tudo quando a versão dos dados muda, para que os itens da
+        versão anterior não mantenham o snapshot antigo em memória.
+        """
+        with self._lock:
+            if versao == self._versao:
+                return
+            self._versao = versao
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self) -> dict:
+        """Acertos, falhas, descartes, itens e memória estimada (bytes)."""
+        with self._lock:
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "descartes": self.descartes,
+                "itens": len(self._itens),
+                "bytes": self._bytes,
+            }
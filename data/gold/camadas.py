@@ -0,0 +1,272 @@
+import os
+import copy
+import threading
+import pandas as pd
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable
+from data.bronze.bronze_store import carregar_manifesto, selecionar_particoes, posicao_bronze, PARTICAO_SEM_DATA
+from data.gold.indices import IndiceSnapshot
+
+# Armazenamento da gold em camadas quente/fria.
+#
+# A janela recente (JANELA_QUENTE_DIAS) fica residente no snapshot. O histórico
+# anterior fica no bronze e é carregado por partição (mês) só quando um
+# período o alcança ("Ano Atual", "Todos", uma data específica antiga), com no
+# máximo PARTICOES_FRIAS_MAX partições em memória, descartadas por LRU. Assim a
+# memória residente e o tempo de carga não crescem com os anos de histórico.
+#
+# A camada quente guarda as linhas com data >= corte (meia-noite de hoje menos
+# a janela); cada partição fria guarda apenas as linhas com data < corte, e a
+# partição sem_data as linhas sem data. As camadas são disjuntas e ordenadas
+# da mais recente para a mais antiga, então concatenar os resultados
+# filtrados de cada uma preserva a ordem do snapshot completo.
+#
+# Só funciona quando o bronze está particionado pela própria coluna de data
+# indexada; caso contrário (ou com JANELA_QUENTE_DIAS=0, ou sem bronze), tudo
+# fica na camada quente, como antes.
+#
+# Com o bronze, o armazém guarda a posição dos deltas incrementais no momento
+# da carga, e aplicar_delta() devolve um armazém novo com só as alterações
+# desde então mescladas na camada quente (as partições frias tocadas pelo
+# delta são descartadas e relidas sob demanda).
+#
+# As opções dos filtros (valores()) cobrem o histórico completo: na carga, o
+# armazém lê do bronze só as colunas categóricas das partições frias e guarda
+# os valores distintos de cada uma. Após um delta, só as partições
+# reescritas são relidas.
+
+JANELA_QUENTE_DIAS = int(os.getenv("JANELA_QUENTE_DIAS", "45"))
+PARTICOES_FRIAS_MAX = int(os.getenv("PARTICOES_FRIAS_MAX", "24"))
+
+
+class ArmazemCamadas:
+    """
+    Dados de uma fonte divididos em camada quente (residente) e partições
+    frias (carregadas sob demanda, com LRU).
+
+    Args:
+        caminho_bronze (str): Diretório da fonte na camada bronze (None quando
+            o bronze não deve ser usado; tudo fica na camada quente).
+        coluna_data (str): Coluna de data dos filtros (e das partições).
+        ler_particoes (callable): Rótulos de partição -> DataFrame da silver.
+        ler_tudo (callable): Carga completa, usada quando não há camadas.
+        montar (callable): DataFrame -> dict nome -> IndiceSnapshot.
+        janela_dias (int): Dias da camada quente (0 desliga as camadas).
+        max_frias (int): Máximo de partições frias em memória.
+        quente (tuple, opcional): (DataFrame, corte) de uma camada quente já
+            carregada (ex: snapshot persistido); evita reler o bronze.
+        ler_delta (callable, opcional): Posição -> (nova posição, chaves
+            alteradas, silver das linhas novas) ou None (ver get_delta na silver).
+        mesclar (callable, opcional): (dados montados, chaves, linhas novas)
+            -> dados montados com o delta aplicado.
+        posicao (dict, opcional): Posição dos deltas da camada `quente`.
+        ler_valores (callable, opcional): (rótulos, colunas) -> DataFrame só
+            com essas colunas das linhas das partições (ver get_valores na
+            silver), para as opções dos filtros das partições frias.
+    """
+
+    def __init__(
+        self,
+        caminho_bronze: str | None,
+        coluna_data: str,
+        ler_particoes: Callable[[list[str]], pd.DataFrame],
+        ler_tudo: Callable[[], pd.DataFrame],
+        montar: Callable[[pd.DataFrame], dict],
+        janela_dias: int = JANELA_QUENTE_DIAS,
+        max_frias: int = PARTICOES_FRIAS_MAX,
+        hoje=None,
+        quente: tuple[pd.DataFrame, pd.Timestamp | None] | None = None,
+        ler_delta: Callable[[dict], tuple | None] | None = None,
+        mesclar: Callable[[dict, pd.Series, pd.DataFrame], dict] | None = None,
+        posicao: dict | None = None,
+        ler_valores: Callable[[list[str], list[str]], pd.DataFrame] | None = None
+    ):
+        self.coluna_data = coluna_data
+        self._caminho_bronze = caminho_bronze
+        self._ler_particoes = ler_particoes
+        self._montar = montar
+        self._ler_delta = ler_delta
+        self._mesclar = mesclar
+        self._ler_valores = ler_valores
+        self._valores_frios: dict[str, dict[str, list]] = {}
+        self._janela_dias = janela_dias
+        self._max_frias = max_frias
+        self._frias: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+        manifesto = carregar_manifesto(caminho_bronze) if caminho_bronze else None
+        if quente is not None:
+            df, corte = quente
+            self.corte = pd.Timestamp(corte) if corte is not None and manifesto is not None else None
+            self._particoes = manifesto["particoes"] if self.corte is not None else {}
+            self.posicao = posicao if manifesto is not None else None
+            self.quente = montar(df)
+            self._valores_frios = self._listar_valores_frios()
+            return
+
+        self.posicao = posicao_bronze(manifesto) if manifesto is not None else None
+        if janela_dias <= 0 or manifesto is None or manifesto.get("coluna_particao") != coluna_data:
+            self.corte = None
+            self._particoes = {}
+            self.quente = montar(ler_tudo())
+            return
+
+        self.corte = pd.Timestamp(hoje or datetime.now()).normalize() - pd.Timedelta(days=janela_dias)
+        self._particoes = manifesto["particoes"]
+        quentes = [
+            rotulo for rotulo, particao in self._particoes.items()
+            if particao["fim"] is not None and pd.Timestamp(particao["fim"]) > self.corte
+        ]
+        df = ler_particoes(quentes)
+        self.quente = montar(df[df[coluna_data] >= self.corte])
+        self._valores_frios = self._listar_valores_frios()
+
+    def _listar_valores_frios(self, anteriores: dict | None = None, particoes_anteriores: dict | None = None) -> dict:
+        """
+        Rótulo -> coluna categórica -> valores distintos, para cada partição
+        fria. As partições cuja entrada no manifesto não mudou reaproveitam
+        os valores de `anteriores`; as demais são lidas (só essas colunas).
+        """
+        if self.corte is None or self._ler_valores is None:
+            return {}
+
+        colunas = sorted({coluna for indice in self.quente.values() for coluna in indice.categorias})
+        valores = {}
+        for rotulo in self.rotulos_frios():
+            if anteriores and rotulo in anteriores and self._particoes.get(rotulo) == particoes_anteriores.get(rotulo):
+                valores[rotulo] = anteriores[rotulo]
+                continue
+            df = self._ler_valores([rotulo], colunas)
+            valores[rotulo] = {coluna: pd.unique(df[coluna].dropna()).tolist() for coluna in colunas}
+        return valores
+
+    def rotulos_frios(self, inicio=None, fim=None) -> list[str]:
+        """Partições frias necessárias para [inicio, fim), da mais recente à mais antiga."""
+        if self.corte is None or (inicio is not None and inicio >= self.corte):
+            return []
+
+        if inicio is None and fim is None:
+            rotulos = [
+                rotulo for rotulo, particao in self._particoes.items()
+                if particao["inicio"] is None or pd.Timestamp(particao["inicio"]) < self.corte
+            ]
+        else:
+            fim_frio = self.corte if fim is None else min(pd.Timestamp(fim), self.corte)
+            rotulos = selecionar_particoes({"particoes": self._particoes}, inicio, fim_frio)
+
+        datados = sorted((r for r in rotulos if r != PARTICAO_SEM_DATA), reverse=True)
+        return datados + [r for r in rotulos if r == PARTICAO_SEM_DATA]
+
+    def particao(self, rotulo: str) -> dict:
+        """Dados montados de uma partição fria, carregando-a se preciso (LRU)."""
+        with self._lock:
+            if rotulo in self._frias:
+                self._frias.move_to_end(rotulo)
+                return self._frias[rotulo]
+
+            df = self._ler_particoes([rotulo])
+            if rotulo != PARTICAO_SEM_DATA:
+                df = df[df[self.coluna_data] < self.corte]
+            dados = self._montar(df)
+
+            self._frias[rotulo] = dados
+            while len(self._frias) > self._max_frias:
+                self._frias.popitem(last=False)
+            return dados
+
+    def valores_frios(self, coluna: str) -> list:
+        """Valores distintos da coluna categórica nas partições frias (carregadas ou não)."""
+        return list(dict.fromkeys(valor for valores in self._valores_frios.values() for valor in valores[coluna]))
+
+    def indice(self, nome: str) -> "IndiceEmCamadas":
+        return IndiceEmCamadas(self, nome)
+
+    def indices(self) -> dict:
+        """Nome -> IndiceEmCamadas de cada objeto montado."""
+        return {nome: self.indice(nome) for nome in self.quente}
+
+    def aplicar_delta(self) -> "ArmazemCamadas | None":
+        """
+        Novo armazém com as alterações gravadas no bronze desde a carga: as
+        linhas alteradas saem da camada quente, as novas da janela entram por
+        `mesclar`, e as partições frias carregadas que o delta reescreveu no
+        bronze são descartadas. Este armazém não é alterado (snapshots em uso
+        continuam consistentes).
+
+        Retorna None quando o delta não está disponível (sem bronze, nova
+        carga completa, deltas descartados) ou quando a janela quente já
+        cresceu além do dobro do configurado; nesses casos, recarregue tudo.
+        """
+        if self.posicao is None or self._ler_delta is None or self._mesclar is None:
+            return None
+        if self.corte is not None:
+            hoje = pd.Timestamp(datetime.now()).normalize()
+            if self.corte < hoje - pd.Timedelta(days=2 * self._janela_dias):
+                return None
+
+        delta = self._ler_delta(self.posicao)
+        if delta is None:
+            return None
+        posicao, chaves, df = delta
+
+        novo = copy.copy(self)
+        novo.posicao = posicao
+        novo._lock = threading.Lock()
+        with self._lock:
+            novo._frias = OrderedDict(self._frias)
+        if len(chaves) == 0:
+            return novo
+
+        if self.corte is not None:
+            manifesto = carregar_manifesto(self._caminho_bronze)
+            if manifesto is None:
+                return None
+            novo._particoes = manifesto["particoes"]
+            # O upsert marca cada partição reescrita com a sequência do delta,
+            # inclusive a de origem de uma linha que mudou de mês
+            for rotulo in list(novo._frias):
+                if novo._particoes.get(rotulo) != self._particoes.get(rotulo):
+                    del novo._frias[rotulo]
+            df = df[df[self.coluna_data] >= self.corte]
+
+        novo.quente = self._mesclar(self.quente, chaves, df)
+        novo._valores_frios = novo._listar_valores_frios(self._valores_frios, self._particoes)
+        return novo
+
+
+class IndiceEmCamadas:
+    """
+    Visão de um dos IndiceSnapshot montados (ex: 'estoque' ou 'cubo_estoque')
+    sobre todas as camadas, com a mesma interface de consulta do
+    IndiceSnapshot: filtrar(), valores() e total().
+    """
+
+    def __init__(self, armazem: ArmazemCamadas, nome: str):
+        self.armazem = armazem
+        self.nome = nome
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Camada quente (apenas a janela residente)."""
+        return self.armazem.quente[self.nome].df
+
+    def _indices(self, inicio=None, fim=None) -> list[IndiceSnapshot]:
+        frias = [self.armazem.particao(rotulo)[self.nome] for rotulo in self.armazem.rotulos_frios(inicio, fim)]
+        return [self.armazem.quente[self.nome], *frias]
+
+    def filtrar(self, inicio=None, fim=None, selecoes: dict | None = None) -> pd.DataFrame:
+        partes = [indice.filtrar(inicio, fim, selecoes) for indice in self._indices(inicio, fim)]
+        if len(partes) == 1:
+            return partes[0]
+        return pd.concat(partes, ignore_index=True)
+
+    def valores(self, coluna: str) -> list:
+        """
+        Valores da coluna em todo o histórico: os da camada quente e os
+        listados de cada partição fria na carga (carregada ou não).
+        """
+        return list(dict.fromkeys([*self.armazem.quente[self.nome].valores(coluna), *self.armazem.valores_frios(coluna)]))
+
+    def total(self, coluna: str, inicio=None, fim=None, grupos=None) -> float:
+        return float(sum(indice.total(coluna, inicio, fim, grupos) for indice in self._indices(inicio, fim)))
@@ -0,0 +1,67 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+# Carga concorrente das fontes da camada gold. Cada fonte roda numa thread do
+# pool (a consulta ao SQL Server, a leitura do Parquet e boa parte do pandas
+# liberam o GIL), então o tempo total se aproxima do da fonte mais lenta. Uma
+# fonte que falha não derruba as demais: o erro fica registrado no resultado.
+
+CARGA_MAX_PARALELO = int(os.getenv("CARGA_MAX_PARALELO", "4"))
+
+logger = logging.getLogger('error_logger')
+
+
+@dataclass
+class ResultadoCarga:
+    """
+    Atributos:
+        dados (dict): Fonte -> valor retornado (apenas fontes sem erro).
+        tempos (dict): Fonte -> segundos gastos (inclusive as que falharam).
+        erros (dict): Fonte -> mensagem de erro.
+    """
+    dados: dict = field(default_factory=dict)
+    tempos: dict = field(default_factory=dict)
+    erros: dict = field(default_factory=dict)
+
+
+def _cronometrar(funcao: Callable):
+    inicio = time.perf_counter()
+    try:
+        return funcao(), None, time.perf_counter() - inicio
+    except Exception as e:
+        logger.error(f"Erro: {str(e)}.", exc_info=True)
+        return None, e, time.perf_counter() - inicio
+
+
+def carregar_fontes(fontes: dict[str, Callable], max_paralelo: int = CARGA_MAX_PARALELO) -> ResultadoCarga:
+    """
+    Executa as funções de carga em paralelo, num pool limitado a
+    `max_paralelo` threads.
+
+    Args:
+        fontes (dict): Nome da fonte -> função sem argumentos que a carrega.
+        max_paralelo (int): Máximo de cargas simultâneas.
+
+    Retorna:
+        ResultadoCarga com valores, tempos e erros por fonte.
+    """
+    resultado = ResultadoCarga()
+    if not fontes:
+        return resultado
+
+    with ThreadPoolExecutor(max_workers=min(max_paralelo, len(fontes)), thread_name_prefix="carga") as executor:
+        futuros = {nome: executor.submit(_cronometrar, funcao) for nome, funcao in fontes.items()}
+
+    for nome, futuro in futuros.items():
+        valor, erro, segundos = futuro.result()
+        resultado.tempos[nome] = segundos
+        if erro is None:
+            resultado.dados[nome] = valor
+        else:
+            resultado.erros[nome] = str(erro) or type(erro).__name__
+
+    return resultado
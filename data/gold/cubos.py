@@ -0,0 +1,108 @@
+import pandas as pd
+from data.gold.indices import alinhar_categorias
+
+# Cubos diários materializados uma vez por snapshot da camada gold.
+#
+# Cada cubo agrega os lançamentos por dia e pelas dimensões usadas nos filtros
+# e gráficos do dashboard, mantendo os mesmos nomes de coluna da silver. Assim
+# os filtros do topo (data/gold/indices.py) e as funções de gráfico funcionam
+# sobre o cubo sem alteração, e cada interação passa a tocar milhares de
+# células em vez de milhões de lançamentos.
+#
+# Como todos os intervalos de período começam e terminam à meia-noite (ver
+# data/gold/periodo.py), filtrar o cubo pelo dia dá o mesmo resultado que
+# filtrar os lançamentos pela data completa.
+
+DIAS_ESTOQUE = ['CRE_DATA_ENTRADA']
+DIMENSOES_ESTOQUE = ['CRE_PRO_DESCRICAO', 'CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME']
+
+DIAS_FINANCEIRO = ['NFI_DATA_SAIDA', 'NFI_DATA_EMISSAO']
+DIMENSOES_FINANCEIRO = ['NFI_RAZAO']
+
+
+def materializar_cubo(
+    df: pd.DataFrame,
+    dias: list[str],
+    dimensoes: list[str],
+    medida: str,
+    contagem: str
+) -> pd.DataFrame:
+    """
+    Agrega o DataFrame por dia de cada coluna em `dias` e pelas `dimensoes`.
+    Datas e dimensões nulas formam células próprias, para que o filtro "Todos"
+    continue contando as linhas sem data.
+
+    Args:
+        df (pd.DataFrame): Snapshot da camada gold.
+        dias (list): Colunas de data, truncadas para o dia (mantêm o nome).
+        dimensoes (list): Colunas categóricas do agrupamento.
+        medida (str): Coluna somada (acumulada em float64).
+        contagem (str): Nome da coluna com a quantidade de linhas da célula.
+
+    Retorna:
+        pd.DataFrame com uma linha por célula não vazia.
+    """
+    base = df[dias + dimensoes].assign(**{
+        **{coluna: df[coluna].dt.normalize() for coluna in dias},
+        medida: df[medida].astype('float64'),
+    })
+
+    return (
+        base.groupby(dias + dimensoes, observed=True, dropna=False, sort=False)
+        .agg(**{medida: (medida, 'sum'), contagem: (medida, 'size')})
+        .reset_index()
+    )
+
+
+def atualizar_cubo(
+    cubo: pd.DataFrame,
+    removidos: pd.DataFrame,
+    novos: pd.DataFrame,
+    dias: list[str],
+    dimensoes: list[str],
+    medida: str,
+    contagem: str
+) -> pd.DataFrame:
+    """
+    Cubo com as linhas `removidos` descontadas e as linhas `novos` somadas,
+    sem reagregar o histórico: só o delta é agregado e combinado com as
+    células dos dias que ele toca. Células que ficam sem linhas são
+    descartadas.
+    """
+    saida = materializar_cubo(removidos, dias, dimensoes, medida, contagem)
+    saida[[medida, contagem]] = -saida[[medida, contagem]]
+    cubo, entrada, saida = alinhar_categorias(cubo, materializar_cubo(novos, dias, dimensoes, medida, contagem), saida)
+
+    delta = pd.concat([entrada, saida], ignore_index=True)
+    tocadas = cubo[dias[0]].isin(delta[dias[0]].unique())
+    celulas = (
+        pd.concat([cubo[tocadas], delta], ignore_index=True)
+        .groupby(dias + dimensoes, observed=True, dropna=False, sort=False)
+        .agg(**{medida: (medida, 'sum'), contagem: (contagem, 'sum')})
+        .reset_index()
+    )
+    return pd.concat([cubo[~tocadas], celulas[celulas[contagem] > 0]], ignore_index=True)
+
+
+def cubo_estoque(df: pd.DataFrame) -> pd.DataFrame:
+    """Peso líquido e quantidade de lançamentos por dia de entrada × produto × produtor."""
+    return materializar_cubo(
+        df, DIAS_ESTOQUE, DIMENSOES_ESTOQUE, 'CRE_PESO_LIQUIDO', 'QTD_LANCAMENTOS')
+
+
+def cubo_financeiro(df: pd.DataFrame) -> pd.DataFrame:
+    """Valor total e quantidade de notas por dia de saída × dia de emissão × cliente."""
+    return materializar_cubo(
+        df, DIAS_FINANCEIRO, DIMENSOES_FINANCEIRO, 'NFI_VALOR_TOTAL_NOTA', 'QTD_NOTAS')
+
+
+def atualizar_cubo_estoque(cubo: pd.DataFrame, removidos: pd.DataFrame, novos: pd.DataFrame) -> pd.DataFrame:
+    """cubo_estoque() atualizado com um delta (ver atualizar_cubo)."""
+    return atualizar_cubo(
+        cubo, removidos, novos, DIAS_ESTOQUE, DIMENSOES_ESTOQUE, 'CRE_PESO_LIQUIDO', 'QTD_LANCAMENTOS')
+
+
+def atualizar_cubo_financeiro(cubo: pd.DataFrame, removidos: pd.DataFrame, novos: pd.DataFrame) -> pd.DataFrame:
+    """cubo_financeiro() atualizado com um delta (ver atualizar_cubo)."""
+    return atualizar_cubo(
+        cubo, removidos, novos, DIAS_FINANCEIRO, DIMENSOES_FINANCEIRO, 'NFI_VALOR_TOTAL_NOTA', 'QTD_NOTAS')
@@ -1,9 +1,40 @@
 import pandas as pd
 from datetime import datetime, timedelta
-from data.silver.estoque.data_silver import get_data
+from data.silver.estoque.data_silver import get_data, consultar_sql
+from data.gold.indices import IndiceData, IndiceSomaAcumulada
+from data.gold.periodo import intervalo_periodo
+from data.gold.pushdown import predicado_in, predicado_contem, predicados_periodo, combinar
 
 def carregar_dados():
-    return get_data()
+    df = get_data()
+    if df is None:
+        # get_data() já registrou o erro original no error.log
+        raise RuntimeError("Não foi possível montar a camada silver de estoque.")
+    return df
+
+def compilar_filtros(
+    motorista=None,
+    periodo: str = "Todos",
+    produtos: list = None,
+    fornecedores: list = None,
+    mes=None,
+    ano=None,
+    semanas: int = None
+) -> tuple[list[str], list]:
+    """
+    Compila os filtros de obter_dados_filtrados() em condições SQL
+    parametrizadas sobre v_CEREAIS_ROMANEIO_ENTRADA (ver data/gold/pushdown.py).
+
+    Retorna:
+        tuple (condicoes, params) para ler_sql_estoque().
+    """
+    return combinar([
+        predicado_contem('CRE_MOTORISTA_NOME', motorista),
+        *predicados_periodo('CRE_DATA_ENTRADA', periodo, mes, ano, semanas),
+        predicado_in('CRE_PRO_DESCRICAO', produtos),
+        predicado_in('CRE_PRODUTOR_NOME', fornecedores),
+    ])
+
 
 def obter_dados_filtrados(
     motorista=None, 
@@ -12,7 +43,8 @@ def obter_dados_filtrados(
     fornecedores: list = None,
     mes=None, 
     ano=None, 
-    semanas: int = None
+    semanas: int = None,
+    modo: str = "memoria"
 ):
     """
     Retorna os dados da camada gold com filtros opcionais:
@@ -24,12 +56,21 @@ def obter_dados_filtrados(
     - mes (int ou None)
     - ano (int ou None)
     - semanas (int ou None): número de semanas anteriores (se informado, ignora mês e ano)
+    - modo (str): "memoria" carrega a silver inteira (bronze) e filtra em pandas;
+                  "sql" envia os filtros ao SQL Server (compilar_filtros) e só
+                  as linhas necessárias são lidas. Útil para scripts e exportações
+                  que consultam um recorte pequeno.
     """
+    if modo == "sql":
+        df = consultar_sql(*compilar_filtros(
+            motorista, periodo, produtos, fornecedores, mes, ano, semanas))
+    elif modo == "memoria":
+        df = carregar_dados()
+    else:
+        raise ValueError(f"Modo desconhecido: {modo!r} (use 'memoria' ou 'sql').")
 
-    df = carregar_dados()
-
-    # Garantir datetime
-    df['CRE_DATA_ENTRADA'] = pd.to_datetime(df['CRE_DATA_ENTRADA'], errors='coerce')
+    # Os filtros em pandas valem para os dois modos; no modo "sql" eles só
+    # refinam o resultado já reduzido (ex: listas IN longas demais para o SQL)
 
     # ---------------------
     # 1) Filtro Motorista
@@ -87,9 +128,44 @@ def obter_dados_filtrados(
     return df
 
 
-def obter_quantidade_saida(hoje=True):
-    pass
+def indice_quantidade(df: pd.DataFrame, coluna_data: str) -> IndiceSomaAcumulada:
+    """
+    Somas acumuladas do peso líquido ordenadas pela coluna de data, para que
+    os totais de entrada/saída sejam consultas por busca binária. Construa uma
+    vez por snapshot e reutilize nas chamadas abaixo.
+    """
+    return IndiceSomaAcumulada(IndiceData(df, coluna_data), 'CRE_PESO_LIQUIDO')
+
+
+def _quantidade(coluna_data: str, hoje: bool, indice: IndiceSomaAcumulada | None) -> float:
+    if indice is None:
+        indice = indice_quantidade(carregar_dados(), coluna_data)
 
+    inicio, fim = intervalo_periodo("Hoje" if hoje else "Todos")
+    return indice.total(inicio, fim, sem_data=False)
+
+
+def obter_quantidade_saida(hoje=True, indice: IndiceSomaAcumulada | None = None) -> float:
+    """
+    Peso líquido (kg) com data de saída hoje ou, com hoje=False, em todo o
+    histórico (romaneios ainda sem saída não contam).
 
-def obter_quantidade_entrada(hoje=False):
-    pass
+    Args:
+        hoje (bool): Apenas o dia de hoje.
+        indice (IndiceSomaAcumulada, opcional): indice_quantidade(df, 'CRE_DATA_SAIDA')
+            já construído; se omitido, carrega a silver e constrói aqui.
+    """
+    return _quantidade('CRE_DATA_SAIDA', hoje, indice)
+
+
+def obter_quantidade_entrada(hoje=False, indice: IndiceSomaAcumulada | None = None) -> float:
+    """
+    Peso líquido (kg) com data de entrada hoje ou, com hoje=False, em todo o
+    histórico.
+
+    Args:
+        hoje (bool): Apenas o dia de hoje.
+        indice (IndiceSomaAcumulada, opcional): indice_quantidade(df, 'CRE_DATA_ENTRADA')
+            já construído; se omitido, carrega a silver e constrói aqui.
+    """
+    return _quantidade('CRE_DATA_ENTRADA', hoje, indice)
@@ -0,0 +1,196 @@
+import os
+import time
+import threading
+import tracemalloc
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+from openpyxl import Workbook
+
+# Exportação das tabelas filtradas em CSV ou XLSX, em blocos.
+#
+# O DataFrame é percorrido em blocos de EXPORTACAO_LINHAS_POR_BLOCO linhas:
+# só o bloco da vez é selecionado, formatado e gravado no destino, então a
+# memória não cresce com o histórico. O XLSX usa o modo write-only do
+# openpyxl, que grava cada linha direto no arquivo em vez de manter a
+# planilha inteira em memória.
+#
+# Cada exportação informa a vazão (linhas/s) e uma estimativa da memória por
+# bloco: o pico alocado (tracemalloc) ao formatar e gravar o primeiro bloco.
+# Rastrear a exportação inteira a deixaria várias vezes mais lenta; a
+# estimativa não inclui a ordenação feita antes da exportação nem o
+# fechamento do arquivo (no XLSX, a compactação). O tracemalloc é global ao
+# processo, então as medições são feitas uma por vez.
+
+EXPORTACAO_LINHAS_POR_BLOCO = int(os.getenv("EXPORTACAO_LINHAS_POR_BLOCO", "50000"))
+# Linhas máximas de um XLSX: o write-only do openpyxl gera o arquivo várias
+# vezes mais devagar que o CSV, e uma planilha do Excel não passa de
+# LIMITE_LINHAS_EXCEL linhas (mais o cabeçalho)
+LIMITE_LINHAS_EXCEL = 1_048_575
+EXPORTACAO_XLSX_MAX_LINHAS = min(int(os.getenv("EXPORTACAO_XLSX_MAX_LINHAS", "100000")), LIMITE_LINHAS_EXCEL)
+# Tamanho máximo do arquivo oferecido para download: o Streamlit mantém o
+# conteúdo do download em memória
+EXPORTACAO_MAX_MB = float(os.getenv("EXPORTACAO_MAX_MB", "200"))
+
+FORMATOS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+_lock_medicao = threading.Lock()
+
+
+@dataclass
+class ResultadoExportacao:
+    """
+    Atributos:
+        linhas (int): Linhas exportadas.
+        segundos (float): Tempo total da exportação.
+        pico_bloco_bytes (int): Pico de memória alocada ao formatar e gravar o
+            primeiro bloco (estimativa da memória por bloco).
+        tamanho_bytes (int): Tamanho do arquivo gerado.
+    """
+    linhas: int
+    segundos: float
+    pico_bloco_bytes: int
+    tamanho_bytes: int
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        return self.linhas / self.segundos if self.segundos > 0 else 0.0
+
+
+def formatar_datas(serie: pd.Series) -> np.ndarray:
+    """
+    Datas em dd/mm/aaaa (None para as nulas). Só os dias distintos passam
+    pelo strftime; as linhas recebem o texto já formatado do seu dia.
+    """
+    codigos, unicos = pd.factorize(serie)
+    textos = np.append(unicos.strftime('%d/%m/%Y').to_numpy(dtype=object), None)
+    return textos[codigos]
+
+
+def _blocos(
+    df: pd.DataFrame,
+    colunas: dict,
+    datas: list,
+    ordem: np.ndarray | None,
+    linhas_por_bloco: int
+) -> Iterator[pd.DataFrame]:
+    """Blocos com as colunas exibidas, datas em dd/mm/aaaa, na ordem dada."""
+    for inicio in range(0, len(df), linhas_por_bloco):
+        if ordem is None:
+            bloco = df.iloc[inicio:inicio + linhas_por_bloco][list(colunas)]
+        else:
+            bloco = df.iloc[ordem[inicio:inicio + linhas_por_bloco]][list(colunas)]
+        yield bloco.assign(**{coluna: formatar_datas(bloco[coluna]) for coluna in datas})
+
+
+class EscritorCSV:
+    """
+    CSV no padrão do Excel em português: separador ';', vírgula decimal e
+    UTF-8 com BOM.
+    """
+
+    def __init__(self, destino: BinaryIO, colunas: dict, titulo: str):
+        self.destino = destino
+        destino.write(';'.join(colunas.values()).encode('utf-8-sig') + b'\r\n')
+
+    def escrever(self, bloco: pd.DataFrame):
+        texto = bloco.to_csv(sep=';', decimal=',', index=False, header=False, lineterminator='\r\n')
+        self.destino.write(texto.encode('utf-8'))
+
+    def finalizar(self):
+        pass
+
+
+class EscritorXLSX:
+    """
+    Planilha única gravada linha a linha (openpyxl write-only).
+
+    Colunas float32 (ex: pesos da silver) são gravadas com o mesmo valor
+    decimal do CSV (3.3, e não 3.299999952316284): o texto mais curto do
+    float32, convertido para float64.
+    """
+
+    def __init__(self, destino: BinaryIO, colunas: dict, titulo: str):
+        self.destino = destino
+        self.planilha = Workbook(write_only=True)
+        self.aba = self.planilha.create_sheet(titulo[:31])
+        self.aba.append(list(colunas.values()))
+
+    def escrever(self, bloco: pd.DataFrame):
+        bloco = bloco.assign(**{
+            coluna: pd.to_numeric(bloco[coluna].astype(str)) for coluna in bloco.select_dtypes('float32')
+        })
+        bloco = bloco.astype(object).where(bloco.notna(), None)
+        for linha in bloco.itertuples(index=False, name=None):
+            self.aba.append(linha)
+
+    def finalizar(self):
+        self.planilha.save(self.destino)
+
+
+ESCRITORES = {'csv': EscritorCSV, 'xlsx': EscritorXLSX}
+
+
+def exportar(
+    df: pd.DataFrame,
+    formato: str,
+    destino: BinaryIO,
+    colunas: dict,
+    datas: list | None = None,
+    ordem: np.ndarray | None = None,
+    titulo: str = "Dados",
+    linhas_por_bloco: int = EXPORTACAO_LINHAS_POR_BLOCO
+) -> ResultadoExportacao:
+    """
+    Grava o DataFrame em `destino` no formato dado ('csv' ou 'xlsx'), bloco
+    a bloco, sem montar uma cópia formatada inteira.
+
+    Args:
+        df (pd.DataFrame): Dados filtrados.
+        formato (str): Chave de FORMATOS.
+        destino (BinaryIO): Arquivo binário aberto para escrita.
+        colunas (dict): Coluna do DataFrame -> cabeçalho, na ordem de saída.
+        datas (list, opcional): Colunas formatadas como dd/mm/aaaa.
+        ordem (np.ndarray, opcional): Posições das linhas na ordem de saída.
+        titulo (str): Nome da aba no XLSX.
+        linhas_por_bloco (int): Linhas formatadas de cada vez.
+
+    Retorna:
+        ResultadoExportacao com linhas, tempo, memória por bloco e tamanho.
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+    if formato == 'xlsx' and len(df) > EXPORTACAO_XLSX_MAX_LINHAS:
+        raise ValueError(f"XLSX limitado a {EXPORTACAO_XLSX_MAX_LINHAS} linhas; recebidas {len(df)}.")
+
+    inicio = time.perf_counter()
+    escritor = ESCRITORES[formato](destino, colunas, titulo)
+    blocos = _blocos(df, colunas, datas or [], ordem, max(linhas_por_bloco, 1))
+
+    # Só o primeiro bloco é formatado e gravado sob o tracemalloc
+    with _lock_medicao:
+        rastreando = tracemalloc.is_tracing()
+        if not rastreando:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+        try:
+            primeiro = next(blocos, None)
+            if primeiro is not None:
+                escritor.escrever(primeiro)
+            pico = max(tracemalloc.get_traced_memory()[1] - memoria_inicial, 0)
+        finally:
+            if not rastreando:
+                tracemalloc.stop()
+        del primeiro
+
+    for bloco in blocos:
+        escritor.escrever(bloco)
+    escritor.finalizar()
+    segundos = time.perf_counter() - inicio
+
+    return ResultadoExportacao(len(df), segundos, pico, destino.tell())
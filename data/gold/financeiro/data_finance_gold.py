@@ -1,16 +1,42 @@
 import pandas as pd
 from datetime import datetime, timedelta
-from data.silver.financeiro.data_fincance_silver import get_data
+from data.silver.financeiro.data_fincance_silver import get_data, consultar_sql
+from data.gold.pushdown import predicado_in, predicados_periodo, combinar
 
 def carregar_dados():
-    return get_data()
+    df = get_data()
+    if df is None:
+        # get_data() já registrou o erro original no error.log
+        raise RuntimeError("Não foi possível montar a camada silver financeira.")
+    return df
+
+def compilar_filtros(
+    periodo: str = "Todos",
+    fornecedores: list = None,
+    mes=None,
+    ano=None,
+    semanas: int = None
+) -> tuple[list[str], list]:
+    """
+    Compila os filtros de obter_dados_filtrados() em condições SQL
+    parametrizadas sobre NOTA_FISCAL (ver data/gold/pushdown.py).
+
+    Retorna:
+        tuple (condicoes, params) para ler_sql_financeiro().
+    """
+    return combinar([
+        *predicados_periodo('NFI_DATA_SAIDA', periodo, mes, ano, semanas),
+        predicado_in('NFI_RAZAO', fornecedores),
+    ])
+
 
 def obter_dados_filtrados(
     periodo: str = "Todos",
     fornecedores: list = None,
     mes=None, 
     ano=None, 
-    semanas: int = None
+    semanas: int = None,
+    modo: str = "memoria"
 ):
     """
     Retorna os dados da camada gold com filtros opcionais:
@@ -22,12 +48,19 @@ def obter_dados_filtrados(
     - mes (int ou None)
     - ano (int ou None)
     - semanas (int ou None): número de semanas anteriores (se informado, ignora mês e ano)
+    - modo (str): "memoria" carrega a silver inteira (bronze) e filtra em pandas;
+                  "sql" envia os filtros ao SQL Server (compilar_filtros) e só
+                  as linhas necessárias são lidas.
     """
+    if modo == "sql":
+        df = consultar_sql(*compilar_filtros(periodo, fornecedores, mes, ano, semanas))
+    elif modo == "memoria":
+        df = carregar_dados()
+    else:
+        raise ValueError(f"Modo desconhecido: {modo!r} (use 'memoria' ou 'sql').")
 
-    df = carregar_dados()
-
-    # Garantir datetime
-    df['NFI_DATA_SAIDA'] = pd.to_datetime(df['NFI_DATA_SAIDA'], errors='coerce')
+    # Os filtros em pandas valem para os dois modos; no modo "sql" eles só
+    # refinam o resultado já reduzido
 
     if semanas:  # prioridade sobre mês/ano
         dias = semanas * 7
@@ -55,7 +88,7 @@ def obter_dados_filtrados(
             if mes:
                 df = df[df['MES_SAIDA'] == int(mes)]
             if ano:
-                df = df[df['MES_SAIDA'] == int(ano)]
+                df = df[df['ANO_SAIDA'] == int(ano)]
 
     if fornecedores:
         df = df[df['NFI_RAZAO'].isin(fornecedores)]
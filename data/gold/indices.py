@@ -0,0 +1,392 @@
+import numpy as np
+import pandas as pd
+
+# Índices construídos uma vez por snapshot da camada gold, para que os filtros
+# do dashboard não precisem varrer o DataFrame inteiro a cada interação.
+
+_SEM_DATA = np.iinfo(np.int64).max
+
+
+def _em_microssegundos(data) -> np.int64:
+    return pd.Timestamp(data).to_datetime64().astype('datetime64[us]').astype(np.int64)
+
+
+def alinhar_categorias(*dfs: pd.DataFrame) -> list[pd.DataFrame]:
+    """
+    DataFrames com as colunas categóricas do primeiro convertidas para as
+    mesmas categorias: as do primeiro, na mesma ordem (os códigos dele não
+    mudam), seguidas das novas dos demais. Assim pd.concat mantém o dtype
+    categórico.
+
+    A comparação é pela lista ordenada de categorias, e não pelo dtype: dois
+    categóricos não ordenados com as mesmas categorias em outra ordem têm
+    dtypes iguais, mas códigos diferentes para o mesmo valor, e os índices
+    invertidos mesclam os códigos do delta.
+    """
+    resultado = list(dfs)
+    for coluna, tipo in dfs[0].dtypes.items():
+        if not isinstance(tipo, pd.CategoricalDtype):
+            continue
+        categorias = tipo.categories
+        for df in dfs[1:]:
+            if coluna in df:
+                valores = df[coluna].cat.categories if isinstance(df[coluna].dtype, pd.CategoricalDtype) \
+                    else pd.Index(df[coluna].dropna().unique())
+                categorias = categorias.append(valores.difference(categorias))
+        tipo_comum = pd.CategoricalDtype(categorias, ordered=tipo.ordered)
+        resultado = [_recodificar(df, coluna, tipo_comum) if coluna in df else df for df in resultado]
+    return resultado
+
+
+def _recodificar(df: pd.DataFrame, coluna: str, tipo: pd.CategoricalDtype) -> pd.DataFrame:
+    """df com a coluna no dtype categórico dado, com os códigos dele."""
+    atual = df[coluna].dtype
+    if not isinstance(atual, pd.CategoricalDtype):
+        return df.astype({coluna: tipo})
+    if atual.ordered == tipo.ordered and list(atual.categories) == list(tipo.categories):
+        return df
+    return df.assign(**{coluna: df[coluna].cat.set_categories(tipo.categories, ordered=tipo.ordered)})
+
+
+class IndiceData:
+    """
+    Snapshot ordenado por uma coluna de data (mais recente primeiro, linhas
+    sem data ao final) com busca binária por intervalo.
+
+    A ordenação é feita uma única vez na construção (e pulada, sem cópia, se
+    o DataFrame já estiver nessa ordem). Depois disso, qualquer
+    filtro de período ou de data específica vira duas buscas binárias e uma
+    fatia contígua (`df.iloc[i:j]`), que não copia os dados.
+
+    Atributos:
+        df (pd.DataFrame): Snapshot ordenado, com índice 0..n-1.
+        coluna (str): Coluna de data indexada.
+    """
+
+    def __init__(self, df: pd.DataFrame, coluna: str):
+        self.coluna = coluna
+
+        datas = df[coluna].to_numpy(dtype='datetime64[us]')
+        nulos = np.isnat(datas)
+        # Ordem crescente de -data equivale a data decrescente
+        chave = np.where(nulos, _SEM_DATA, -datas.astype(np.int64))
+        self._com_data = int(len(df) - nulos.sum())
+
+        # Já ordenado (ex: camada quente restaurada do disco): sem cópia, as
+        # colunas continuam apontando para o arquivo mapeado
+        if np.all(chave[:-1] <= chave[1:]):
+            self.df = df.reset_index(drop=True)
+            self._chave = chave
+            return
+
+        ordem = np.argsort(chave, kind='stable')
+        self.df = df.take(ordem).reset_index(drop=True)
+        self._chave = chave[ordem]
+
+    def __len__(self):
+        return len(self.df)
+
+    def intervalo(self, inicio=None, fim=None, sem_data: bool = True) -> tuple[int, int]:
+        """
+        Posições [i, j) do snapshot com data em [inicio, fim). Sem nenhum
+        limite, retorna o snapshot inteiro, inclusive as linhas sem data
+        (a menos que `sem_data` seja False).
+        """
+        if inicio is None and fim is None:
+            return 0, len(self.df) if sem_data else self._com_data
+
+        chave = self._chave[:self._com_data]
+        i = 0 if fim is None else int(np.searchsorted(chave, -_em_microssegundos(fim), side='right'))
+        j = len(chave) if inicio is None else int(np.searchsorted(chave, -_em_microssegundos(inicio), side='right'))
+        return i, max(i, j)
+
+    def fatia(self, inicio=None, fim=None) -> pd.DataFrame:
+        """Linhas com data em [inicio, fim), sem cópia."""
+        i, j = self.intervalo(inicio, fim)
+        return self.df.iloc[i:j]
+
+    def mesclar(self, df: pd.DataFrame, manter: np.ndarray, novos: pd.DataFrame):
+        """
+        Novo índice com as linhas de `df` (o snapshot, com as categorias já
+        alinhadas) marcadas em `manter` e as linhas `novos`. Só o delta é
+        ordenado; ele é intercalado no snapshot por busca binária.
+
+        Retorna:
+            tuple (IndiceData, destino das linhas antigas (-1 se removidas),
+            destino das novas, novas já ordenadas).
+        """
+        delta = IndiceData(novos, self.coluna)
+        mantidas = np.flatnonzero(manter)
+        chave = self._chave[mantidas]
+
+        # Novas linhas entram depois das antigas com a mesma data
+        destino_novos = np.searchsorted(chave, delta._chave, side='right') + np.arange(len(delta))
+        total = len(mantidas) + len(delta)
+        eh_novo = np.zeros(total, dtype=bool)
+        eh_novo[destino_novos] = True
+        destino_mantidas = np.flatnonzero(~eh_novo)
+
+        origem = np.empty(total, dtype=np.int64)
+        origem[destino_mantidas] = mantidas
+        origem[destino_novos] = len(df) + np.arange(len(delta))
+
+        # O resultado é uma sequência de trechos contíguos de df e do delta
+        # (poucos, já que o delta é pequeno): concatenar as fatias copia uma vez
+        quebras = np.flatnonzero((np.diff(origem) != 1) | (origem[1:] == len(df))) + 1
+        trechos = []
+        for a, b in zip(np.concatenate(([0], quebras)), np.concatenate((quebras, [total]))):
+            i = int(origem[a])
+            trechos.append(df.iloc[i:i + b - a] if i < len(df) else delta.df.iloc[i - len(df):i - len(df) + b - a])
+
+        indice = IndiceData.__new__(IndiceData)
+        indice.coluna = self.coluna
+        indice.df = pd.concat(trechos, ignore_index=True) if trechos else df.iloc[:0].reset_index(drop=True)
+        indice._chave = np.empty(total, dtype=np.int64)
+        indice._chave[destino_mantidas] = chave
+        indice._chave[destino_novos] = delta._chave
+        indice._com_data = int((indice._chave != _SEM_DATA).sum())
+
+        destino_antigos = np.full(len(df), -1, dtype=np.int64)
+        destino_antigos[mantidas] = destino_mantidas
+        return indice, destino_antigos, destino_novos, delta.df
+
+
+class IndiceInvertido:
+    """
+    Índice invertido de uma coluna categórica: para cada valor, as posições
+    (crescentes) das linhas do snapshot que o contêm.
+
+    As listas de posições ficam num único array inteiro compacto, agrupado por
+    valor (formato CSR), então selecionar alguns valores entre milhares custa
+    proporcional ao número de linhas que casam, e não ao tamanho da tabela.
+    """
+
+    def __init__(self, serie: pd.Series):
+        categorias = serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+        codigos = categorias.cat.codes.to_numpy()
+        tipo_posicao = np.int32 if len(codigos) < np.iinfo(np.int32).max else np.int64
+
+        # Ordenação estável dos códigos: posições agrupadas por valor e crescentes em cada grupo
+        ordem = np.argsort(codigos, kind='stable').astype(tipo_posicao)
+        nulos = int((codigos < 0).sum())
+        contagem = np.bincount(codigos[codigos >= 0], minlength=len(categorias.cat.categories))
+
+        self._posicoes = ordem[nulos:]
+        self._limites = np.concatenate(([0], np.cumsum(contagem)))
+        self._codigo = {valor: i for i, valor in enumerate(categorias.cat.categories)}
+
+    def mesclar(
+        self,
+        serie: pd.Series,
+        destino_antigos: np.ndarray,
+        destino_novos: np.ndarray,
+        novos: pd.Series
+    ) -> "IndiceInvertido":
+        """
+        Índice da coluna `serie` do snapshot mesclado (ver IndiceData.mesclar)
+        sem reordenar as listas: as posições antigas são remapeadas (o
+        remapeamento preserva a ordem) e as do delta são intercaladas por
+        busca binária. Se as categorias antigas não forem um prefixo das
+        novas, o índice é reconstruído.
+        """
+        categorias = serie.cat.categories if isinstance(serie.dtype, pd.CategoricalDtype) else None
+        if categorias is None or list(categorias[:len(self._codigo)]) != list(self._codigo):
+            return IndiceInvertido(serie)
+
+        tamanho = np.int64(len(serie) + 1)
+        grupos = np.repeat(np.arange(len(self._limites) - 1, dtype=np.int64), np.diff(self._limites))
+        posicoes = destino_antigos[self._posicoes]
+        vivas = posicoes >= 0
+        chave = grupos[vivas] * tamanho + posicoes[vivas]
+
+        codigos = novos.cat.codes.to_numpy()
+        validos = codigos >= 0
+        chave_novos = np.sort(codigos[validos].astype(np.int64) * tamanho + destino_novos[validos])
+        chave = np.insert(chave, np.searchsorted(chave, chave_novos), chave_novos)
+
+        indice = IndiceInvertido.__new__(IndiceInvertido)
+        grupos, posicoes = np.divmod(chave, tamanho)
+        tipo_posicao = np.int32 if len(serie) < np.iinfo(np.int32).max else np.int64
+        indice._posicoes = posicoes.astype(tipo_posicao)
+        indice._limites = np.concatenate(([0], np.cumsum(np.bincount(grupos, minlength=len(categorias)))))
+        indice._codigo = {valor: i for i, valor in enumerate(categorias)}
+        return indice
+
+    def valores(self) -> list:
+        """Valores presentes em pelo menos uma linha."""
+        return [valor for valor, i in self._codigo.items() if self._limites[i + 1] > self._limites[i]]
+
+    def postings(self, valor) -> np.ndarray:
+        """Posições das linhas com o valor (vazio se o valor não existir)."""
+        i = self._codigo.get(valor)
+        if i is None:
+            return self._posicoes[:0]
+        return self._posicoes[self._limites[i]:self._limites[i + 1]]
+
+    def faixa(self, valor, inicio: int = 0, fim: int | None = None) -> tuple[int, int]:
+        """
+        Faixa [a, b) do array de posições com as linhas do valor cujas
+        posições estão em [inicio, fim). Vazia se o valor não existir.
+        """
+        i = self._codigo.get(valor)
+        if i is None:
+            return 0, 0
+
+        a, b = int(self._limites[i]), int(self._limites[i + 1])
+        posicoes = self._posicoes[a:b]
+        if fim is not None:
+            b = a + int(np.searchsorted(posicoes, fim, side='left'))
+        if inicio > 0:
+            a = a + int(np.searchsorted(posicoes, inicio, side='left'))
+        return a, max(a, b)
+
+    def posicoes(self, valores, inicio: int = 0, fim: int | None = None) -> np.ndarray:
+        """
+        União (ordenada) das posições dos valores, restrita a [inicio, fim),
+        que normalmente é a fatia de datas do IndiceData.
+        """
+        partes = []
+        for valor in valores:
+            a, b = self.faixa(valor, inicio, fim)
+            partes.append(self._posicoes[a:b])
+
+        if not partes:
+            return self._posicoes[:0]
+        if len(partes) == 1:
+            return partes[0]
+        # Listas de valores diferentes são disjuntas: a união é só uma ordenação
+        return np.sort(np.concatenate(partes))
+
+
+class IndiceSomaAcumulada:
+    """
+    Somas acumuladas de uma coluna numérica na ordem do IndiceData, para
+    totais por intervalo de datas com duas buscas binárias e uma subtração.
+
+    Com um IndiceInvertido de agrupamento (ex: cliente ou produto), guarda
+    também as somas acumuladas de cada grupo na ordem das suas posições, e o
+    total de alguns grupos custa duas buscas binárias por grupo.
+
+    Valores nulos contam como zero.
+    """
+
+    def __init__(self, indice: IndiceData, coluna: str, grupos: IndiceInvertido | None = None):
+        self.coluna = coluna
+        self._data = indice
+        self._grupos = grupos
+
+        valores = indice.df[coluna].to_numpy(dtype=np.float64, na_value=0.0)
+        self._acumulado = np.concatenate(([0.0], np.cumsum(valores)))
+        if grupos is not None:
+            self._acumulado_grupos = np.concatenate(([0.0], np.cumsum(valores[grupos._posicoes])))
+
+    def total(self, inicio=None, fim=None, grupos=None, sem_data: bool = True) -> float:
+        """
+        Soma da coluna nas linhas com data em [inicio, fim) e, se informados,
+        pertencentes a um dos `grupos`. Lista vazia ou None não filtra grupo.
+        """
+        i, j = self._data.intervalo(inicio, fim, sem_data=sem_data)
+        if not grupos:
+            return float(self._acumulado[j] - self._acumulado[i])
+
+        if self._grupos is None:
+            raise ValueError(f"Índice de soma de {self.coluna} construído sem agrupamento.")
+
+        total = 0.0
+        for grupo in grupos:
+            a, b = self._grupos.faixa(grupo, i, j)
+            total += self._acumulado_grupos[b] - self._acumulado_grupos[a]
+        return float(total)
+
+
+class IndiceSnapshot:
+    """
+    Índices de um snapshot da gold: IndiceData na coluna de data e um
+    IndiceInvertido por coluna categórica filtrável. As posições dos índices
+    invertidos se referem ao snapshot já ordenado por data, então o filtro de
+    período restringe as listas por busca binária e as seleções se combinam
+    por interseção.
+
+    Atributos:
+        df (pd.DataFrame): Snapshot ordenado por data.
+        data (IndiceData): Índice da coluna de data.
+        categorias (dict): coluna -> IndiceInvertido.
+        somas (dict): coluna numérica -> IndiceSomaAcumulada.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        coluna_data: str,
+        colunas_categoricas: list[str],
+        somas: dict[str, str | None] | None = None
+    ):
+        """
+        Args:
+            somas (dict, opcional): coluna numérica -> coluna categórica de
+                agrupamento (ou None) para as somas acumuladas. A coluna de
+                agrupamento precisa estar em `colunas_categoricas`.
+        """
+        self.data = IndiceData(df, coluna_data)
+        self.df = self.data.df
+        self.categorias = {coluna: IndiceInvertido(self.df[coluna]) for coluna in colunas_categoricas}
+        self._grupos_somas = dict(somas or {})
+        self._somar()
+
+    def _somar(self):
+        self.somas = {
+            coluna: IndiceSomaAcumulada(self.data, coluna, self.categorias[grupo] if grupo else None)
+            for coluna, grupo in self._grupos_somas.items()
+        }
+
+    def mesclar(self, manter: np.ndarray, novos: pd.DataFrame) -> "IndiceSnapshot":
+        """
+        Novo IndiceSnapshot sem as linhas fora de `manter` (máscara booleana
+        sobre df) e com as linhas `novos`, sem reordenar o snapshot nem
+        reconstruir os índices invertidos: o custo de ordenação e de busca é
+        proporcional ao delta, mais cópias lineares dos arrays. As somas
+        acumuladas são recalculadas (uma soma acumulada vetorizada).
+        """
+        df, novos = alinhar_categorias(self.df, novos)
+        data, destino_antigos, destino_novos, novos = self.data.mesclar(df, manter, novos)
+
+        indice = IndiceSnapshot.__new__(IndiceSnapshot)
+        indice.data = data
+        indice.df = data.df
+        indice.categorias = {
+            coluna: invertido.mesclar(indice.df[coluna], destino_antigos, destino_novos, novos[coluna])
+            for coluna, invertido in self.categorias.items()
+        }
+        indice._grupos_somas = self._grupos_somas
+        indice._somar()
+        return indice
+
+    def __len__(self):
+        return len(self.df)
+
+    def valores(self, coluna: str) -> list:
+        """Valores presentes na coluna categórica indexada."""
+        return self.categorias[coluna].valores()
+
+    def total(self, coluna: str, inicio=None, fim=None, grupos=None) -> float:
+        """Soma da coluna em [inicio, fim), opcionalmente só dos grupos (ver IndiceSomaAcumulada)."""
+        return self.somas[coluna].total(inicio, fim, grupos)
+
+    def filtrar(self, inicio=None, fim=None, selecoes: dict | None = None) -> pd.DataFrame:
+        """
+        Linhas com data em [inicio, fim) e, para cada coluna em `selecoes`,
+        valor dentro da lista selecionada. Listas vazias ou None não filtram.
+        Sem seleções, retorna a fatia de datas sem cópia.
+        """
+        i, j = self.data.intervalo(inicio, fim)
+        ativas = {coluna: valores for coluna, valores in (selecoes or {}).items() if valores}
+        if not ativas:
+            return self.df.iloc[i:j]
+
+        posicoes = None
+        for coluna, valores in ativas.items():
+            candidatas = self.categorias[coluna].posicoes(valores, i, j)
+            posicoes = candidatas if posicoes is None else np.intersect1d(posicoes, candidatas, assume_unique=True)
+            if len(posicoes) == 0:
+                break
+        return self.df.take(posicoes)
@@ -0,0 +1,139 @@
+import os
+import threading
+import pandas as pd
+from data.bronze.bronze_store import arquivos_bronze, carregar_manifesto
+from data.gold.pushdown import predicado_in, combinar
+from data.silver.estoque.data_silver import BRONZE_PATH as BRONZE_ESTOQUE
+from data.silver.financeiro.data_fincance_silver import BRONZE_PATH as BRONZE_FINANCEIRO
+
+try:
+    import duckdb
+except ImportError:  # dependência opcional (ver requirements.txt)
+    duckdb = None
+
+# Motor opcional da gold: consultas SQL diretas sobre o Parquet do bronze com
+# o DuckDB (colunar, vetorizado, multi-thread, dentro do processo).
+#
+# Só as colunas citadas são lidas, os predicados descem até os row groups do
+# Parquet e as partições fora do período são descartadas pelo manifesto antes
+# da leitura. Cada função devolve apenas o agregado pequeno que o gráfico
+# consome, com os mesmos nomes de coluna dos cubos (data/gold/cubos.py).
+#
+# Selecionado com GOLD_MOTOR=duckdb; o padrão ("pandas") usa o snapshot em
+# memória. Requer o bronze gravado pelos jobs de extração.
+
+GOLD_MOTOR = os.getenv("GOLD_MOTOR", "pandas")
+# Threads do DuckDB (0 = padrão do DuckDB, um por núcleo)
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+
+_conexao = None
+_conexao_lock = threading.Lock()
+
+
+def _cursor():
+    """Cursor próprio da thread sobre a conexão DuckDB em memória do processo."""
+    global _conexao
+    if duckdb is None:
+        raise ImportError("GOLD_MOTOR=duckdb requer o pacote duckdb (pip install duckdb).")
+
+    if _conexao is None:
+        with _conexao_lock:
+            if _conexao is None:
+                conexao = duckdb.connect()
+                if DUCKDB_THREADS > 0:
+                    conexao.execute(f"set threads = {DUCKDB_THREADS}")
+                _conexao = conexao
+    return _conexao.cursor()
+
+
+def _arquivos(caminho_base: str, coluna_data: str, inicio, fim) -> list[str]:
+    """Arquivos do bronze, podando partições só se a partição for pela coluna filtrada."""
+    manifesto = carregar_manifesto(caminho_base)
+    if manifesto is not None and manifesto.get("coluna_particao") == coluna_data:
+        return arquivos_bronze(caminho_base, inicio, fim)
+    return arquivos_bronze(caminho_base)
+
+
+def _predicados_data(coluna: str, inicio, fim) -> list[tuple[str, list]]:
+    predicados = []
+    if inicio is not None:
+        predicados.append((f"{coluna} >= ?", [pd.Timestamp(inicio).to_pydatetime()]))
+    if fim is not None:
+        predicados.append((f"{coluna} < ?", [pd.Timestamp(fim).to_pydatetime()]))
+    return predicados
+
+
+def consultar(sql: str, arquivos: list[str], predicados) -> pd.DataFrame:
+    """
+    Executa `sql` sobre os arquivos Parquet, acrescentando os predicados ao
+    `{filtros}` da consulta. O primeiro parâmetro é a lista de arquivos.
+    """
+    condicoes, params = combinar(predicados)
+    filtros = "".join(f"\n            and {condicao}" for condicao in condicoes)
+    return _cursor().execute(sql.format(filtros=filtros), [arquivos, *params]).df()
+
+
+def agregar_estoque(
+    inicio=None,
+    fim=None,
+    produtos: list | None = None,
+    fornecedores: list | None = None,
+    caminho_base: str = BRONZE_ESTOQUE
+) -> pd.DataFrame:
+    """
+    Peso líquido e quantidade de lançamentos por produto × produtor, com
+    CRE_DATA_ENTRADA em [inicio, fim) e os filtros do topo. Aplica os mesmos
+    filtros de ler_bronze_estoque() (entradas não canceladas).
+    """
+    QUERY = """
+        select
+            CRE_PRO_DESCRICAO
+            , CRE_PRODUTOR_CODIGO
+            , CRE_PRODUTOR_NOME
+            , coalesce(sum(CRE_PESO_LIQUIDO), 0) as CRE_PESO_LIQUIDO
+            , count(*) as QTD_LANCAMENTOS
+        from read_parquet(?, union_by_name = true)
+        where TIPO = 'ENTRADA' and STATUS_ROMANEIO is distinct from 'CANCELADO'{filtros}
+        group by all
+    """
+    arquivos = _arquivos(caminho_base, 'CRE_DATA_ENTRADA', inicio, fim)
+    if not arquivos:
+        return pd.DataFrame(columns=['CRE_PRO_DESCRICAO', 'CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME',
+                                     'CRE_PESO_LIQUIDO', 'QTD_LANCAMENTOS'])
+
+    return consultar(QUERY, arquivos, [
+        *_predicados_data('CRE_DATA_ENTRADA', inicio, fim),
+        predicado_in('CRE_PRO_DESCRICAO', produtos),
+        predicado_in('CRE_PRODUTOR_NOME', fornecedores),
+    ])
+
+
+def agregar_financeiro(
+    inicio=None,
+    fim=None,
+    clientes: list | None = None,
+    caminho_base: str = BRONZE_FINANCEIRO
+) -> pd.DataFrame:
+    """
+    Valor total e quantidade de notas por dia de emissão × cliente, com
+    NFI_DATA_SAIDA em [inicio, fim) e o filtro de clientes. A soma da coluna
+    NFI_VALOR_TOTAL_NOTA é o total faturado do período.
+    """
+    QUERY = """
+        select
+            date_trunc('day', NFI_DATA_EMISSAO) as NFI_DATA_EMISSAO
+            , NFI_RAZAO
+            , coalesce(sum(NFI_VALOR_TOTAL_NOTA), 0) as NFI_VALOR_TOTAL_NOTA
+            , count(*) as QTD_NOTAS
+        from read_parquet(?, union_by_name = true)
+        where true{filtros}
+        group by all
+    """
+    arquivos = _arquivos(caminho_base, 'NFI_DATA_SAIDA', inicio, fim)
+    if not arquivos:
+        return pd.DataFrame(columns=['NFI_DATA_EMISSAO', 'NFI_RAZAO', 'NFI_VALOR_TOTAL_NOTA', 'QTD_NOTAS'])
+
+    return consultar(QUERY, arquivos, [
+        *_predicados_data('NFI_DATA_SAIDA', inicio, fim),
+        predicado_in('NFI_RAZAO', clientes),
+    ])
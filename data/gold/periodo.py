@@ -0,0 +1,47 @@
+import pandas as pd
+from datetime import datetime, timedelta
+
+PERIODOS = [
+    "Hoje", "Última Semana", "Últimos 15 Dias",
+    "Últimos 30 Dias", "Mês Atual", "Ano Atual", "Todos"
+]
+
+
+def intervalo_periodo(periodo: str | None, data_especifica=None, hoje=None) -> tuple:
+    """
+    Converte a seleção de período do dashboard em um intervalo [inicio, fim)
+    de datas. Um limite None significa intervalo aberto daquele lado; (None,
+    None) significa sem filtro de data (inclusive linhas sem data).
+
+    Args:
+        periodo (str): "Hoje", "Última Semana", "Últimos 15 Dias",
+            "Últimos 30 Dias", "Mês Atual", "Ano Atual" ou "Todos".
+        data_especifica (date, opcional): Dia único; tem prioridade sobre o período.
+        hoje (datetime, opcional): Referência de "hoje" (padrão: agora).
+
+    Retorna:
+        tuple (inicio, fim) de pd.Timestamp ou None.
+    """
+    hoje = pd.Timestamp(hoje or datetime.now()).normalize()
+
+    if data_especifica:
+        dia = pd.Timestamp(data_especifica).normalize()
+        return dia, dia + timedelta(days=1)
+
+    if periodo == "Hoje":
+        return hoje, hoje + timedelta(days=1)
+    if periodo == "Última Semana":
+        return hoje - timedelta(days=7), None
+    if periodo == "Últimos 15 Dias":
+        return hoje - timedelta(days=15), None
+    if periodo == "Últimos 30 Dias":
+        return hoje - timedelta(days=30), None
+    if periodo == "Mês Atual":
+        inicio = hoje.replace(day=1)
+        return inicio, inicio + pd.offsets.MonthBegin(1)
+    if periodo == "Ano Atual":
+        inicio = hoje.replace(month=1, day=1)
+        return inicio, inicio + pd.offsets.YearBegin(1)
+
+    # "Todos" (ou período não informado): não filtra
+    return None, None
@@ -0,0 +1,200 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from datetime import datetime
+
+# Cópia persistente do snapshot da gold, compartilhada pelos processos do
+# servidor: após reiniciar, o dashboard abre o último snapshot gravado em vez
+# de consultar o SQL Server, e réplicas na mesma máquina mapeiam os mesmos
+# arquivos em vez de cada uma montar a sua cópia.
+#
+# Cada tabela é gravada em Arrow IPC (Feather v2) sem compressão e num único
+# bloco, e lida por mapeamento de memória somente leitura: as colunas do
+# DataFrame apontam para as páginas do arquivo, que ficam no cache de páginas
+# do sistema operacional e são compartilhadas por todos os processos.
+#
+# A conversão padrão do Arrow para o pandas copia as colunas inteiras
+# anuláveis (Int8/Int16/Int32 das partes de data e códigos) e os códigos das
+# categorias. Por isso elas são gravadas já no formato do pandas: os valores
+# como inteiros simples mais uma coluna uint8 de nulos, e as categorias como
+# os próprios códigos, com a lista de categorias nos metadados do arquivo.
+# Assim todas as colunas apontam para o arquivo mapeado. Categorias que não
+# são texto seguem o formato dictionary do Arrow (copiadas na leitura).
+#
+# Layout versionado: cada publicação grava um diretório novo em versoes/ e só
+# então troca o ponteiro CURRENT (renomeação atômica). Leitores que ainda usam
+# uma versão anterior continuam com os arquivos abertos; as versões antigas
+# além de SNAPSHOT_VERSOES_MANTIDAS são removidas.
+#
+#   SNAPSHOT_DIR/
+#       CURRENT                     <- id da versão atual
+#       versoes/<id>/snapshot.json  <- metadados (versão dos dados, tempos...)
+#       versoes/<id>/<tabela>.arrow
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/gold/_snapshot")
+# Versões mantidas em disco (a atual e as anteriores ainda em leitura)
+SNAPSHOT_VERSOES_MANTIDAS = int(os.getenv("SNAPSHOT_VERSOES_MANTIDAS", "3"))
+
+PONTEIRO = "CURRENT"
+METADADOS = "snapshot.json"
+# Chave dos metadados do schema Arrow com a codificação das colunas
+CODIFICACAO = b"gold_codificacao"
+SUFIXO_NULOS = "__nulos"
+
+
+def _versoes(diretorio: str) -> str:
+    return os.path.join(diretorio, "versoes")
+
+
+def versao_atual(diretorio: str = SNAPSHOT_DIR) -> str | None:
+    """Id da versão apontada por CURRENT, ou None se não houver."""
+    try:
+        with open(os.path.join(diretorio, PONTEIRO), encoding="utf-8") as arquivo:
+            return arquivo.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _codificar(df: pd.DataFrame) -> pa.Table:
+    """
+    Tabela Arrow com as colunas inteiras anuláveis e categóricas (de texto)
+    no formato do pandas (ver comentário do módulo), e a codificação de cada
+    coluna nos metadados do schema.
+    """
+    colunas, codificacao = {}, {}
+    for coluna, serie in df.items():
+        tipo = serie.dtype
+        if isinstance(serie.array, pd.arrays.IntegerArray):
+            colunas[coluna] = serie.to_numpy(dtype=tipo.numpy_dtype, na_value=0)
+            colunas[f"{coluna}{SUFIXO_NULOS}"] = serie.isna().to_numpy().view(np.uint8)
+            codificacao[coluna] = {"tipo": "inteiro"}
+        elif isinstance(tipo, pd.CategoricalDtype) and pd.api.types.is_string_dtype(tipo.categories):
+            colunas[coluna] = serie.cat.codes.to_numpy()
+            codificacao[coluna] = {
+                "tipo": "categoria", "categorias": tipo.categories.tolist(), "ordenada": bool(tipo.ordered)}
+        else:
+            colunas[coluna] = serie
+
+    tabela = pa.Table.from_pandas(pd.DataFrame(colunas, copy=False), preserve_index=False)
+    return tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        CODIFICACAO: json.dumps({"colunas": list(df.columns), "codificacao": codificacao}).encode(),
+    })
+
+
+def _decodificar(tabela: pa.Table) -> pd.DataFrame:
+    """DataFrame de uma tabela gravada por _codificar(), sem copiar as colunas."""
+    df = tabela.to_pandas(split_blocks=True)
+    metadados = (tabela.schema.metadata or {}).get(CODIFICACAO)
+    if metadados is None:
+        return df
+
+    metadados = json.loads(metadados)
+    colunas = {}
+    for coluna in metadados["colunas"]:
+        codificacao = metadados["codificacao"].get(coluna)
+        if codificacao is None:
+            colunas[coluna] = df[coluna]
+        elif codificacao["tipo"] == "inteiro":
+            nulos = df[f"{coluna}{SUFIXO_NULOS}"].to_numpy().view(bool)
+            colunas[coluna] = pd.arrays.IntegerArray(df[coluna].to_numpy(), nulos, copy=False)
+        else:
+            tipo = pd.CategoricalDtype(codificacao["categorias"], ordered=codificacao["ordenada"])
+            colunas[coluna] = pd.Categorical.from_codes(df[coluna].to_numpy(), dtype=tipo, validate=False)
+    return pd.DataFrame(colunas, copy=False)
+
+
+def salvar_tabelas(diretorio: str, tabelas: dict[str, pd.DataFrame], metadados: dict):
+    """
+    Grava as tabelas (nome -> DataFrame) e os metadados num diretório novo.
+    Cada tabela vai num único bloco Arrow, já no formato das colunas do
+    pandas, para ser mapeada sem cópia.
+    """
+    os.makedirs(diretorio)
+    for nome, df in tabelas.items():
+        feather.write_feather(
+            _codificar(df), os.path.join(diretorio, f"{nome}.arrow"),
+            compression="uncompressed", chunksize=max(len(df), 1))
+
+    with open(os.path.join(diretorio, METADADOS), "w", encoding="utf-8") as arquivo:
+        json.dump({**metadados, "tabelas": sorted(tabelas)}, arquivo, ensure_ascii=False, indent=2, default=str)
+
+
+def publicar(tabelas: dict[str, pd.DataFrame], metadados: dict, diretorio: str = SNAPSHOT_DIR) -> str:
+    """
+    Grava uma nova versão e a torna a atual. A versão é montada num
+    diretório temporário e renomeada, e o ponteiro CURRENT é trocado por
+    último, então um leitor nunca vê uma versão pela metade.
+
+    Retorna:
+        str: Id da versão publicada.
+    """
+    id_versao = f"{datetime.now():%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    destino = os.path.join(_versoes(diretorio), id_versao)
+    temporario = f"{destino}.tmp"
+    salvar_tabelas(temporario, tabelas, metadados)
+    os.replace(temporario, destino)
+
+    ponteiro = os.path.join(diretorio, PONTEIRO)
+    with open(f"{ponteiro}.{os.getpid()}.tmp", "w", encoding="utf-8") as arquivo:
+        arquivo.write(id_versao)
+    os.replace(f"{ponteiro}.{os.getpid()}.tmp", ponteiro)
+
+    limpar_versoes(diretorio)
+    return id_versao
+
+
+def limpar_versoes(diretorio: str = SNAPSHOT_DIR, manter: int = SNAPSHOT_VERSOES_MANTIDAS):
+    """
+    Remove as versões mais antigas, mantendo as `manter` mais recentes e a
+    atual. Arquivos ainda mapeados por outro processo continuam legíveis por
+    ele (POSIX); onde a remoção não é permitida, a versão fica para a próxima
+    limpeza.
+    """
+    atual = versao_atual(diretorio)
+    versoes = sorted(
+        (nome for nome in os.listdir(_versoes(diretorio)) if not nome.endswith(".tmp")), reverse=True)
+    for nome in versoes[max(manter, 1):]:
+        if nome != atual:
+            shutil.rmtree(os.path.join(_versoes(diretorio), nome), ignore_errors=True)
+
+
+def ler_tabela(caminho: str) -> pd.DataFrame:
+    """
+    Lê uma tabela Arrow IPC por mapeamento de memória somente leitura. Com
+    um único bloco e a codificação de salvar_tabelas(), todas as colunas do
+    DataFrame (números, datas, texto, inteiros anuláveis e códigos das
+    categorias) apontam direto para o arquivo mapeado; só as listas de
+    categorias são montadas em cada processo.
+    """
+    with pa.memory_map(caminho, "r") as origem:
+        return _decodificar(pa.ipc.open_file(origem).read_all())
+
+
+def ler_metadados(diretorio: str = SNAPSHOT_DIR) -> tuple[str, dict] | None:
+    """(id, metadados) da versão atual, ou None se não houver."""
+    id_versao = versao_atual(diretorio)
+    if id_versao is None:
+        return None
+    with open(os.path.join(_versoes(diretorio), id_versao, METADADOS), encoding="utf-8") as arquivo:
+        return id_versao, json.load(arquivo)
+
+
+def carregar_tabelas(diretorio: str = SNAPSHOT_DIR) -> tuple[dict, dict[str, pd.DataFrame]] | None:
+    """
+    Metadados e tabelas da versão atual, ou None se nada foi publicado.
+    """
+    atual = ler_metadados(diretorio)
+    if atual is None:
+        return None
+
+    id_versao, metadados = atual
+    tabelas = {
+        nome: ler_tabela(os.path.join(_versoes(diretorio), id_versao, f"{nome}.arrow"))
+        for nome in metadados["tabelas"]
+    }
+    return metadados, tabelas
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+# Compilação dos filtros da gold em predicados SQL parametrizados, para que a
+# consulta ao SQL Server já devolva só as linhas necessárias.
+#
+# Cada predicado é um par (sql, params) com placeholders "?". Os predicados
+# reproduzem os filtros em pandas de obter_dados_filtrados() e são sempre um
+# superconjunto deles: a gold reaplica os filtros em memória sobre o
+# resultado, então os dois modos devolvem exatamente as mesmas linhas.
+
+# Listas IN maiores que isso não vão para o SQL (o SQL Server aceita no máximo
+# 2100 parâmetros por consulta); o filtro fica só em memória.
+LIMITE_PARAMETROS_IN = 2000
+
+
+def predicado_in(coluna: str, valores) -> tuple[str, list] | None:
+    """`coluna in (?, ...)`, ou None se a lista for vazia ou grande demais."""
+    valores = list(dict.fromkeys(valores or []))
+    if not valores or len(valores) > LIMITE_PARAMETROS_IN:
+        return None
+    return f"{coluna} in ({', '.join('?' * len(valores))})", valores
+
+
+def predicado_contem(coluna: str, texto: str | None) -> tuple[str, list] | None:
+    """
+    `lower(coluna) like lower(?)` com o texto escapado, equivalente a
+    str.contains(case=False) em qualquer collation (inclusive as que
+    diferenciam maiúsculas).
+    """
+    if not texto:
+        return None
+    escapado = texto.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]")
+    return f"lower({coluna}) like lower(?)", [f"%{escapado}%"]
+
+
+def predicados_periodo(
+    coluna: str,
+    periodo: str,
+    mes=None,
+    ano=None,
+    semanas: int = None,
+    agora: datetime | None = None
+) -> list[tuple[str, list]]:
+    """
+    Predicados de data equivalentes ao filtro de período da gold: `semanas`
+    tem prioridade; depois o período nomeado; por fim mês/ano avulsos.
+    Sempre que possível o predicado é um intervalo sobre a coluna, que
+    aproveita índices no SQL Server.
+    """
+    agora = agora or datetime.now()
+    hoje = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if semanas:
+        return [(f"{coluna} >= ?", [agora - timedelta(days=semanas * 7)])]
+
+    dias_anteriores = {"Última Semana": 7, "Últimos 15 Dias": 15, "Últimos 30 Dias": 30}
+    if periodo == "Hoje":
+        return [(f"{coluna} >= ? and {coluna} < ?", [hoje, hoje + timedelta(days=1)])]
+    if periodo in dias_anteriores:
+        return [(f"{coluna} >= ?", [agora - timedelta(days=dias_anteriores[periodo])])]
+    if periodo == "Mês Atual":
+        # Como em memória: o mês corrente de qualquer ano
+        return [(f"month({coluna}) = ?", [agora.month])]
+    if periodo == "Ano Atual":
+        return [(f"{coluna} >= ? and {coluna} < ?", [hoje.replace(month=1, day=1), hoje.replace(year=hoje.year + 1, month=1, day=1)])]
+    if periodo == "Todos":
+        return []
+
+    predicados = []
+    if mes:
+        predicados.append((f"month({coluna}) = ?", [int(mes)]))
+    if ano:
+        inicio = datetime(int(ano), 1, 1)
+        predicados.append((f"{coluna} >= ? and {coluna} < ?", [inicio, inicio.replace(year=inicio.year + 1)]))
+    return predicados
+
+
+def combinar(predicados) -> tuple[list[str], list]:
+    """Junta os predicados (ignorando None) em (condições, params)."""
+    condicoes, params = [], []
+    for predicado in predicados:
+        if predicado is None:
+            continue
+        sql, valores = predicado
+        condicoes.append(sql)
+        params.extend(valores)
+    return condicoes, params
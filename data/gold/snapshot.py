@@ -0,0 +1,279 @@
+import os
+import time
+import logging
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Mapping
+from data.bronze.bronze_store import caminho_manifesto
+from data.silver.estoque.data_silver import BRONZE_PATH as BRONZE_ESTOQUE
+from data.silver.financeiro.data_fincance_silver import BRONZE_PATH as BRONZE_FINANCEIRO
+from jobs.watermark import WATERMARK_PATH
+
+# Snapshot da camada gold compartilhado pelo processo: uma única cópia imutável
+# por versão dos dados, lida sem cópia por todas as sessões do dashboard.
+#
+# A versão é derivada do mtime dos manifestos do bronze e do arquivo de
+# watermarks; quando o job de extração grava uma nova carga, o snapshot é
+# reconstruído. O TTL cobre o caso sem bronze (fallback para o SQL Server), em
+# que não há arquivo para observar.
+#
+# Com a atualização em segundo plano ligada, a reconstrução roda numa thread
+# própria e a troca é uma única atribuição de referência: as sessões veem a
+# versão anterior completa até a nova ficar pronta, e nenhuma requisição
+# espera pelo banco (exceto a primeira carga do processo).
+#
+# Com um snapshot inicial (ex: restaurado do disco por data/gold/persistencia.py),
+# nem a primeira carga espera: ele é servido de imediato e a thread de
+# atualização confere a versão e o TTL em segundo plano. Antes de reconstruir,
+# o cache também tenta restaurar a versão corrente já publicada em disco por
+# outro processo, de modo que réplicas na mesma máquina consultam o banco uma
+# vez por versão e compartilham os arquivos mapeados. Em seguida tenta aplicar
+# só o delta da extração incremental ao snapshot atual (ver aplicar_delta em
+# data/gold/camadas.py); a reconstrução completa fica como último recurso.
+
+SNAPSHOT_TTL_SEGUNDOS = float(os.getenv("SNAPSHOT_TTL_SEGUNDOS", "900"))
+# Intervalo entre verificações de versão/TTL da thread de atualização
+SNAPSHOT_INTERVALO_VERIFICACAO = float(os.getenv("SNAPSHOT_INTERVALO_VERIFICACAO", "30"))
+
+ARQUIVOS_VERSAO = [
+    caminho_manifesto(BRONZE_ESTOQUE),
+    caminho_manifesto(BRONZE_FINANCEIRO),
+    WATERMARK_PATH,
+]
+
+logger = logging.getLogger('error_logger')
+
+
+def versao_dados(arquivos: list[str] = ARQUIVOS_VERSAO) -> str:
+    """Token de versão a partir do mtime dos arquivos (0 para ausentes)."""
+    partes = []
+    for caminho in arquivos:
+        try:
+            partes.append(str(os.stat(caminho).st_mtime_ns))
+        except OSError:
+            partes.append("0")
+    return "-".join(partes)
+
+
+def _congelar(objeto, vistos: set | None = None):
+    """Marca como somente leitura os arrays numpy internos dos índices."""
+    vistos = set() if vistos is None else vistos
+    if id(objeto) in vistos:
+        return
+    vistos.add(id(objeto))
+
+    if isinstance(objeto, np.ndarray):
+        objeto.flags.writeable = False
+    elif isinstance(objeto, dict):
+        for valor in objeto.values():
+            _congelar(valor, vistos)
+    elif hasattr(objeto, '__dict__'):
+        for nome, valor in vars(objeto).items():
+            if nome != 'df':
+                _congelar(valor, vistos)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Versão completa e imutável dos dados do dashboard.
+
+    Os DataFrames são compartilhados entre as sessões: quem precisar
+    alterá-los deve trabalhar sobre uma cópia (com o copy-on-write do pandas,
+    filtros e fatias já não alteram o original).
+
+    Atributos:
+        versao (str): Token de versao_dados() no momento da construção.
+        dados (Mapping): Nome -> objeto montado (índices, cubos...).
+        criado_em (datetime): Fim da construção.
+        duracao (float): Segundos gastos na construção.
+    """
+    versao: str
+    dados: Mapping
+    criado_em: datetime = field(default_factory=datetime.now)
+    duracao: float = 0.0
+
+    def __getitem__(self, nome):
+        return self.dados[nome]
+
+    @property
+    def idade(self) -> float:
+        """Segundos desde a construção."""
+        return (datetime.now() - self.criado_em).total_seconds()
+
+
+def criar_snapshot(versao: str, dados: dict, duracao: float = 0.0, criado_em: datetime | None = None) -> Snapshot:
+    """Snapshot imutável: dados num MappingProxyType e arrays dos índices somente leitura."""
+    _congelar(dados)
+    return Snapshot(versao, MappingProxyType(dict(dados)), criado_em or datetime.now(), duracao)
+
+
+class CacheSnapshot:
+    """
+    Guarda o snapshot atual e o reconstrói quando a versão dos dados muda,
+    quando o TTL expira ou após invalidar(). Uma única thread reconstrói por
+    vez; se a reconstrução falhar, o snapshot anterior continua em uso.
+
+    Sem iniciar_atualizacao(), a reconstrução acontece dentro de obter().
+    Com ela, obter() sempre devolve o snapshot atual de imediato e a thread
+    de atualização o substitui quando a nova versão estiver completa.
+
+    Args:
+        construir (callable): Função sem argumentos que monta o dicionário
+            de dados do snapshot.
+        ttl (float): Idade máxima do snapshot, em segundos.
+        arquivos_versao (list): Arquivos cujo mtime define a versão.
+        inicial (Snapshot, opcional): Snapshot servido até a primeira
+            verificação (ex: restaurado do disco).
+        ao_publicar (callable, opcional): Chamada com cada snapshot novo
+            após a reconstrução (ex: para persisti-lo); erros são apenas
+            registrados.
+        restaurar (callable, opcional): Versão dos dados -> Snapshot já
+            publicado com essa versão (ou None); usado no lugar da
+            reconstrução quando ainda válido. Não é usado após invalidar().
+        incrementar (callable, opcional): Snapshot atual -> dados com as
+            alterações desde a sua carga, ou None para reconstruir tudo.
+            Não é usado após invalidar().
+    """
+
+    def __init__(
+        self,
+        construir: Callable[[], dict],
+        ttl: float = SNAPSHOT_TTL_SEGUNDOS,
+        arquivos_versao: list[str] = ARQUIVOS_VERSAO,
+        inicial: Snapshot | None = None,
+        ao_publicar: Callable[[Snapshot], None] | None = None,
+        restaurar: Callable[[str], Snapshot | None] | None = None,
+        incrementar: Callable[[Snapshot], dict | None] | None = None
+    ):
+        self._construir = construir
+        self._ttl = ttl
+        self._arquivos_versao = arquivos_versao
+        self._ao_publicar = ao_publicar
+        self._restaurar = restaurar
+        self._incrementar = incrementar
+        self._atual: Snapshot | None = inicial
+        self._invalidado = False
+        self._lock = threading.Lock()
+
+        self._thread: threading.Thread | None = None
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+
+        self.ultimo_erro: str | None = None
+
+    def _valido(self, snapshot: Snapshot | None) -> bool:
+        return (
+            snapshot is not None
+            and not self._invalidado
+            and snapshot.idade <= self._ttl
+            and snapshot.versao == versao_dados(self._arquivos_versao)
+        )
+
+    def _reconstruir(self) -> Snapshot:
+        versao = versao_dados(self._arquivos_versao)
+        inicio = time.perf_counter()
+        dados = self._construir()
+        return criar_snapshot(versao, dados, time.perf_counter() - inicio)
+
+    def _aplicar_delta(self, atual: Snapshot) -> Snapshot | None:
+        versao = versao_dados(self._arquivos_versao)
+        inicio = time.perf_counter()
+        try:
+            dados = self._incrementar(atual)
+        except Exception as e:
+            logger.error(f"Erro ao aplicar delta ao snapshot {atual.versao}; reconstruindo: {str(e)}.",
+                         exc_info=True)
+            return None
+        if dados is None:
+            return None
+        return criar_snapshot(versao, dados, time.perf_counter() - inicio)
+
+    def obter(self) -> Snapshot:
+        """
+        Snapshot atual. Sem atualização em segundo plano, é reconstruído
+        antes se não for mais válido; com ela, só a primeira carga espera.
+        """
+        atual = self._atual
+        if atual is not None and (self.atualizando_em_segundo_plano or self._valido(atual)):
+            return atual
+        return self.atualizar()
+
+    def atualizar(self) -> Snapshot:
+        """
+        Substitui o snapshot se ele não for mais válido: pela versão já
+        publicada por outro processo, se houver; senão pelo atual com o delta
+        aplicado; ou por uma reconstrução completa.
+        """
+        with self._lock:
+            atual = self._atual
+            if self._valido(atual):
+                return atual
+            forcado = self._invalidado
+            self._invalidado = False
+            if self._restaurar is not None and not forcado:
+                restaurado = self._restaurar(versao_dados(self._arquivos_versao))
+                if self._valido(restaurado):
+                    self._atual = restaurado
+                    self.ultimo_erro = None
+                    return restaurado
+
+            novo = None
+            if self._incrementar is not None and atual is not None and not forcado:
+                novo = self._aplicar_delta(atual)
+
+            try:
+                self._atual = novo or self._reconstruir()
+                self.ultimo_erro = None
+            except Exception as e:
+                self.ultimo_erro = str(e)
+                if atual is None:
+                    raise
+                logger.error(f"Erro ao reconstruir snapshot; mantendo versão {atual.versao}: {str(e)}.",
+                             exc_info=True)
+                return atual
+
+            if self._ao_publicar is not None:
+                try:
+                    self._ao_publicar(self._atual)
+                except Exception as e:
+                    logger.error(f"Erro ao publicar snapshot {self._atual.versao}: {str(e)}.", exc_info=True)
+            return self._atual
+
+    def invalidar(self):
+        """
+        Força a reconstrução: na próxima leitura ou, com a atualização em
+        segundo plano, imediatamente na thread de atualização.
+        """
+        self._invalidado = True
+        self._acordar.set()
+
+    @property
+    def atualizando_em_segundo_plano(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar_atualizacao(self, intervalo: float = SNAPSHOT_INTERVALO_VERIFICACAO):
+        """Inicia (uma única vez) a thread que mantém o snapshot atualizado."""
+        with self._lock:
+            if self.atualizando_em_segundo_plano:
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(
+                target=self._executar, args=(intervalo,), name="atualizador-snapshot", daemon=True)
+            self._thread.start()
+
+    def parar_atualizacao(self):
+        self._parar.set()
+        self._acordar.set()
+
+    def _executar(self, intervalo: float):
+        while not self._parar.is_set():
+            try:
+                self.atualizar()
+            except Exception as e:
+                logger.error(f"Erro na carga inicial do snapshot: {str(e)}.", exc_info=True)
+            self._acordar.wait(intervalo)
+            self._acordar.clear()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# Derivação vetorizada de partes de data, compartilhada pelas silvers.
+#
+# Tudo é calculado direto sobre os valores datetime64 com aritmética do numpy
+# (sem .dt.day_name(), sem strings e sem um .astype() por coluna): a data é
+# truncada para dia/mês/ano e as partes saem por subtração. Datas nulas viram
+# <NA> nas partes derivadas.
+
+# Parte -> dtype da coluna derivada
+PARTES = {
+    'MES': 'Int8',
+    'ANO': 'Int16',
+    'DIA': 'Int8',
+    'DIA_SEMANA': 'Int8',   # ISO: segunda = 1 ... domingo = 7
+    'SEMANA': 'Int8',       # semana ISO (1 a 53)
+}
+
+PARTES_PADRAO = ('MES', 'ANO', 'DIA_SEMANA', 'DIA')
+
+
+def calcular_partes(datas: pd.Series, partes=PARTES_PADRAO) -> dict[str, pd.arrays.IntegerArray]:
+    """
+    Calcula as partes pedidas de uma série datetime64.
+
+    Args:
+        datas (pd.Series): Série datetime64 (pode conter NaT).
+        partes (iterable): Partes a calcular, entre as chaves de PARTES.
+
+    Retorna:
+        dict parte -> array inteiro anulável.
+    """
+    desconhecidas = set(partes) - set(PARTES)
+    if desconhecidas:
+        raise ValueError(f"Partes de data desconhecidas: {sorted(desconhecidas)}")
+
+    valores = datas.to_numpy(dtype='datetime64[D]')
+    nulos = np.isnat(valores)
+    if nulos.any():
+        valores = np.where(nulos, np.datetime64(0, 'D'), valores)
+
+    calculadas = {}
+    dias_epoca = valores.astype(np.int64)
+    # Um único truncamento para mês; ano e mês saem dele por aritmética inteira
+    mes_truncado = valores.astype('datetime64[M]')
+    meses_epoca = mes_truncado.astype(np.int64)
+    # 1970-01-01 foi uma quinta-feira (ISO 4)
+    dia_semana = (dias_epoca + 3) % 7 + 1
+
+    for parte in partes:
+        if parte == 'MES':
+            resultado = meses_epoca % 12 + 1
+        elif parte == 'ANO':
+            resultado = meses_epoca // 12 + 1970
+        elif parte == 'DIA':
+            resultado = (valores - mes_truncado).astype(np.int64) + 1
+        elif parte == 'DIA_SEMANA':
+            resultado = dia_semana
+        else:  # SEMANA
+            # A semana ISO é a do ano da quinta-feira da mesma semana
+            quinta = valores + (4 - dia_semana).astype('timedelta64[D]')
+            resultado = (quinta - quinta.astype('datetime64[Y]')).astype(np.int64) // 7 + 1
+
+        tipo_numpy = np.dtype(PARTES[parte].lower())
+        calculadas[parte] = pd.arrays.IntegerArray(resultado.astype(tipo_numpy), nulos.copy())
+
+    return calculadas
+
+
+def derivar_partes_data(df: pd.DataFrame, configuracao: dict[str, tuple[str, tuple]]) -> pd.DataFrame:
+    """
+    Acrescenta ao DataFrame as partes de data configuradas para cada coluna.
+
+    Args:
+        df (pd.DataFrame): DataFrame com as colunas de data já em datetime64.
+        configuracao (dict): coluna de data -> (sufixo, partes). Cada parte gera
+            a coluna '<PARTE>_<SUFIXO>', ex: 'CRE_DATA_ENTRADA' -> ('ENTRADA',
+            ('MES', 'ANO')) gera MES_ENTRADA e ANO_ENTRADA.
+
+    Retorna:
+        pd.DataFrame com as novas colunas.
+    """
+    novas = {}
+    for coluna, (sufixo, partes) in configuracao.items():
+        for parte, valores in calcular_partes(df[coluna], partes).items():
+            novas[f'{parte}_{sufixo}'] = pd.Series(valores, index=df.index)
+    return df.assign(**novas)
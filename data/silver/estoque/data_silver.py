@@ -1,17 +1,66 @@
 import os
-import pyodbc
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
+from data.bronze.bronze_store import ler_bronze, ler_particoes, ler_deltas, idade_bronze
+from data.silver.schema import aplicar_schema, relatorio_memoria
+from data.silver.date_features import derivar_partes_data
+from data.database import conexao
+from data.streaming import ler_sql_colunar
 
 
 load_dotenv()
 
-DB_SERVER = os.getenv("DB_SERVER")
-DB_DATABASE = os.getenv("DB_DATABASE")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
+BRONZE_PATH = "data/bronze/estoque"
+
+# Idade máxima do bronze antes de ser considerado desatualizado
+BRONZE_MAX_IDADE_HORAS = float(os.getenv("BRONZE_MAX_IDADE_HORAS", "24"))
+# Se o bronze estiver ausente/desatualizado, consulta o SQL Server diretamente
+PERMITIR_FALLBACK_SQL = os.getenv("SILVER_FALLBACK_SQL", "1") == "1"
+
+COLUNAS = [
+    'CRE_ID', 'CRE_PESO_ENTRADA', 'CRE_PESO_SAIDA', 'CRE_PESO_LIQUIDO', 'TIPO',
+    'CRE_DATAINC', 'CRE_DATA_ENTRADA', 'CRE_DATA_ROMANEIO', 'CRE_DATA_SAIDA',
+    'TIPO_COBRANCA_ARMAZENAGEM', 'STATUS_ROMANEIO', 'CRE_MOTORISTA_NOME',
+    'CRE_PRODUTOR_CODIGO', 'CRE_PRODUTOR_NOME', 'CRE_PRODUTOR_CIDADE', 'CRE_PRO_DESCRICAO'
+]
+
+# Partes derivadas de cada coluna de data (ver data/silver/date_features.py)
+DERIVACOES_DATA = {
+    'CRE_DATA_ENTRADA': ('ENTRADA', ('MES', 'ANO', 'DIA_SEMANA', 'DIA', 'SEMANA')),
+    'CRE_DATA_SAIDA': ('SAIDA', ('MES', 'ANO', 'DIA_SEMANA', 'DIA', 'SEMANA')),
+}
+
+# Tipos emitidos pela silver de estoque (ver data/silver/schema.py)
+SCHEMA = {
+    'CRE_ID': 'int64',
+    'CRE_PESO_ENTRADA': 'float32',
+    'CRE_PESO_SAIDA': 'float32',
+    'CRE_PESO_LIQUIDO': 'float32',
+    'TIPO': 'category',
+    'CRE_DATAINC': 'datetime64[us]',
+    'CRE_DATA_ENTRADA': 'datetime64[us]',
+    'CRE_DATA_ROMANEIO': 'datetime64[us]',
+    'CRE_DATA_SAIDA': 'datetime64[us]',
+    'TIPO_COBRANCA_ARMAZENAGEM': 'category',
+    'STATUS_ROMANEIO': 'category',
+    'CRE_MOTORISTA_NOME': 'category',
+    'CRE_PRODUTOR_CODIGO': 'Int32',
+    'CRE_PRODUTOR_NOME': 'category',
+    'CRE_PRODUTOR_CIDADE': 'category',
+    'CRE_PRO_DESCRICAO': 'category',
+    'MES_ENTRADA': 'Int8',
+    'ANO_ENTRADA': 'Int16',
+    'DIA_SEMANA_ENTRADA': 'Int8',
+    'DIA_ENTRADA': 'Int8',
+    'SEMANA_ENTRADA': 'Int8',
+    'MES_SAIDA': 'Int8',
+    'ANO_SAIDA': 'Int16',
+    'DIA_SEMANA_SAIDA': 'Int8',
+    'DIA_SAIDA': 'Int8',
+    'SEMANA_SAIDA': 'Int8',
+}
 
 logger = logging.getLogger('error_logger')
 logger.setLevel(logging.ERROR)
@@ -25,91 +74,174 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-def get_data(path="data/bronze/estoque/dados_entrada_estoque.csv"):
+def bronze_atualizado(path=BRONZE_PATH, max_idade_horas=BRONZE_MAX_IDADE_HORAS) -> bool:
+    """Indica se o bronze existe e foi gravado dentro da idade máxima."""
+    idade = idade_bronze(path)
+    return idade is not None and idade.total_seconds() <= max_idade_horas * 3600
+
+
+def usar_bronze(path=BRONZE_PATH, permitir_sql=PERMITIR_FALLBACK_SQL) -> bool:
+    """
+    Indica se a silver deve ser montada a partir do bronze: quando ele está
+    atualizado ou, sem fallback para o SQL, sempre que existir.
+    """
+    return bronze_atualizado(path) or (not permitir_sql and idade_bronze(path) is not None)
+
+
+def ler_bronze_estoque(path=BRONZE_PATH, rotulos: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lê os romaneios de entrada da camada bronze aplicando os mesmos filtros
+    da consulta SQL (TIPO = 'ENTRADA' e romaneio não cancelado). Com
+    `rotulos`, lê apenas essas partições.
+    """
+    if rotulos is None:
+        df = ler_bronze(path, colunas=COLUNAS)
+    else:
+        df = ler_particoes(path, rotulos, colunas=COLUNAS)
+    return _entradas(df)
+
+
+def _eh_entrada(df: pd.DataFrame) -> pd.Series:
+    return (df['TIPO'] == 'ENTRADA') & (df['STATUS_ROMANEIO'] != 'CANCELADO')
+
+
+def _entradas(df: pd.DataFrame) -> pd.DataFrame:
+    """Romaneios de entrada não cancelados, do mais recente ao mais antigo."""
+    return df[_eh_entrada(df)].sort_values('CRE_DATA_ENTRADA', ascending=False)
+
+
+def ler_sql_estoque(condicoes: list[str] | None = None, params: list | None = None) -> pd.DataFrame:
     """
-    Processa uma base de dados CSV e exporta um CSV resumido com colunas de data e informações derivadas.
+    Consulta os romaneios de entrada diretamente no SQL Server.
 
     Args:
-        path (str): Caminho do arquivo CSV de entrada.
+        condicoes (list, opcional): Predicados SQL extras, combinados com "and"
+            (placeholders "?"), ex: ["CRE_DATA_ENTRADA >= ?"].
+        params (list, opcional): Valores dos placeholders, na ordem.
+    """
+    QUERY = """
+        select             
+            CRE_ID
+            , CRE_PESO_ENTRADA
+            , CRE_PESO_SAIDA
+            , CRE_PESO_LIQUIDO
+            , TIPO
+            , CRE_DATAINC
+            , CRE_DATA_ENTRADA
+            , CRE_DATA_ROMANEIO
+            , CRE_DATA_SAIDA
+            , TIPO_COBRANCA_ARMAZENAGEM
+            , STATUS_ROMANEIO
+            , CRE_MOTORISTA_NOME
+            , CRE_PRODUTOR_CODIGO
+            , CRE_PRODUTOR_NOME
+            , CRE_PRODUTOR_CIDADE
+            , CRE_PRO_DESCRICAO
+        from v_CEREAIS_ROMANEIO_ENTRADA
+            where TIPO = 'ENTRADA' and STATUS_ROMANEIO != 'CANCELADO'{filtros}
+        order by CRE_DATA_ENTRADA desc
+    """
+    filtros = "".join(f"\n            and {condicao}" for condicao in condicoes or [])
+
+    with conexao() as conn:
+        return ler_sql_colunar(conn, QUERY.format(filtros=filtros), params)
+
+
+def transformar(df_resumido: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas de data, deriva as partes configuradas em
+    DERIVACOES_DATA e aplica o SCHEMA compacto da silver.
+    """
+    # Conversões de data
+    datas = ['CRE_DATAINC', 'CRE_DATA_ENTRADA',
+             'CRE_DATA_ROMANEIO', 'CRE_DATA_SAIDA']
+    for coluna in datas:
+        df_resumido[coluna] = pd.to_datetime(
+            df_resumido[coluna], errors='coerce')
+
+    # Derivação de mês, ano, dia, dia da semana e semana da entrada e da saída
+    df_resumido = derivar_partes_data(df_resumido, DERIVACOES_DATA)
+
+    return aplicar_schema(df_resumido.reset_index(drop=True), SCHEMA)
+
+
+def consultar_sql(condicoes: list[str] | None = None, params: list | None = None) -> pd.DataFrame:
+    """
+    Silver de estoque montada só com as linhas que atendem às condições,
+    filtradas no próprio SQL Server (ver compilar_filtros na gold). Não usa o
+    bronze; erros são propagados para quem chamou.
+    """
+    return transformar(ler_sql_estoque(condicoes, params))
+
+
+def get_particoes(rotulos: list[str], path=BRONZE_PATH) -> pd.DataFrame:
+    """
+    Silver de estoque montada só com as partições do bronze informadas
+    (ver data/gold/camadas.py). Erros são propagados para quem chamou.
+    """
+    return transformar(ler_bronze_estoque(path, rotulos))
+
+
+def get_valores(rotulos: list[str], colunas: list[str], path=BRONZE_PATH) -> pd.DataFrame:
+    """
+    Só as `colunas` (sem transformação) das linhas de estoque das partições
+    do bronze informadas, para listar os valores dos filtros sem montar a
+    silver (ver data/gold/camadas.py).
+    """
+    df = ler_particoes(path, rotulos, colunas=[*colunas, 'TIPO', 'STATUS_ROMANEIO'])
+    if df.empty:
+        return df[colunas]
+    return df.loc[_eh_entrada(df), colunas]
+
+
+def get_delta(posicao: dict | None, path=BRONZE_PATH) -> tuple[dict, pd.Series, pd.DataFrame] | None:
+    """
+    Alterações gravadas no bronze pelas extrações incrementais desde
+    `posicao` (ver ler_deltas no bronze). Só as linhas do delta passam pela
+    transformação da silver.
+
+    Retorna:
+        tuple (nova posição, CRE_ID de todas as linhas alteradas, silver das
+        linhas que entram no dashboard), ou None se for preciso recarregar
+        tudo. Um romaneio cancelado aparece só nas chaves (sai da gold).
+    """
+    delta = ler_deltas(path, posicao, colunas=COLUNAS)
+    if delta is None:
+        return None
+
+    posicao, df = delta
+    if df.empty:
+        return posicao, df['CRE_ID'], df
+    return posicao, df['CRE_ID'], transformar(_entradas(df))
+
+
+def get_data(path=BRONZE_PATH, permitir_sql=PERMITIR_FALLBACK_SQL):
+    """
+    Monta a camada silver de estoque a partir dos arquivos bronze gerados por
+    jobs/extract.py, com colunas de data e informações derivadas.
+
+    O SQL Server só é consultado diretamente quando o bronze não existe ou está
+    mais velho que BRONZE_MAX_IDADE_HORAS, e apenas se `permitir_sql` for True.
+    Sem fallback, um bronze desatualizado ainda é usado.
+
+    Args:
+        path (str): Diretório da fonte na camada bronze.
+        permitir_sql (bool): Permite o fallback para a consulta ao SQL Server.
     """
     try:
-        QUERY = """
-            select             
-                CRE_ID
-                , CRE_PESO_ENTRADA
-                , CRE_PESO_SAIDA
-                , CRE_PESO_LIQUIDO
-                , TIPO
-                , CRE_DATAINC
-                , CRE_DATA_ENTRADA
-                , CRE_DATA_ROMANEIO
-                , CRE_DATA_SAIDA
-                , TIPO_COBRANCA_ARMAZENAGEM
-                , STATUS_ROMANEIO
-                , CRE_MOTORISTA_NOME
-                , CRE_PRODUTOR_CODIGO
-                , CRE_PRODUTOR_NOME
-                , CRE_PRODUTOR_CIDADE
-                , CRE_PRO_DESCRICAO
-            from v_CEREAIS_ROMANEIO_ENTRADA
-                where TIPO = 'ENTRADA' and STATUS_ROMANEIO != 'CANCELADO'
-            order by CRE_DATA_ENTRADA desc
-        """
-
-        conn = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={DB_SERVER};"
-            f"DATABASE={DB_DATABASE};"
-            f"UID={DB_USER};"
-            f"PWD={DB_PASSWORD}"
-        )
-
-        # df = pd.read_csv(path, sep=';', engine='python')
-        df_resumido = pd.read_sql(QUERY, conn)
-
-        # Conversões de data
-        datas = ['CRE_DATAINC', 'CRE_DATA_ENTRADA',
-                 'CRE_DATA_ROMANEIO', 'CRE_DATA_SAIDA']
-        for coluna in datas:
-            df_resumido[coluna] = pd.to_datetime(
-                df_resumido[coluna], errors='coerce')
-
-        # Derivação de informações da entrada
-        df_resumido['MES_ENTRADA'] = df_resumido['CRE_DATA_ENTRADA'].dt.month.astype(
-            'Int64')
-        df_resumido['ANO_ENTRADA'] = df_resumido['CRE_DATA_ENTRADA'].dt.year.astype(
-            'Int64')
-        df_resumido['DIA_SEMANA_ENTRADA'] = df_resumido['CRE_DATA_ENTRADA'].dt.day_name()
-        df_resumido['DIA_ENTRADA'] = df_resumido['CRE_DATA_ENTRADA'].dt.day.astype(
-            'Int64')
-
-        # Derivação de informações da saída
-        df_resumido['MES_SAIDA'] = df_resumido['CRE_DATA_SAIDA'].dt.month.astype(
-            'Int64')
-        df_resumido['ANO_SAIDA'] = df_resumido['CRE_DATA_SAIDA'].dt.year.astype(
-            'Int64')
-        df_resumido['DIA_SEMANA_SAIDA'] = df_resumido['CRE_DATA_SAIDA'].dt.day_name()
-        df_resumido['DIA_SAIDA'] = df_resumido['CRE_DATA_SAIDA'].dt.day.astype(
-            'Int64')
-
-        # Mapeamento dos dias da semana para números
-        day_name_map = {
-            'Monday': 1, 'Tuesday': 2, 'Wednesday': 3, 'Thursday': 4,
-            'Friday': 5, 'Saturday': 6, 'Sunday': 7
-        }
-
-        df_resumido['DIA_SEMANA_ENTRADA'] = df_resumido['DIA_SEMANA_ENTRADA'].map(
-            day_name_map)
-        df_resumido['DIA_SEMANA_SAIDA'] = df_resumido['DIA_SEMANA_SAIDA'].map(
-            day_name_map)
-
-        df_resumido = df_resumido.reset_index(drop=True)
-
-        return df_resumido
+        if usar_bronze(path, permitir_sql):
+            df_resumido = ler_bronze_estoque(path)
+        elif permitir_sql:
+            df_resumido = ler_sql_estoque()
+        else:
+            raise FileNotFoundError(
+                f"Camada bronze inexistente em {path} e fallback SQL desabilitado.")
+
+        return transformar(df_resumido)
 
     except Exception as e:
-        logger.error(f"Erro: {str(e)}.", exc_info=True)
+        logger.exception(f"Erro: {str(e)}.")
 
 
 if __name__ == "__main__":
-    _ = get_data("data/bronze/estoque/dados_entrada_estoque.csv")
+    print(relatorio_memoria(get_data()).to_string(index=False))
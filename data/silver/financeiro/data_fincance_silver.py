@@ -1,17 +1,56 @@
 import os
-import pyodbc
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
+from data.bronze.bronze_store import ler_bronze, ler_particoes, ler_deltas, idade_bronze
+from data.silver.schema import aplicar_schema, relatorio_memoria
+from data.silver.date_features import derivar_partes_data
+from data.database import conexao
+from data.streaming import ler_sql_colunar
 
 
 load_dotenv()
 
-DB_SERVER = os.getenv("DB_SERVER")
-DB_DATABASE = os.getenv("DB_DATABASE")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
+BRONZE_PATH = "data/bronze/financeiro"
+
+# Idade máxima do bronze antes de ser considerado desatualizado
+BRONZE_MAX_IDADE_HORAS = float(os.getenv("BRONZE_MAX_IDADE_HORAS", "24"))
+# Se o bronze estiver ausente/desatualizado, consulta o SQL Server diretamente
+PERMITIR_FALLBACK_SQL = os.getenv("SILVER_FALLBACK_SQL", "1") == "1"
+
+COLUNAS = [
+    'NFI_NUMERO', 'NFI_RAZAO', 'NFI_CNPJ', 'NFI_DATA_EMISSAO', 'NFI_DATA_SAIDA',
+    'NFI_VALOR_TOTAL_PRODUTO', 'NFI_VALOR_TOTAL_PRODUTO_BRUTO', 'NFI_VALOR_TOTAL_NOTA'
+]
+
+# Partes derivadas de cada coluna de data (ver data/silver/date_features.py)
+DERIVACOES_DATA = {
+    'NFI_DATA_EMISSAO': ('EMISSAO', ('MES', 'ANO', 'DIA_SEMANA', 'DIA', 'SEMANA')),
+    'NFI_DATA_SAIDA': ('SAIDA', ('MES', 'ANO', 'DIA_SEMANA', 'DIA', 'SEMANA')),
+}
+
+# Tipos emitidos pela silver financeira (ver data/silver/schema.py)
+SCHEMA = {
+    'NFI_NUMERO': 'int64',
+    'NFI_RAZAO': 'category',
+    'NFI_CNPJ': 'category',
+    'NFI_DATA_EMISSAO': 'datetime64[us]',
+    'NFI_DATA_SAIDA': 'datetime64[us]',
+    'NFI_VALOR_TOTAL_PRODUTO': 'float64',
+    'NFI_VALOR_TOTAL_PRODUTO_BRUTO': 'float64',
+    'NFI_VALOR_TOTAL_NOTA': 'float64',
+    'MES_EMISSAO': 'Int8',
+    'ANO_EMISSAO': 'Int16',
+    'DIA_SEMANA_EMISSAO': 'Int8',
+    'DIA_EMISSAO': 'Int8',
+    'SEMANA_EMISSAO': 'Int8',
+    'MES_SAIDA': 'Int8',
+    'ANO_SAIDA': 'Int16',
+    'DIA_SEMANA_SAIDA': 'Int8',
+    'DIA_SAIDA': 'Int8',
+    'SEMANA_SAIDA': 'Int8',
+}
 
 logger = logging.getLogger('error_logger')
 logger.setLevel(logging.ERROR)
@@ -25,78 +64,148 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-def get_data(path="data/bronze/financeiro/dados_saida_financeiro.csv"):
+def bronze_atualizado(path=BRONZE_PATH, max_idade_horas=BRONZE_MAX_IDADE_HORAS) -> bool:
+    """Indica se o bronze existe e foi gravado dentro da idade máxima."""
+    idade = idade_bronze(path)
+    return idade is not None and idade.total_seconds() <= max_idade_horas * 3600
+
+
+def usar_bronze(path=BRONZE_PATH, permitir_sql=PERMITIR_FALLBACK_SQL) -> bool:
+    """
+    Indica se a silver deve ser montada a partir do bronze: quando ele está
+    atualizado ou, sem fallback para o SQL, sempre que existir.
+    """
+    return bronze_atualizado(path) or (not permitir_sql and idade_bronze(path) is not None)
+
+
+def ler_bronze_financeiro(path=BRONZE_PATH, rotulos: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lê as notas fiscais de saída a partir da camada bronze. Com `rotulos`,
+    lê apenas essas partições.
+    """
+    if rotulos is None:
+        df = ler_bronze(path, colunas=COLUNAS)
+    else:
+        df = ler_particoes(path, rotulos, colunas=COLUNAS)
+    return df.sort_values('NFI_DATA_EMISSAO', ascending=False)
+
+
+def ler_sql_financeiro(condicoes: list[str] | None = None, params: list | None = None) -> pd.DataFrame:
+    """
+    Consulta as notas fiscais de saída diretamente no SQL Server.
+
+    Args:
+        condicoes (list, opcional): Predicados SQL extras, combinados com "and"
+            (placeholders "?"), ex: ["NFI_DATA_SAIDA >= ?"].
+        params (list, opcional): Valores dos placeholders, na ordem.
+    """
+    QUERY = """
+        select 
+            NFI_NUMERO
+            , NFI_RAZAO
+            , NFI_CNPJ
+            , NFI_DATA_EMISSAO
+            , NFI_DATA_SAIDA
+            , NFI_VALOR_TOTAL_PRODUTO
+            , NFI_VALOR_TOTAL_PRODUTO_BRUTO
+            , NFI_VALOR_TOTAL_NOTA
+        from NOTA_FISCAL where NFI_TIPO = 0{filtros}
+            order by NFI_DATA_EMISSAO desc
+    """
+    filtros = "".join(f"\n            and {condicao}" for condicao in condicoes or [])
+
+    with conexao() as conn:
+        return ler_sql_colunar(conn, QUERY.format(filtros=filtros), params)
+
+
+def transformar(df_resumido: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas de data, deriva as partes configuradas em
+    DERIVACOES_DATA e aplica o SCHEMA compacto da silver.
+    """
+    datas = ['NFI_DATA_EMISSAO', 'NFI_DATA_SAIDA']
+    for coluna in datas:
+        df_resumido[coluna] = pd.to_datetime(
+            df_resumido[coluna], errors='coerce')
+
+    df_resumido = derivar_partes_data(df_resumido, DERIVACOES_DATA)
+
+    return aplicar_schema(df_resumido.reset_index(drop=True), SCHEMA)
+
+
+def consultar_sql(condicoes: list[str] | None = None, params: list | None = None) -> pd.DataFrame:
+    """
+    Silver financeira montada só com as linhas que atendem às condições,
+    filtradas no próprio SQL Server (ver compilar_filtros na gold). Não usa o
+    bronze; erros são propagados para quem chamou.
+    """
+    return transformar(ler_sql_financeiro(condicoes, params))
+
+
+def get_particoes(rotulos: list[str], path=BRONZE_PATH) -> pd.DataFrame:
+    """
+    Silver financeira montada só com as partições do bronze informadas
+    (ver data/gold/camadas.py). Erros são propagados para quem chamou.
+    """
+    return transformar(ler_bronze_financeiro(path, rotulos))
+
+
+def get_valores(rotulos: list[str], colunas: list[str], path=BRONZE_PATH) -> pd.DataFrame:
+    """
+    Só as `colunas` (sem transformação) das notas das partições do bronze
+    informadas, para listar os valores dos filtros sem montar a silver (ver
+    data/gold/camadas.py).
     """
-    Processa uma base de dados CSV e exporta um CSV resumido com colunas de data e informações derivadas.
+    return ler_particoes(path, rotulos, colunas=colunas)
+
+
+def get_delta(posicao: dict | None, path=BRONZE_PATH) -> tuple[dict, pd.Series, pd.DataFrame] | None:
+    """
+    Alterações gravadas no bronze pelas extrações incrementais desde
+    `posicao` (ver ler_deltas no bronze). Só as linhas do delta passam pela
+    transformação da silver.
+
+    Retorna:
+        tuple (nova posição, NFI_NUMERO das notas alteradas, silver dessas
+        notas), ou None se for preciso recarregar tudo.
+    """
+    delta = ler_deltas(path, posicao, colunas=COLUNAS)
+    if delta is None:
+        return None
+
+    posicao, df = delta
+    if df.empty:
+        return posicao, df['NFI_NUMERO'], df
+    return posicao, df['NFI_NUMERO'], transformar(df.sort_values('NFI_DATA_EMISSAO', ascending=False))
+
+
+def get_data(path=BRONZE_PATH, permitir_sql=PERMITIR_FALLBACK_SQL):
+    """
+    Monta a camada silver financeira a partir dos arquivos bronze gerados por
+    jobs/extract_finance.py, com colunas de data e informações derivadas.
+
+    O SQL Server só é consultado diretamente quando o bronze não existe ou está
+    mais velho que BRONZE_MAX_IDADE_HORAS, e apenas se `permitir_sql` for True.
+    Sem fallback, um bronze desatualizado ainda é usado.
 
     Args:
-        path (str): Caminho do arquivo CSV de SAIDA.
+        path (str): Diretório da fonte na camada bronze.
+        permitir_sql (bool): Permite o fallback para a consulta ao SQL Server.
     """
     try:
-        
-        QUERY = """
-            select 
-                NFI_NUMERO
-                , NFI_RAZAO
-                , NFI_CNPJ
-                , NFI_DATA_EMISSAO
-                , NFI_DATA_SAIDA
-                , NFI_VALOR_TOTAL_PRODUTO
-                , NFI_VALOR_TOTAL_PRODUTO_BRUTO
-                , NFI_VALOR_TOTAL_NOTA
-            from NOTA_FISCAL where NFI_TIPO = 0
-                order by NFI_DATA_EMISSAO desc
-        """
-
-        conn = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={DB_SERVER};"
-            f"DATABASE={DB_DATABASE};"
-            f"UID={DB_USER};"
-            f"PWD={DB_PASSWORD}"
-        )        
-        
-        df_resumido = pd.read_sql(QUERY, conn)
-
-        datas = ['NFI_DATA_EMISSAO', 'NFI_DATA_SAIDA']
-        for coluna in datas:
-            df_resumido[coluna] = pd.to_datetime(
-                df_resumido[coluna], errors='coerce')
-
-        df_resumido['MES_EMISSAO'] = df_resumido['NFI_DATA_EMISSAO'].dt.month.astype(
-            'Int64')
-        df_resumido['ANO_EMISSAO'] = df_resumido['NFI_DATA_EMISSAO'].dt.year.astype(
-            'Int64')
-        df_resumido['DIA_SEMANA_EMISSAO'] = df_resumido['NFI_DATA_EMISSAO'].dt.day_name()
-        df_resumido['DIA_EMISSAO'] = df_resumido['NFI_DATA_EMISSAO'].dt.day.astype(
-            'Int64')
-
-        df_resumido['MES_SAIDA'] = df_resumido['NFI_DATA_SAIDA'].dt.month.astype(
-            'Int64')
-        df_resumido['ANO_SAIDA'] = df_resumido['NFI_DATA_SAIDA'].dt.year.astype(
-            'Int64')
-        df_resumido['DIA_SEMANA_SAIDA'] = df_resumido['NFI_DATA_SAIDA'].dt.day_name()
-        df_resumido['DIA_SAIDA'] = df_resumido['NFI_DATA_SAIDA'].dt.day.astype(
-            'Int64')
-
-        # Mapeamento dos dias da semana para números
-        day_name_map = {
-            'Monday': 1, 'Tuesday': 2, 'Wednesday': 3, 'Thursday': 4,
-            'Friday': 5, 'Saturday': 6, 'Sunday': 7
-        }
-
-        df_resumido['DIA_SEMANA_EMISSAO'] = df_resumido['DIA_SEMANA_EMISSAO'].map(
-            day_name_map)
-        df_resumido['DIA_SEMANA_SAIDA'] = df_resumido['DIA_SEMANA_SAIDA'].map(
-            day_name_map)
-
-        return df_resumido
+        if usar_bronze(path, permitir_sql):
+            df_resumido = ler_bronze_financeiro(path)
+        elif permitir_sql:
+            df_resumido = ler_sql_financeiro()
+        else:
+            raise FileNotFoundError(
+                f"Camada bronze inexistente em {path} e fallback SQL desabilitado.")
+
+        return transformar(df_resumido)
 
     except Exception as e:
-        print(f"Erro: {str(e)}.")
-        logger.error(f"Erro: {str(e)}.", exc_info=True)
+        logger.exception(f"Erro: {str(e)}.")
 
 
 if __name__ == "__main__":
-    _ = get_data()
-    print()
+    print(relatorio_memoria(get_data()).to_string(index=False))
@@ -0,0 +1,66 @@
+import pandas as pd
+
+# Contrato de tipos da camada silver. Cada dataset declara um dicionário
+# coluna -> dtype; aplicar_schema() faz a conversão uma única vez, na montagem
+# da silver, e as camadas seguintes podem confiar nos tipos sem reconvertê-los.
+#
+# Convenções:
+#   - textos repetidos (nomes, produtos, status) -> "category"
+#   - partes de data -> "Int8"/"Int16" (nulos quando a data é nula)
+#   - pesos -> "float32"; valores monetários permanecem "float64"
+#   - datas -> "datetime64[us]"
+
+
+def aplicar_schema(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    """
+    Converte as colunas do DataFrame para os tipos declarados no schema.
+    Colunas do schema ausentes no DataFrame são ignoradas; colunas fora do
+    schema são mantidas como estão.
+
+    Args:
+        df (pd.DataFrame): DataFrame da camada silver.
+        schema (dict): Mapeamento coluna -> dtype.
+
+    Retorna:
+        pd.DataFrame com os tipos do schema.
+    """
+    convertidas = {}
+    for coluna, tipo in schema.items():
+        if coluna not in df.columns:
+            continue
+
+        serie = df[coluna]
+        if str(serie.dtype) == tipo:
+            continue
+
+        if tipo.startswith("datetime64"):
+            serie = pd.to_datetime(serie, errors="coerce").astype(tipo)
+        elif tipo == "category":
+            serie = serie.astype("category")
+        else:
+            if serie.dtype == object or pd.api.types.is_string_dtype(serie):
+                serie = pd.to_numeric(serie, errors="coerce")
+            serie = serie.astype(tipo)
+        convertidas[coluna] = serie
+
+    if not convertidas:
+        return df
+    return df.assign(**convertidas)
+
+
+def relatorio_memoria(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memória ocupada por coluna (incluindo o conteúdo de strings e categorias),
+    da maior para a menor, com uma linha de total ao final.
+    """
+    uso = df.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        "coluna": uso.index,
+        "dtype": [str(df[coluna].dtype) for coluna in uso.index],
+        "bytes": uso.values,
+    }).sort_values("bytes", ascending=False, ignore_index=True)
+
+    total = pd.DataFrame({"coluna": ["TOTAL"], "dtype": [""], "bytes": [int(uso.sum())]})
+    relatorio = pd.concat([relatorio, total], ignore_index=True)
+    relatorio["MB"] = (relatorio["bytes"] / 1024 ** 2).round(2)
+    return relatorio
@@ -0,0 +1,106 @@
+import datetime
+import decimal
+import os
+import pandas as pd
+import pyarrow as pa
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Linhas buscadas por ida ao banco (cursor.arraysize / fetchmany)
+TAMANHO_LOTE = int(os.getenv("SQL_TAMANHO_LOTE", "50000"))
+
+# Tipo Python informado pelo pyodbc em cursor.description -> tipo Arrow
+TIPOS_ARROW = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+    datetime.datetime: pa.timestamp("us"),
+    datetime.date: pa.date32(),
+    datetime.time: pa.time64("us"),
+    bytes: pa.binary(),
+    bytearray: pa.binary(),
+}
+
+
+def _tipo_coluna(descricao) -> tuple[pa.DataType | None, pa.DataType | None]:
+    """
+    Retorna (tipo de leitura, tipo final) da coluna a partir de uma entrada de
+    cursor.description. Decimais são lidos como decimal128 e convertidos para
+    float64, que é como o restante do pipeline trata valores e pesos.
+    """
+    type_code = descricao[1]
+    if type_code is decimal.Decimal:
+        escala = descricao[5] or 0
+        return pa.decimal128(38, escala), pa.float64()
+    tipo = TIPOS_ARROW.get(type_code)
+    return tipo, tipo
+
+
+def _montar_tabela(linhas: list, nomes: list[str], tipos: list, schema: pa.Schema | None) -> pa.Table:
+    colunas = []
+    for i, valores in enumerate(zip(*linhas)):
+        tipo_leitura, tipo_final = tipos[i]
+        if tipo_leitura is None and schema is not None and not pa.types.is_null(schema.field(i).type):
+            # Driver sem tipo declarado: segue o tipo inferido no primeiro lote
+            tipo_leitura = tipo_final = schema.field(i).type
+        array = pa.array(valores, type=tipo_leitura)
+        if tipo_final is not None and array.type != tipo_final:
+            array = array.cast(tipo_final)
+        colunas.append(array)
+    return pa.Table.from_arrays(colunas, names=nomes)
+
+
+def ler_em_lotes(conn, query: str, params=None, tamanho_lote: int = TAMANHO_LOTE):
+    """
+    Executa a consulta e devolve o resultado em lotes colunares, sem nunca
+    materializar o result set inteiro em memória.
+
+    Cada lote de até `tamanho_lote` linhas é buscado com cursor.fetchmany e
+    convertido direto em arrays Arrow tipados a partir de cursor.description.
+
+    Args:
+        conn: Conexão DB-API (pyodbc).
+        query (str): Consulta SQL (parâmetros com '?').
+        params (list, opcional): Parâmetros da consulta.
+        tamanho_lote (int): Linhas por lote.
+
+    Yields:
+        pa.Table: Um lote do resultado.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.arraysize = tamanho_lote
+        cursor.execute(query, params or [])
+
+        nomes = [descricao[0] for descricao in cursor.description]
+        tipos = [_tipo_coluna(descricao) for descricao in cursor.description]
+        schema = None
+
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+            tabela = _montar_tabela(linhas, nomes, tipos, schema)
+            if schema is None:
+                schema = tabela.schema
+            yield tabela
+
+        if schema is None:
+            # Resultado vazio: um lote sem linhas preserva as colunas
+            yield pa.Table.from_arrays(
+                [pa.array([], type=tipo_final or pa.null()) for _, tipo_final in tipos],
+                names=nomes
+            )
+    finally:
+        cursor.close()
+
+
+def ler_sql_colunar(conn, query: str, params=None, tamanho_lote: int = TAMANHO_LOTE) -> pd.DataFrame:
+    """
+    Equivalente a pd.read_sql, mas montando o DataFrame a partir dos lotes
+    colunares de ler_em_lotes em vez de uma tupla Python por linha.
+    """
+    lotes = list(ler_em_lotes(conn, query, params, tamanho_lote))
+    return pa.concat_tables(lotes, promote_options="permissive").to_pandas()
@@ -0,0 +1,128 @@
+import os
+import time
+import logging
+from dotenv import load_dotenv
+from jobs.watermark import (
+    carregar_watermark, salvar_watermark, calcular_watermark,
+    combinar_watermark, calcular_corte
+)
+from data.bronze.bronze_store import carregar_manifesto, EscritorParticionado, upsert_particionado
+from data.database import conexao
+from data.streaming import ler_em_lotes, TAMANHO_LOTE
+
+# Laço de extração comum aos jobs (jobs/extract.py, jobs/extract_finance.py):
+# cada job define só a fonte, as queries e as colunas de watermark, chave e
+# partição.
+
+# ===========================
+# 1. Carregar variáveis do .env
+# ===========================
+load_dotenv()
+
+# "incremental" busca apenas o delta desde o último watermark; "full" recarrega tudo
+MODO = os.getenv("EXTRACT_MODE", "incremental")
+# Dias rebuscados antes do watermark para capturar linhas alteradas
+LOOKBACK_DIAS = int(os.getenv("EXTRACT_LOOKBACK_DIAS", "3"))
+
+logger = logging.getLogger('error_logger')
+
+
+def executar_extracao(
+    fonte: str,
+    bronze_path: str,
+    query: str,
+    query_incremental: str,
+    coluna_watermark: str,
+    coluna_chave: str,
+    coluna_particao: str,
+    modo: str = MODO,
+    lookback_dias: int = LOOKBACK_DIAS
+):
+    """
+    Extrai a fonte do SQL Server para o bronze particionado, em lotes.
+
+    No modo incremental (com watermark e bronze existentes) roda
+    `query_incremental` com os parâmetros (corte, última chave) e faz upsert
+    de cada lote; senão roda `query` e regrava o bronze inteiro. O watermark
+    só é salvo quando alguma linha foi lida.
+
+    Erros são registrados e propagados, para que o job termine com código de
+    saída diferente de zero e o agendador perceba a falha.
+
+    Args:
+        fonte (str): Nome da fonte no arquivo de watermarks.
+        bronze_path (str): Diretório da fonte na camada bronze.
+        query (str): Query da carga completa.
+        query_incremental (str): Query do delta, com dois parâmetros '?'.
+        coluna_watermark (str): Coluna de data do watermark.
+        coluna_chave (str): Chave única das linhas (e do watermark).
+        coluna_particao (str): Coluna de data das partições do bronze.
+        modo (str): "incremental" ou "full".
+        lookback_dias (int): Dias rebuscados antes do watermark.
+    """
+    # Cria a pasta Bronze se não existir
+    os.makedirs(bronze_path, exist_ok=True)
+
+    watermark = carregar_watermark(fonte)
+    corte = calcular_corte(watermark, lookback_dias)
+    incremental = (
+        modo == "incremental"
+        and corte is not None
+        and carregar_manifesto(bronze_path) is not None
+    )
+
+    # ===========================
+    # 2. Extrair e salvar Parquet particionado
+    # ===========================
+    try:
+        print("🔹 Conectando ao SQL Server...")
+        with conexao() as conn:
+            inicio = time.perf_counter()
+            linhas = 0
+            novo_watermark = watermark if incremental else None
+
+            if incremental:
+                print(f"🔹 Executando query incremental (a partir de {corte:%d/%m/%Y %H:%M})...")
+                lotes = ler_em_lotes(
+                    conn, query_incremental, [corte, watermark.get("chave") or 0], TAMANHO_LOTE)
+                escritor = None
+            else:
+                print("🔹 Executando query completa...")
+                lotes = ler_em_lotes(conn, query, tamanho_lote=TAMANHO_LOTE)
+                escritor = EscritorParticionado(bronze_path, coluna_particao, chave=coluna_chave)
+
+            # Cada lote é gravado no bronze assim que chega do banco
+            try:
+                for lote in lotes:
+                    if escritor is None:
+                        upsert_particionado(lote, bronze_path)
+                    else:
+                        escritor.escrever(lote)
+
+                    linhas += lote.num_rows
+                    novo_watermark = combinar_watermark(novo_watermark, calcular_watermark(
+                        lote.select([coluna_watermark, coluna_chave]).to_pandas(),
+                        coluna_watermark, coluna_chave
+                    ))
+                    print(f"🔹 {linhas} linhas gravadas em {bronze_path}...")
+            except Exception:
+                if escritor is not None:
+                    escritor.abortar()
+                raise
+
+            manifesto = escritor.finalizar() if escritor is not None else carregar_manifesto(bronze_path)
+
+            if linhas:
+                salvar_watermark(fonte, novo_watermark)
+
+            duracao = time.perf_counter() - inicio
+            print(f"🔹 {linhas} linhas em {duracao:.1f}s ({linhas / max(duracao, 1e-9):,.0f} linhas/s)")
+
+            print(
+                f"✅ Job finalizado! {len(manifesto['particoes'])} partições, "
+                f"{manifesto['total_linhas']} linhas em {bronze_path}")
+
+    except Exception as e:
+        print("❌ Erro ao executar job:", e)
+        logger.exception(f"Erro na extração de {fonte}: {str(e)}.")
+        raise
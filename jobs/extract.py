@@ -1,58 +1,35 @@
-import os
-import pyodbc
-import pandas as pd
-from datetime import datetime
-from dotenv import load_dotenv
-
-# ===========================
-# 1. Carregar variáveis do .env
-# ===========================
-load_dotenv()
-
-DB_SERVER = os.getenv("DB_SERVER")
-DB_DATABASE = os.getenv("DB_DATABASE")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
+import sys
+from jobs.extracao import executar_extracao, MODO
+
+# Execução (a partir da raiz do projeto):
+#   python -m jobs.extract           -> modo definido em EXTRACT_MODE (padrão: incremental)
+#   python -m jobs.extract --full    -> força a carga completa
+
 BRONZE_PATH = "data/bronze/estoque"
 
-# Cria a pasta Bronze se não existir
-os.makedirs(BRONZE_PATH, exist_ok=True)
+FONTE = "estoque"
+COLUNA_WATERMARK = "CRE_DATAINC"
+COLUNA_CHAVE = "CRE_ID"
+COLUNA_PARTICAO = "CRE_DATA_ENTRADA"
 
 # Query para extrair dados
 QUERY = """
     select * from v_CEREAIS_ROMANEIO_ENTRADA
 """
 
-# Nome do arquivo CSV com timestamp
-nome_arquivo = "dados_entrada_estoque.csv"
-caminho_arquivo = os.path.join(BRONZE_PATH, nome_arquivo)
-
-# ===========================
-# 2. Extrair e salvar CSV
-# ===========================
-try:
-    print("🔹 Conectando ao SQL Server...")
-    conn = pyodbc.connect(
-        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-        f"SERVER={DB_SERVER};"
-        f"DATABASE={DB_DATABASE};"
-        f"UID={DB_USER};"
-        f"PWD={DB_PASSWORD}"
-    )
-
-    print("🔹 Executando query...")
-    df = pd.read_sql(QUERY, conn)
+# Query incremental: linhas inseridas depois do corte ou com ID acima do último extraído
+QUERY_INCREMENTAL = """
+    select * from v_CEREAIS_ROMANEIO_ENTRADA
+        where CRE_DATAINC >= ? or CRE_ID > ?
+"""
 
-    print(f"🔹 Salvando CSV em {caminho_arquivo}...")
-    df.to_csv(caminho_arquivo, index=False, sep=';', encoding='utf-8-sig')
 
-    print(f"✅ Job finalizado! Arquivo salvo: {caminho_arquivo}")
+def executar(modo: str = MODO):
+    executar_extracao(
+        FONTE, BRONZE_PATH, QUERY, QUERY_INCREMENTAL,
+        COLUNA_WATERMARK, COLUNA_CHAVE, COLUNA_PARTICAO, modo
+    )
 
-except Exception as e:
-    print("❌ Erro ao executar job:", e)
 
-finally:
-    try:
-        conn.close()
-    except:
-        pass
+if __name__ == "__main__":
+    executar("full" if "--full" in sys.argv else MODO)
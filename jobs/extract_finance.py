@@ -1,26 +1,20 @@
-import os
-import pyodbc
-import pandas as pd
-from datetime import datetime
-from dotenv import load_dotenv
+import sys
+from jobs.extracao import executar_extracao, MODO
 
-# ===========================
-# 1. Carregar variáveis do .env
-# ===========================
-load_dotenv()
+# Execução (a partir da raiz do projeto):
+#   python -m jobs.extract_finance           -> modo definido em EXTRACT_MODE (padrão: incremental)
+#   python -m jobs.extract_finance --full    -> força a carga completa
 
-DB_SERVER = os.getenv("DB_SERVER")
-DB_DATABASE = os.getenv("DB_DATABASE")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
 BRONZE_PATH = "data/bronze/financeiro"
 
-# Cria a pasta Bronze se não existir
-os.makedirs(BRONZE_PATH, exist_ok=True)
+FONTE = "financeiro"
+COLUNA_WATERMARK = "NFI_DATA_EMISSAO"
+COLUNA_CHAVE = "NFI_NUMERO"
+# Particionado pela data de saída, a mesma usada nos filtros do dashboard
+# (permite carregar só as partições do período, ver data/gold/camadas.py)
+COLUNA_PARTICAO = "NFI_DATA_SAIDA"
 
-# Query para extrair dados
-QUERY = """
-    select 
+COLUNAS = """
         NFI_NUMERO
         , NFI_RAZAO
         , NFI_CNPJ
@@ -29,40 +23,30 @@ QUERY = """
         , NFI_VALOR_TOTAL_PRODUTO
         , NFI_VALOR_TOTAL_PRODUTO_BRUTO
         , NFI_VALOR_TOTAL_NOTA
+"""
+
+# Query para extrair dados
+QUERY = f"""
+    select {COLUNAS}
     from NOTA_FISCAL where NFI_TIPO = 0
         order by NFI_DATA_EMISSAO desc
 """
 
-# Nome do arquivo CSV com timestamp
-nome_arquivo = "dados_saida_financeiro.csv"
-caminho_arquivo = os.path.join(BRONZE_PATH, nome_arquivo)
-
-# ===========================
-# 2. Extrair e salvar CSV
-# ===========================
-try:
-    print("🔹 Conectando ao SQL Server...")
-    conn = pyodbc.connect(
-        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-        f"SERVER={DB_SERVER};"
-        f"DATABASE={DB_DATABASE};"
-        f"UID={DB_USER};"
-        f"PWD={DB_PASSWORD}"
-    )
-
-    print("🔹 Executando query...")
-    df = pd.read_sql(QUERY, conn)
+# Query incremental: notas emitidas depois do corte ou com número acima do último extraído
+QUERY_INCREMENTAL = f"""
+    select {COLUNAS}
+    from NOTA_FISCAL where NFI_TIPO = 0
+        and (NFI_DATA_EMISSAO >= ? or NFI_NUMERO > ?)
+        order by NFI_DATA_EMISSAO desc
+"""
 
-    print(f"🔹 Salvando CSV em {caminho_arquivo}...")
-    df.to_csv(caminho_arquivo, index=False, sep=';', encoding='utf-8-sig')
 
-    print(f"✅ Job finalizado! Arquivo salvo: {caminho_arquivo}")
+def executar(modo: str = MODO):
+    executar_extracao(
+        FONTE, BRONZE_PATH, QUERY, QUERY_INCREMENTAL,
+        COLUNA_WATERMARK, COLUNA_CHAVE, COLUNA_PARTICAO, modo
+    )
 
-except Exception as e:
-    print("❌ Erro ao executar job:", e)
 
-finally:
-    try:
-        conn.close()
-    except:
-        pass
+if __name__ == "__main__":
+    executar("full" if "--full" in sys.argv else MODO)
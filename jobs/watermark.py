@@ -0,0 +1,88 @@
+import json
+import os
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Arquivo único com o high-water mark de cada fonte extraída
+WATERMARK_PATH = "data/bronze/_watermarks.json"
+
+
+def _ler_arquivo(caminho: str) -> dict:
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def carregar_watermark(fonte: str, caminho: str = WATERMARK_PATH) -> dict | None:
+    """
+    Retorna o último high-water mark persistido para a fonte, ou None se a
+    fonte ainda não tiver sido extraída.
+
+    Args:
+        fonte (str): Nome da fonte (ex: "estoque", "financeiro").
+        caminho (str): Caminho do arquivo JSON de watermarks.
+    """
+    return _ler_arquivo(caminho).get(fonte)
+
+
+def salvar_watermark(fonte: str, watermark: dict, caminho: str = WATERMARK_PATH):
+    """
+    Persiste o high-water mark da fonte. A escrita é feita em um arquivo
+    temporário seguido de os.replace, então um job interrompido nunca deixa
+    o arquivo pela metade.
+    """
+    watermarks = _ler_arquivo(caminho)
+    watermarks[fonte] = {**watermark, "atualizado_em": datetime.now().isoformat()}
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(watermarks, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def calcular_watermark(df: pd.DataFrame, coluna_data: str, coluna_chave: str) -> dict:
+    """
+    Calcula o high-water mark (maior data e maior chave) de um lote extraído.
+    """
+    datas = pd.to_datetime(df[coluna_data], errors="coerce")
+    chaves = pd.to_numeric(df[coluna_chave], errors="coerce")
+
+    maior_data = datas.max()
+    maior_chave = chaves.max()
+
+    return {
+        "coluna_data": coluna_data,
+        "data": None if pd.isna(maior_data) else maior_data.isoformat(),
+        "coluna_chave": coluna_chave,
+        "chave": None if pd.isna(maior_chave) else int(maior_chave),
+    }
+
+
+def combinar_watermark(anterior: dict | None, novo: dict) -> dict:
+    """
+    Mantém o maior valor entre o watermark anterior e o do lote atual, para que
+    um delta vazio (ou só com linhas antigas da janela de lookback) nunca faça
+    o watermark voltar no tempo.
+    """
+    if not anterior:
+        return novo
+
+    combinado = dict(novo)
+    if anterior.get("data") and (not novo["data"] or anterior["data"] > novo["data"]):
+        combinado["data"] = anterior["data"]
+    if anterior.get("chave") is not None and (novo["chave"] is None or anterior["chave"] > novo["chave"]):
+        combinado["chave"] = anterior["chave"]
+    return combinado
+
+
+def calcular_corte(watermark: dict | None, lookback_dias: int) -> datetime | None:
+    """
+    Data a partir da qual o delta deve ser buscado: o watermark menos a janela
+    de lookback (para capturar linhas alteradas depois de inseridas).
+    Retorna None quando não há watermark, indicando carga completa.
+    """
+    if not watermark or not watermark.get("data"):
+        return None
+    return datetime.fromisoformat(watermark["data"]) - timedelta(days=lookback_dias)
@@ -0,0 +1,73 @@
+import os
+import pandas as pd
+from data.bronze.bronze_store import (
+    INDICE_CHAVES, PARTICAO_SEM_DATA, carregar_manifesto, escrever_particionado, ler_bronze, ler_particoes,
+    upsert_particionado
+)
+
+
+def gerar_base() -> pd.DataFrame:
+    return pd.DataFrame({
+        'ID': [1, 2, 3, 4, 5],
+        'DATA': pd.to_datetime(['2024-01-10', '2024-01-20', '2024-02-05', '2024-03-01', None]),
+        'VALOR': [10.0, 20.0, 30.0, 40.0, 50.0],
+    })
+
+
+def ids_por_particao(caminho: str) -> dict:
+    manifesto = carregar_manifesto(caminho)
+    return {
+        rotulo: sorted(ler_particoes(caminho, [rotulo])['ID'].tolist()) if particao['linhas'] else []
+        for rotulo, particao in manifesto['particoes'].items()
+    }
+
+
+def test_linha_que_muda_de_mes_sai_da_particao_anterior(tmp_path):
+    caminho = str(tmp_path / 'fonte')
+    escrever_particionado(gerar_base(), caminho, 'DATA', 'ID')
+
+    upsert_particionado(pd.DataFrame({
+        'ID': [1, 3, 5, 6],
+        'DATA': pd.to_datetime(['2024-03-15', None, '2024-02-01', '2024-01-02']),
+        'VALOR': [11.0, 31.0, 51.0, 60.0],
+    }), caminho)
+
+    assert ids_por_particao(caminho) == {
+        'ano=2024/mes=01': [2, 6],
+        'ano=2024/mes=02': [5],
+        'ano=2024/mes=03': [1, 4],
+        PARTICAO_SEM_DATA: [3],
+    }
+    df = ler_bronze(caminho)
+    assert df['ID'].is_unique
+    assert df['VALOR'].sum() == 20.0 + 40.0 + 11.0 + 31.0 + 51.0 + 60.0
+    assert carregar_manifesto(caminho)['total_linhas'] == 6
+
+
+def test_particoes_reescritas_recebem_a_sequencia_do_delta(tmp_path):
+    caminho = str(tmp_path / 'fonte')
+    escrever_particionado(gerar_base(), caminho, 'DATA', 'ID')
+
+    manifesto = upsert_particionado(pd.DataFrame({
+        'ID': [2], 'DATA': pd.to_datetime(['2024-03-02']), 'VALOR': [21.0],
+    }), caminho)
+
+    sequencias = {rotulo: particao['sequencia'] for rotulo, particao in manifesto['particoes'].items()}
+    assert sequencias == {'ano=2024/mes=01': 1, 'ano=2024/mes=02': 0, 'ano=2024/mes=03': 1, PARTICAO_SEM_DATA: 0}
+    # Nenhum arquivo temporário fica para trás
+    assert not [nome for _, _, nomes in os.walk(caminho) for nome in nomes if nome.endswith('.tmp')]
+
+
+def test_bronze_sem_indice_de_chaves(tmp_path):
+    """Bronzes gravados antes do índice são indexados no primeiro upsert."""
+    caminho = str(tmp_path / 'fonte')
+    escrever_particionado(gerar_base(), caminho, 'DATA', 'ID')
+    os.remove(os.path.join(caminho, INDICE_CHAVES))
+
+    upsert_particionado(pd.DataFrame({
+        'ID': [4], 'DATA': pd.to_datetime(['2024-01-03']), 'VALOR': [41.0],
+    }), caminho)
+
+    assert ids_por_particao(caminho)['ano=2024/mes=03'] == []
+    assert ids_por_particao(caminho)['ano=2024/mes=01'] == [1, 2, 4]
+    assert os.path.exists(os.path.join(caminho, INDICE_CHAVES))
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from data.gold.indices import IndiceSnapshot
+from data.gold.persistencia import ler_tabela, salvar_tabelas
+
+
+def gerar_tabela(linhas: int = 1000) -> pd.DataFrame:
+    """Colunas nos tipos da silver, da data mais recente para a mais antiga."""
+    return pd.DataFrame({
+        'DATA': pd.date_range('2024-01-01', periods=linhas, freq='h').astype('datetime64[us]')[::-1],
+        'ID': np.arange(linhas, dtype='int64'),
+        'PESO': np.linspace(0, 100, linhas).astype('float32'),
+        'NOME': pd.Categorical(np.resize(['B', 'A', None], linhas), categories=['B', 'A']),
+        'CNPJ': pd.Series(np.resize(['1', None], linhas), dtype='str'),
+        'MES': pd.array(np.resize([1, None, 12], linhas), dtype='Int8'),
+        'ANO': pd.array(np.full(linhas, 2024), dtype='Int16'),
+        'CODIGO': pd.array(np.resize([7, None], linhas), dtype='Int32'),
+    })
+
+
+def _buffers(serie: pd.Series) -> list[np.ndarray]:
+    array = serie.array
+    if isinstance(array, pd.arrays.IntegerArray):
+        return [array._data, array._mask]
+    if isinstance(array, pd.Categorical):
+        return [array.codes]
+    if isinstance(serie.dtype, pd.StringDtype):
+        return []
+    return [serie.to_numpy()]
+
+
+def _mapeado(caminho: str, buffer: np.ndarray) -> bool:
+    endereco = buffer.__array_interface__['data'][0]
+    with open('/proc/self/maps') as mapas:
+        regioes = [linha.split()[0].split('-') for linha in mapas if caminho in linha]
+    return any(int(inicio, 16) <= endereco < int(fim, 16) for inicio, fim in regioes)
+
+
+def test_ida_e_volta(tmp_path):
+    df = gerar_tabela()
+    salvar_tabelas(str(tmp_path / 'v'), {'t': df}, {})
+    pd.testing.assert_frame_equal(ler_tabela(str(tmp_path / 'v' / 't.arrow')), df)
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/maps'), reason="requer /proc/self/maps")
+def test_colunas_e_indice_apontam_para_o_arquivo(tmp_path):
+    salvar_tabelas(str(tmp_path / 'v'), {'t': gerar_tabela()}, {})
+    caminho = str(tmp_path / 'v' / 't.arrow')
+
+    df = ler_tabela(caminho)
+    indice = IndiceSnapshot(df, 'DATA', ['NOME'], {'PESO': 'NOME'})
+    for origem in (df, indice.df):
+        for coluna in origem:
+            for buffer in _buffers(origem[coluna]):
+                assert _mapeado(caminho, buffer), coluna